@@ -0,0 +1,285 @@
+"""
+Blogger publish benchmark: per-call service/blog-id discovery (legacy)
+vs the cached process-wide BloggerClient, one post per request and
+batched through publish_many().
+
+    cd backend
+    python -m benchmarks.blogger_benchmark --publishes 200 --latency-ms 20
+
+Talks to a local stand-in for the Blogger API and OAuth token endpoint,
+never to Google; the token file is a throwaway copy.
+"""
+import argparse
+import email.parser
+import itertools
+import json
+import os
+import re
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build
+
+from services.publishers.blogger import SCOPES, BloggerClient, BloggerPublisher, BLOGGER_BATCH_SIZE
+
+BLOG_ID = "1234567890"
+
+
+# =========================
+# STAND-IN SERVER
+# =========================
+
+class StandInBlogger(BaseHTTPRequestHandler):
+    latency = 0.0
+    hits = Counter()
+    post_ids = itertools.count(1)
+    hits_lock = threading.Lock()
+    protocol_version = "HTTP/1.1"
+    # Keep-alive replies must not sit in Nagle's buffer behind a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, key: str):
+        with self.hits_lock:
+            self.hits[key] += 1
+        time.sleep(self.latency)
+
+    def do_GET(self):
+        if re.match(r"^/v3/users/self/blogs", self.path):
+            self._count("blogs.listByUser")
+            return self._reply({"items": [{"id": BLOG_ID}]})
+        self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+
+        if self.path == "/token":
+            self._count("oauth.token")
+            return self._reply({"access_token": "fresh-token", "expires_in": 3600})
+
+        if re.match(r"^/v3/blogs/(\w+)/posts", self.path):
+            self._count("posts.insert")
+            return self._reply(self._new_post())
+
+        if self.path == "/batch":
+            self._count("batch")
+            return self._reply_batch(body)
+
+        self.send_error(404)
+
+    def _new_post(self) -> dict:
+        post_id = str(next(self.post_ids))
+        return {"id": post_id, "url": f"https://example.blogspot.com/{post_id}"}
+
+    def _reply_batch(self, body: bytes):
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+
+        boundary = "batch_response"
+        parts = []
+        for part in message.get_payload():
+            content_id = part["Content-ID"].strip("<>")
+            post = json.dumps(self._new_post())
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                "HTTP/1.1 200 OK\r\n"
+                "Content-Type: application/json\r\n\r\n"
+                f"{post}\r\n"
+            )
+
+        payload = ("".join(parts) + f"--{boundary}--\r\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _start_server(latency: float) -> ThreadingHTTPServer:
+    StandInBlogger.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInBlogger)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _write_token(path: str, expires_in: timedelta):
+    with open(path, "w") as f:
+        json.dump({
+            "token": "initial-token",
+            "refresh_token": "refresh-token",
+            "client_id": "bench-client",
+            "client_secret": "bench-secret",
+            "scopes": SCOPES,
+            "expiry": (datetime.utcnow() + expires_in).isoformat() + "Z",
+        }, f)
+
+
+# =========================
+# PUBLISH PATHS
+# =========================
+
+def _legacy_publish(token_file: str, api_endpoint: str, token_uri: str, article):
+    """
+    The pre-cache BloggerPublisher flow: token file + build() on every
+    call, twice (publish and get_blog_id), plus a listByUser round trip.
+    """
+    def get_service():
+        loaded = Credentials.from_authorized_user_file(token_file, SCOPES)
+        creds = loaded.with_token_uri(token_uri)
+        creds.expiry = loaded.expiry
+        if creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+            with open(token_file, "w") as f:
+                f.write(creds.to_json())
+        return build(
+            "blogger", "v3",
+            credentials=creds,
+            client_options={"api_endpoint": api_endpoint},
+            cache_discovery=False
+        )
+
+    service = get_service()
+    blog_id = get_service().blogs().listByUser(userId="self").execute()["items"][0]["id"]
+    return service.posts().insert(
+        blogId=blog_id,
+        body={"kind": "blogger#post", "title": article.title, "content": article.canonical_content},
+        isDraft=False
+    ).execute()
+
+
+def _article(i: int):
+    return SimpleNamespace(
+        id=i,
+        title=f"Benchmark post {i}",
+        canonical_content="<p>" + "lorem ipsum " * 200 + "</p>",
+        seo_tags="bench,blogger"
+    )
+
+
+def _measure(label: str, publishes: int, threads: int, publish_one):
+    StandInBlogger.hits.clear()
+
+    timings = []
+    errors = Counter()
+    timings_lock = threading.Lock()
+
+    def run(i):
+        started = time.perf_counter()
+        try:
+            publish_one(_article(i))
+        except Exception as e:
+            # e.g. legacy threads reading the token file mid-rewrite
+            with timings_lock:
+                errors[type(e).__name__] += 1
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        with timings_lock:
+            timings.append(elapsed)
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(run, range(publishes)))
+    wall = time.perf_counter() - wall
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    calls = sum(StandInBlogger.hits.values()) / publishes
+    print(
+        f"{label:<8} {threads:>7} {p50:>8.2f} {p95:>8.2f} "
+        f"{len(timings) / wall:>9.1f} {calls:>10.2f}  {dict(StandInBlogger.hits)}"
+        + (f"  errors={dict(errors)}" if errors else "")
+    )
+
+
+class UnthrottledBloggerPublisher(BloggerPublisher):
+    # Own limiter, effectively unlimited: measure transport, not the quota guard
+    platform = "blogger-benchmark"
+    rate_per_minute = 1e9
+
+
+def _measure_batch(publishes: int, publisher: BloggerPublisher):
+    StandInBlogger.hits.clear()
+
+    wall = time.perf_counter()
+    results = publisher.publish_many([_article(i) for i in range(publishes)])
+    wall = time.perf_counter() - wall
+
+    ok = sum(1 for r in results if r["status"] == "published")
+    calls = sum(StandInBlogger.hits.values()) / publishes
+    print(
+        f"{'batched':<8} {'-':>7} {'-':>8} {'-':>8} "
+        f"{ok / wall:>9.1f} {calls:>10.2f}  {dict(StandInBlogger.hits)}"
+        f"  (batch size {BLOGGER_BATCH_SIZE})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--publishes", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated server RTT")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument(
+        "--expiring-token", action="store_true",
+        help="Start with a token inside the refresh margin (exercises refresh under load)"
+    )
+    args = parser.parse_args()
+
+    server = _start_server(args.latency_ms / 1000)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    token_file = os.path.join(tempfile.mkdtemp(prefix="blogger-bench-"), "token.json")
+
+    print(f"{'path':<8} {'threads':>7} {'p50 ms':>8} {'p95 ms':>8} {'posts/s':>9} {'http/post':>10}  requests")
+
+    expires_in = timedelta(seconds=60) if args.expiring_token else timedelta(hours=1)
+
+    for threads in args.threads:
+        _write_token(token_file, expires_in)
+        _measure(
+            "legacy", args.publishes, threads,
+            lambda article: _legacy_publish(token_file, f"{base_url}/", f"{base_url}/token", article)
+        )
+
+        _write_token(token_file, expires_in)
+        publisher = BloggerPublisher(client=BloggerClient(
+            token_file=token_file,
+            api_endpoint=f"{base_url}/",
+            token_uri=f"{base_url}/token"
+        ))
+        _measure("cached", args.publishes, threads, publisher.publish)
+
+    _write_token(token_file, expires_in)
+    _measure_batch(args.publishes, UnthrottledBloggerPublisher(client=BloggerClient(
+        token_file=token_file,
+        api_endpoint=f"{base_url}/",
+        token_uri=f"{base_url}/token"
+    )))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+HTML rendering benchmark: articles/sec, one-by-one vs build_blog_html_many().
+
+    cd backend
+    python -m benchmarks.html_benchmark --articles 5000 --workers 8
+
+Renders synthetic structures in memory; no database is needed.
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from services.html_builder import HTML_RENDER_WORKERS, build_blog_html, build_blog_html_many
+
+WORDS = (
+    "model data cloud search ranking latency cache index content stream "
+    "python vector query article trend growth update release guide"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def _items(n: int, rng: random.Random) -> list:
+    items = []
+    for i in range(n):
+        structure = {
+            "summary_hook": _text(rng, 40),
+            "sections": [
+                {
+                    "heading": _text(rng, 5),
+                    "content": _text(rng, 180),
+                    "subsections": [{"content": _text(rng, 80)}]
+                }
+                for _ in range(5)
+            ],
+            "conclusion": _text(rng, 60),
+        }
+        related = [SimpleNamespace(title=_text(rng, 6)) for _ in range(5)]
+        items.append((structure, f"Article {i}: {_text(rng, 6)}", related))
+    return items
+
+
+def run(n: int, workers: int, seed: int = 7):
+    items = _items(n, random.Random(seed))
+
+    started = time.perf_counter()
+    sequential = [build_blog_html(*item) for item in items]
+    loop_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batched = build_blog_html_many(items, max_workers=workers)
+    many_s = time.perf_counter() - started
+
+    assert batched == sequential
+
+    print(f"{'path':<30} {'seconds':>8} {'articles/s':>11}")
+    print(f"{'build_blog_html loop':<30} {loop_s:>8.2f} {n / loop_s:>11,.0f}")
+    print(f"{f'build_blog_html_many ({workers}w)':<30} {many_s:>8.2f} {n / many_s:>11,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=HTML_RENDER_WORKERS)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.articles, args.workers, args.seed)
@@ -0,0 +1,72 @@
+"""
+Related-posts benchmark: index build, incremental upsert and top-k latency.
+
+    cd backend
+    python -m benchmarks.related_benchmark --articles 10000 100000
+
+Uses a throwaway index directory; no database is needed.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from services.related_index import RelatedIndex
+
+VOCAB_SIZE = 5000
+BODY_WORDS = 300
+QUERIES = 50
+
+
+def _documents(n: int, vocab: list, rng: random.Random):
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    for article_id in range(1, n + 1):
+        yield article_id, {
+            "title": " ".join(rng.choices(vocab, weights, k=6)),
+            "seo_tags": " ".join(rng.choices(vocab, weights, k=4)),
+            "body": " ".join(rng.choices(vocab, weights, k=BODY_WORDS)),
+        }
+
+
+def run(sizes: list, seed: int = 7):
+    rng = random.Random(seed)
+    vocab = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+        for _ in range(VOCAB_SIZE)
+    ]
+
+    print(f"{'articles':>9} {'build s':>8} {'upsert ms':>10} {'top5 p50 ms':>12} {'top5 max ms':>12} {'matrix MB':>10}")
+
+    for n in sizes:
+        index = RelatedIndex(directory=tempfile.mkdtemp(prefix="related-bench-"))
+
+        started = time.perf_counter()
+        index.rebuild(_documents(n, vocab, rng))
+        build = time.perf_counter() - started
+
+        extra = list(_documents(20, vocab, rng))
+        started = time.perf_counter()
+        for article_id, document in extra:
+            index.upsert(n + article_id, document)
+        upsert_ms = (time.perf_counter() - started) * 1000 / len(extra)
+
+        queries = [document for _, document in _documents(QUERIES, vocab, rng)]
+        samples = []
+        for document in queries:
+            started = time.perf_counter()
+            index.neighbours(document, 5)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        print(
+            f"{n:>9} {build:>8.1f} {upsert_ms:>10.2f} {statistics.median(samples):>12.2f} "
+            f"{max(samples):>12.2f} {index.info()['bytes'] / 1e6:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.articles, args.seed)
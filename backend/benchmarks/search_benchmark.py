@@ -0,0 +1,132 @@
+"""
+Search benchmark: legacy ILIKE title scan vs the search index.
+
+    cd backend
+    python -m benchmarks.search_benchmark --sizes 10000 100000
+
+Runs against a throwaway SQLite file, never the configured database.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="search-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from database import engine, SessionLocal, Base  # noqa: E402
+from models import Article  # noqa: E402
+from services import search_index  # noqa: E402
+
+VOCAB_SIZE = 5000
+BODY_WORDS = 150
+QUERIES = 25
+
+
+def _vocabulary(rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(4, 9)))
+        for _ in range(VOCAB_SIZE)
+    ]
+
+
+def _populate(n: int, vocab: list, rng: random.Random):
+    Base.metadata.drop_all(bind=engine, tables=[Article.__table__])
+    Base.metadata.create_all(bind=engine, tables=[Article.__table__])
+
+    # Zipf-ish sampling so some terms are common and most are rare
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+
+    rows = []
+    for i in range(n):
+        title = " ".join(rng.choices(vocab, weights, k=6))
+        body = " ".join(rng.choices(vocab, weights, k=BODY_WORDS))
+        rows.append({
+            "title": title,
+            "content": "",
+            "canonical_content": f"<p>{body}</p>",
+            "seo_tags": ",".join(rng.choices(vocab, weights, k=4)),
+            "meta_description": body[:150],
+            "status": "published",
+            "is_deleted": False,
+            "view_count": 0,
+            "rewrite_count": 0,
+        })
+        if len(rows) == 5000:
+            with engine.begin() as conn:
+                conn.execute(Article.__table__.insert(), rows)
+            rows = []
+
+    if rows:
+        with engine.begin() as conn:
+            conn.execute(Article.__table__.insert(), rows)
+
+
+def _timed(fn, queries: list) -> tuple:
+    samples = []
+    results = 0
+    for query in queries:
+        started = time.perf_counter()
+        results += len(fn(query))
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples), results
+
+
+def _ilike(db):
+    def run(keyword):
+        return (
+            db.query(Article.id)
+            .filter(
+                Article.title.ilike(f"%{keyword}%"),
+                Article.status == "published"
+            )
+            .all()
+        )
+    return run
+
+
+def _indexed(db, backend):
+    def run(keyword):
+        return backend.search(db, keyword, 20, 0)
+    return run
+
+
+def run(sizes: list, seed: int = 7):
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng)
+    queries = rng.sample(vocab[:500], QUERIES)
+
+    backends = [search_index.InMemoryBackend()]
+    if search_index._fts5_available():
+        backends.insert(0, search_index.SqliteFtsBackend())
+
+    print(f"{'articles':>9} {'path':<16} {'build s':>8} {'p50 ms':>8} {'max ms':>8} {'hits':>8}")
+
+    for n in sizes:
+        _populate(n, vocab, rng)
+        db = SessionLocal()
+        try:
+            p50, worst, hits = _timed(_ilike(db), queries)
+            print(f"{n:>9} {'ilike (title)':<16} {'-':>8} {p50:>8.2f} {worst:>8.2f} {hits:>8}")
+
+            for backend in backends:
+                search_index._backend = backend
+                started = time.perf_counter()
+                search_index.rebuild_index(db)
+                build = time.perf_counter() - started
+
+                p50, worst, hits = _timed(_indexed(db, backend), queries)
+                print(f"{n:>9} {backend.name:<16} {build:>8.1f} {p50:>8.2f} {worst:>8.2f} {hits:>8}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.sizes, args.seed)
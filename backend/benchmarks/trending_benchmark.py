@@ -0,0 +1,160 @@
+"""
+Trending benchmark: legacy ORDER BY views queries vs the trending engine.
+
+    cd backend
+    python -m benchmarks.trending_benchmark --articles 100000
+
+Runs against a throwaway SQLite file, never the configured database.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="trending-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from database import engine, SessionLocal, Base  # noqa: E402
+from models import Article  # noqa: E402
+from models_analytics import ArticleDailyViews  # noqa: E402
+from services.pagination import article_list_columns  # noqa: E402
+from services.trending_engine import TrendingEngine  # noqa: E402
+
+WINDOW_DAYS = 14
+READS = 200
+VIEW_EVENTS = 1_000_000
+
+
+def _populate(n: int, rng: random.Random):
+    tables = [Article.__table__, ArticleDailyViews.__table__]
+    Base.metadata.drop_all(bind=engine, tables=tables)
+    Base.metadata.create_all(bind=engine, tables=tables)
+
+    today = datetime.utcnow().date()
+    created = datetime.utcnow() - timedelta(days=365)
+
+    articles, daily = [], []
+    for i in range(1, n + 1):
+        # Heavy-tailed lifetime views: old posts dominate a lifetime ranking
+        lifetime = int(rng.paretovariate(1.2) * 10)
+        articles.append({
+            "id": i,
+            "title": f"Article {i}",
+            "content": "",
+            "status": "published",
+            "is_deleted": False,
+            "platform_target": "blogger",
+            "created_at": created,
+            "views": lifetime,
+            "view_count": lifetime,
+            "rewrite_count": 0,
+        })
+        for _ in range(rng.randint(0, 4)):
+            daily.append({
+                "article_id": i,
+                "day": today - timedelta(days=rng.randrange(WINDOW_DAYS)),
+                "views": rng.randint(1, 50),
+            })
+
+    with engine.begin() as conn:
+        for start in range(0, len(articles), 5000):
+            conn.execute(Article.__table__.insert(), articles[start:start + 5000])
+
+        # (article_id, day) is the primary key: keep one row per pair
+        unique = {(row["article_id"], row["day"]): row for row in daily}
+        rows = list(unique.values())
+        for start in range(0, len(rows), 5000):
+            conn.execute(ArticleDailyViews.__table__.insert(), rows[start:start + 5000])
+
+    return len(rows)
+
+
+def _timed(fn, runs: int) -> tuple:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def run(n: int, seed: int = 7):
+    rng = random.Random(seed)
+
+    started = time.perf_counter()
+    daily_rows = _populate(n, rng)
+    print(f"Populated {n} articles, {daily_rows} daily view rows in {time.perf_counter() - started:.1f}s\n")
+
+    db = SessionLocal()
+    try:
+        legacy_public = lambda: (
+            db.query(Article)
+            .options(article_list_columns())
+            .filter(Article.status == "published")
+            .order_by(Article.views.desc())
+            .limit(6)
+            .all()
+        )
+        legacy_analytics = lambda: (
+            db.query(Article)
+            .options(article_list_columns())
+            .filter(Article.status == "published", Article.is_deleted == False)
+            .order_by(Article.view_count.desc())
+            .limit(5)
+            .all()
+        )
+
+        print(f"{'path':<34} {'p50 ms':>10} {'max ms':>10}")
+        for name, fn in (
+            ("legacy /api/articles/trending", legacy_public),
+            ("legacy /analytics/trending", legacy_analytics),
+        ):
+            p50, worst = _timed(fn, 20)
+            print(f"{name:<34} {p50:>10.3f} {worst:>10.3f}")
+
+        trending = TrendingEngine(session_factory=SessionLocal, window_days=WINDOW_DAYS)
+
+        started = time.perf_counter()
+        scored = trending.seed(db)
+        seed_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        trending.refresh(db)
+        refresh_ms = (time.perf_counter() - started) * 1000
+
+        p50, worst = _timed(lambda: trending.top(6), READS)
+        print(f"{'engine top(6)':<34} {p50:>10.4f} {worst:>10.4f}")
+        p50, worst = _timed(lambda: trending.top(50), READS)
+        print(f"{'engine top(50)':<34} {p50:>10.4f} {worst:>10.4f}")
+
+        ids = [rng.randint(1, n) for _ in range(VIEW_EVENTS)]
+        started = time.perf_counter()
+        for article_id in ids:
+            trending.record(article_id)
+        record_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        trending.refresh(db)
+        refresh_after_ms = (time.perf_counter() - started) * 1000
+
+        print()
+        print(f"seed (one grouped query):   {seed_ms:>9.1f} ms for {scored} scored articles")
+        print(f"refresh (top {trending.top_k}):           {refresh_ms:>9.1f} ms  ({refresh_after_ms:.1f} ms after views)")
+        print(f"record():                   {VIEW_EVENTS / record_s:>9,.0f} views/s")
+
+        legacy_ids = [row.id for row in legacy_analytics()]
+        engine_ids = [row["id"] for row in trending.top(5)]
+        print(f"\nlifetime top 5: {legacy_ids}\ntrending top 5: {engine_ids}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.articles, args.seed)
@@ -47,4 +47,16 @@ def get_db_info():
         "database_url": DATABASE_URL.split("@")[-1] if "@" in DATABASE_URL else DATABASE_URL.split("///")[-1],
         "database_type": "sqlite" if is_sqlite else "postgresql",
         "pool_size": engine.pool.size() if hasattr(engine.pool, 'size') else "N/A",
-    }
\ No newline at end of file
+    }
+
+def dialect_insert(table):
+    """
+    INSERT construct for the active dialect (supports on_conflict_do_update
+    on both SQLite and PostgreSQL).
+    """
+    if is_sqlite:
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+
+    return insert(table)
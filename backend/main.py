@@ -15,17 +15,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 from database import engine, get_db_info
+from migrations import run_migrations
 import models
+import models_trend_memory
+import models_analytics
+import models_ctr
+import models_jobs
+import models_publish
+import models_reoptimize
 
 from routes.public import router as public_router
 from routes.owner import router as owner_router
+from routes.public_analytics import router as public_analytics_router
 from routes.auth import router as auth_router
 
-from services.scheduler import start_scheduler
+from services.view_counter import view_counter
+from services.pagination import NEXT_CURSOR_HEADER
+from services.search_index import init_search_index
+from services.trending_engine import trending_engine
+from services.related_index import init_related_index
 
 try:
     models.Base.metadata.create_all(bind=engine)
     logger.info("Database tables created successfully")
+    applied = run_migrations(engine)
+    if applied:
+        logger.info(f"Database migrations applied: {applied}")
     db_info = get_db_info()
     logger.info(f"Database Info: {db_info}")
 except Exception as e:
@@ -36,17 +51,25 @@ except Exception as e:
 async def lifespan(app: FastAPI):
     logger.info("🚀 Application starting up...")
     
-    try:
-        start_scheduler()
-        logger.info("✅ Scheduler started successfully")
-    except Exception as e:
-        logger.exception(f"❌ Scheduler failed to start: {e}")
+    # Scheduled jobs (auto publish, CTR optimization, rollups) run in
+    # the separate `python -m worker` process, not in the API workers
+
+    view_counter.start()
+    init_search_index()
+    init_related_index()
+    trending_engine.start()
     
     logger.info("✅ Application startup complete")
     
     yield
     
     logger.info("🛑 Application shutting down...")
+
+    trending_engine.stop()
+
+    # Flush buffered page views so no counts are lost
+    view_counter.stop()
+
     logger.info("✅ Application shutdown complete")
 
 app = FastAPI(
@@ -75,10 +98,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # "*" is taken literally on credentialed requests: name each header
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 app.include_router(public_router, tags=["Public"])
+app.include_router(public_analytics_router, tags=["Public Analytics"])
 app.include_router(owner_router, tags=["Owner/Admin"])
 app.include_router(auth_router, tags=["Authentication"])
 
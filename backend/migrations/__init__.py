@@ -0,0 +1,98 @@
+import importlib
+import logging
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import text, inspect
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+# Arbitrary constant shared by every process running migrations (PostgreSQL only)
+ADVISORY_LOCK_ID = 7341002
+
+
+# =========================
+# DISCOVERY
+# =========================
+
+def load_migrations() -> list:
+    """
+    Imports migrations/versions/m<NNNN>_*.py ordered by revision.
+    Each module defines `revision`, `description` and `upgrade(conn)`.
+    """
+    from migrations import versions
+
+    modules = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        if not info.name.startswith("m"):
+            continue
+        modules.append(importlib.import_module(f"{versions.__name__}.{info.name}"))
+
+    return sorted(modules, key=lambda m: m.revision)
+
+
+# =========================
+# RUNNER
+# =========================
+
+def _ensure_table(conn):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version VARCHAR(32) PRIMARY KEY, "
+        "description VARCHAR(255), "
+        "applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def applied_versions(conn) -> set:
+    if not inspect(conn).has_table(MIGRATIONS_TABLE):
+        return set()
+    return {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+
+def run_migrations(engine) -> list:
+    """
+    Applies pending migrations, each in its own transaction.
+    Safe to call from several workers at once.
+    Returns the list of revisions applied.
+    """
+    applied = []
+
+    for migration in load_migrations():
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+
+            _ensure_table(conn)
+            if migration.revision in applied_versions(conn):
+                continue
+
+            logger.info(f"Applying migration {migration.revision}: {migration.description}")
+            migration.upgrade(conn)
+
+            conn.execute(
+                text(
+                    f"INSERT INTO {MIGRATIONS_TABLE} (version, description, applied_at) "
+                    "VALUES (:version, :description, :applied_at)"
+                ),
+                {
+                    "version": migration.revision,
+                    "description": migration.description,
+                    "applied_at": datetime.utcnow(),
+                }
+            )
+            applied.append(migration.revision)
+
+    return applied
+
+
+def migration_status(engine) -> list:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+
+    return [
+        (m.revision, m.description, m.revision in done)
+        for m in load_migrations()
+    ]
@@ -0,0 +1,48 @@
+import argparse
+import sys
+
+from database import engine, Base
+import models
+import models_trend_memory
+import models_analytics
+import models_ctr
+import models_jobs
+import models_publish
+import models_reoptimize
+
+from migrations import run_migrations, migration_status
+from migrations.explain import check_hot_query_plans
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m migrations")
+    parser.add_argument(
+        "command",
+        choices=["upgrade", "status", "check"],
+        help="upgrade: apply pending | status: list | check: EXPLAIN hot queries"
+    )
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        Base.metadata.create_all(bind=engine)
+        applied = run_migrations(engine)
+        print(f"Applied: {', '.join(applied) or 'nothing (up to date)'}")
+        return 0
+
+    if args.command == "status":
+        for revision, description, done in migration_status(engine):
+            print(f"[{'x' if done else ' '}] {revision}  {description}")
+        return 0
+
+    failures = 0
+    for name, (indexed, plan) in check_hot_query_plans(engine).items():
+        print(f"{'OK  ' if indexed else 'FAIL'} {name}")
+        for line in plan.splitlines():
+            print(f"       {line}")
+        failures += not indexed
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
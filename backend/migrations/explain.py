@@ -0,0 +1,86 @@
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+from services.auto_scheduler import auto_publish_queue
+from services.ctr_scheduler import eligible_articles_query
+from services.dashboard_service import overview_stats_query
+from services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    admin_articles_query,
+    encode_cursor,
+    keyset_query,
+    published_articles_query
+)
+from services.trending_engine import most_viewed_query
+
+# =========================
+# HOT QUERIES
+# =========================
+# Built by the same functions the call sites use, so the checked plans
+# cannot drift from production queries.
+
+def _hot_queries(db: Session) -> dict:
+    cursor = encode_cursor(datetime.utcnow(), 1_000_000)
+
+    return {
+        # trending_engine fill, dashboard top/low views, newsletter
+        "trending_by_views": most_viewed_query(db, 5),
+        # services/ctr_scheduler.run_ctr_optimization
+        "ctr_candidates": eligible_articles_query(db, skip_optimized_since=datetime.utcnow()),
+        # services/auto_scheduler.pick_best_article_to_publish
+        "auto_publish_pick": auto_publish_queue(db).limit(1),
+        # services/dashboard_service.get_overview_stats (one pass, SUM(CASE))
+        "overview_stats": overview_stats_query(db),
+        # routes/public.get_all_articles (keyset page)
+        "public_list_page": keyset_query(published_articles_query(db), DEFAULT_PAGE_SIZE, cursor),
+        # routes/owner.admin_articles (first keyset page)
+        "admin_list_page": keyset_query(admin_articles_query(db), DEFAULT_PAGE_SIZE),
+    }
+
+
+# =========================
+# PLAN INSPECTION
+# =========================
+
+def explain(conn, statement) -> str:
+    if isinstance(statement, Query):
+        statement = statement.statement
+
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        return "\n".join(row[-1] for row in rows)
+
+    rows = conn.exec_driver_sql(f"EXPLAIN {sql}").fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+def uses_index(dialect: str, plan: str) -> bool:
+    if dialect == "sqlite":
+        scans = [line for line in plan.splitlines() if "articles" in line]
+        return bool(scans) and all("USING" in line and "INDEX" in line for line in scans)
+
+    return "Index" in plan and "Seq Scan on articles" not in plan
+
+
+def check_hot_query_plans(engine) -> dict:
+    """
+    Runs EXPLAIN for every hot query.
+    Returns {name: (uses_index, plan)}.
+    """
+    results = {}
+
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # Tiny tables always seq-scan; ask whether an index path exists at all
+            conn.execute(text("SET enable_seqscan = off"))
+
+        with Session(bind=conn) as db:
+            for name, statement in _hot_queries(db).items():
+                plan = explain(conn, statement)
+                results[name] = (uses_index(conn.dialect.name, plan), plan)
+
+    return results
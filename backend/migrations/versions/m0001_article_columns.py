@@ -0,0 +1,33 @@
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
+from models import Article
+
+revision = "0001"
+description = "Add Article columns missing from databases created by older models"
+
+
+def upgrade(conn):
+    inspector = inspect(conn)
+    if not inspector.has_table(Article.__tablename__):
+        return
+
+    existing = {col["name"] for col in inspector.get_columns(Article.__tablename__)}
+
+    for column in Article.__table__.columns:
+        if column.name in existing:
+            continue
+
+        ddl = CreateColumn(column).compile(dialect=conn.dialect)
+        default = column.default.arg if column.default is not None and column.default.is_scalar else None
+
+        # ADD COLUMN ... NOT NULL needs a default on existing rows
+        if default is not None:
+            literal = column.type.literal_processor(conn.dialect)(default)
+            conn.exec_driver_sql(
+                f"ALTER TABLE {Article.__tablename__} ADD COLUMN {ddl} DEFAULT {literal}"
+            )
+        else:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {Article.__tablename__} ADD COLUMN {str(ddl).replace(' NOT NULL', '')}"
+            )
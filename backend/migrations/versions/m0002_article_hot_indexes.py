@@ -0,0 +1,20 @@
+from models import Article
+
+revision = "0002"
+description = "Composite / partial indexes for Article hot filters"
+
+INDEX_NAMES = (
+    "ix_articles_status_deleted_views",
+    "ix_articles_status_published_at",
+    "ix_articles_auto_publish_queue",
+    "ix_articles_status_created",
+    "ix_articles_deleted_created",
+)
+
+
+def upgrade(conn):
+    # Definitions live on the model so fresh databases get them from create_all
+    indexes = {index.name: index for index in Article.__table__.indexes}
+
+    for name in INDEX_NAMES:
+        indexes[name].create(bind=conn, checkfirst=True)
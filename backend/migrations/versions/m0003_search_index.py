@@ -0,0 +1,9 @@
+from services.search_index import get_search_backend
+
+revision = "0003"
+description = "Full-text search index (FTS5 table or tsvector + GIN)"
+
+
+def upgrade(conn):
+    # Backfill stays in init_search_index(); this only guarantees the schema
+    get_search_backend().ensure_schema(conn)
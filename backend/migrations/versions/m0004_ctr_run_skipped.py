@@ -0,0 +1,19 @@
+from sqlalchemy import inspect
+
+from models_ctr import CtrRun
+
+revision = "0004"
+description = "Add ctr_runs.skipped (articles no longer CTR-weak when their batch ran)"
+
+
+def upgrade(conn):
+    inspector = inspect(conn)
+    if not inspector.has_table(CtrRun.__tablename__):
+        return
+
+    if "skipped" in {col["name"] for col in inspector.get_columns(CtrRun.__tablename__)}:
+        return
+
+    conn.exec_driver_sql(
+        f"ALTER TABLE {CtrRun.__tablename__} ADD COLUMN skipped INTEGER NOT NULL DEFAULT 0"
+    )
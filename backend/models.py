@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
 from datetime import datetime
 from database import Base
 
@@ -14,4 +14,68 @@ class Article(Base):
     views = Column(Integer, default=0)
     published_at = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    canonical_content = Column(Text)
+    platform_target = Column(String(50), default="blogger")
+
+    seo_title = Column(String(255))
+    meta_description = Column(String(500))
+    seo_tags = Column(String(500))
+
+    view_count = Column(Integer, default=0, nullable=False)
+    rewrite_count = Column(Integer, default=0, nullable=False)
+    last_optimized_at = Column(DateTime)
+
+    auto_publish = Column(Boolean, default=False)
+    ads_enabled = Column(Boolean, default=False)
+    verified = Column(Boolean, default=False)
+
+    is_deleted = Column(Boolean, default=False, nullable=False)
+    deleted_at = Column(DateTime)
+
+
+# =========================
+# HOT-PATH INDEXES
+# =========================
+# Also created on existing databases by migrations/versions/m0002_article_hot_indexes.py
+
+# Trending, top / low-view dashboards, newsletter: status + not deleted, by views
+Index(
+    "ix_articles_status_deleted_views",
+    Article.status,
+    Article.is_deleted,
+    Article.view_count.desc()
+)
+
+# CTR optimization, publish date windows
+Index(
+    "ix_articles_status_published_at",
+    Article.status,
+    Article.published_at
+)
+
+# pick_best_article_to_publish (live rows only)
+Index(
+    "ix_articles_auto_publish_queue",
+    Article.status,
+    Article.auto_publish,
+    Article.rewrite_count.desc(),
+    Article.created_at,
+    sqlite_where=Article.is_deleted == False,
+    postgresql_where=Article.is_deleted == False
+)
+
+# Keyset pages: public list (by status) and admin list (by is_deleted)
+Index(
+    "ix_articles_status_created",
+    Article.status,
+    Article.created_at.desc(),
+    Article.id.desc()
+)
+Index(
+    "ix_articles_deleted_created",
+    Article.is_deleted,
+    Article.created_at.desc(),
+    Article.id.desc()
+)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Index
+from datetime import datetime
+from database import Base
+
+
+class ArticleDailyViews(Base):
+    """
+    Per-article, per-day view totals fed by the view counter flush.
+    No FK on article_id: a bad id must never wedge a whole flush batch.
+    """
+    __tablename__ = "article_daily_views"
+
+    article_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    views = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        # Chart range scans: WHERE day BETWEEN ... (covering, no table lookup)
+        Index("ix_article_daily_views_day_views", "day", "article_id", "views"),
+    )
+
+
+class ViewRollup(Base):
+    """
+    Site-wide view totals for closed weeks / months.
+    """
+    __tablename__ = "view_rollups"
+
+    period = Column(String(10), primary_key=True)  # "weekly" | "monthly"
+    bucket_start = Column(Date, primary_key=True)
+    views = Column(Integer, default=0, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from datetime import datetime
+from database import Base
+
+
+class CtrRun(Base):
+    """
+    Summary of one CTR optimization run (shown on the dashboard).
+    """
+    __tablename__ = "ctr_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime)
+
+    # running | completed | budget_exhausted | failed
+    status = Column(String(30), default="running", nullable=False)
+    stop_reason = Column(String(255))
+
+    eligible = Column(Integer, default=0, nullable=False)
+    optimized = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    deferred = Column(Integer, default=0, nullable=False)
+    # No longer CTR-weak (or gone) by the time its batch ran
+    skipped = Column(Integer, default=0, nullable=False)
+
+    llm_calls = Column(Integer, default=0, nullable=False)
+    duration_seconds = Column(Float, default=0.0, nullable=False)
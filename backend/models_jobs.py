@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from database import Base
+
+
+class Job(Base):
+    """
+    Durable background job, claimed by `python -m worker` under a lease.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    kind = Column(String(100), nullable=False)
+    payload = Column(Text, default="{}", nullable=False)  # JSON
+
+    # Enqueueing the same key twice is a no-op
+    idempotency_key = Column(String(255), unique=True)
+
+    # queued | running | succeeded | dead
+    status = Column(String(20), default="queued", nullable=False)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    lease_owner = Column(String(100))
+    lease_expires_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+
+    last_error = Column(Text)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Claim scan: due queued jobs, and running jobs with expired leases
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+        Index("ix_jobs_status_lease", "status", "lease_expires_at"),
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from database import Base
+
+
+class PublishRequest(Base):
+    """
+    Outbox row for one (article, platform) publish.
+    The article sits in status "publishing" while any of its rows is in flight.
+    """
+    __tablename__ = "publish_requests"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    article_id = Column(Integer, nullable=False, index=True)
+    platform = Column(String(50), nullable=False)
+
+    # publishing | published | failed | unknown (interrupted, outcome not recorded)
+    status = Column(String(20), default="publishing", nullable=False)
+
+    # Article status to restore if every platform fails
+    previous_status = Column(String(50))
+
+    post_id = Column(String(255))
+    url = Column(String(500))
+    error = Column(Text)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Reconciler scan: in-flight rows by age
+        Index("ix_publish_requests_status_created", "status", "created_at"),
+    )
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime
+from datetime import datetime
+from database import Base
+
+
+class ReoptimizeRun(Base):
+    """
+    One bulk re-optimization run over the articles matching `filters`.
+    Progress is checkpointed here, so an interrupted run resumes where it stopped.
+    """
+    __tablename__ = "reoptimize_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    filters = Column(Text, default="{}", nullable=False)  # JSON
+
+    # queued | running | completed | cancelled | failed
+    status = Column(String(20), default="queued", nullable=False)
+    stop_reason = Column(String(255))
+
+    total = Column(Integer, default=0, nullable=False)
+    optimized = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+
+    # Every matching article with id <= checkpoint_id has been handled
+    checkpoint_id = Column(Integer, default=0, nullable=False)
+
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    output_tokens = Column(Integer, default=0, nullable=False)
+
+    # Summed over every attempt (excludes time spent queued)
+    active_seconds = Column(Float, default=0.0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
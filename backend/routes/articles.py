@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from models import Article
+from services.view_counter import view_counter
 
 router = APIRouter(prefix="/api/articles", tags=["Articles"])
 
@@ -24,8 +25,7 @@ def read_article(article_id: int, db: Session = Depends(get_db)):
     if not article or article.status != "published":
         raise HTTPException(status_code=404, detail="Article not found")
 
-    # 🔥 Atomic view increment
-    article.view_count += 1
-    db.commit()
+    # 🔥 Buffered view increment (flushed as one atomic UPDATE batch)
+    view_counter.record(article.id)
 
     return article
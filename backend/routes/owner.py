@@ -1,29 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
+import json
+import logging
+import time
 
 # =========================
 # LOCAL IMPORTS (DOCKER SAFE)
 # =========================
 from database import SessionLocal
 from models import Article
+from models_publish import PublishRequest
+from models_reoptimize import ReoptimizeRun
 from auth import verify_owner
 from schemas import (
     ArticleListOut,
-    ArticleUpdateRequest
+    ArticleUpdateRequest,
+    BulkReoptimizeRequest,
+    PublishBatchRequest
 )
 
-from services.publishers.blogger import BloggerPublisher
+from services.publishers.registry import PUBLISHERS
+from services.publish_outbox import (
+    begin_publish,
+    publish_request_out,
+    run_publish_requests,
+    status_url
+)
 from services.seo_generator import generate_seo
-from services.blog_structure import generate_structured_blog
-from services.html_builder import build_blog_html
+from services.blog_structure import stream_structured_blog
+from services.html_builder import BlogHtmlBuilder
 from services.related_block import get_related_posts
 from services.dashboard_service import (
     get_overview_stats,
-    get_trending_memory_stats
+    get_trending_memory_stats,
+    get_ctr_run_history
 )
 from services.auto_scheduler import pick_best_article_to_publish
+from services.llm_cache import get_llm_cache
+from services.job_queue import enqueue, queue_stats
+from services.reoptimizer import (
+    apply_reoptimization,
+    create_run,
+    is_draining,
+    rebuild_article_html,
+    run_progress
+)
+from services.search_index import sync_article
+from services.stats_cache import invalidate_overview_stats
+from services.article_cache import article_response_cache, evict_article_response
+from services.trending_engine import trending_engine
+from services.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    admin_articles_query,
+    keyset_page
+)
+
+logger = logging.getLogger(__name__)
 
 # =========================
 # ROUTER
@@ -57,14 +93,54 @@ def admin_traffic(db: Session = Depends(get_db)):
     return get_trending_memory_stats(db)
 
 
+@router.get("/llm-cache/stats")
+def llm_cache_stats():
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False, "families": {}}
+
+    return {"enabled": True, "families": cache.stats()}
+
+
+@router.get("/article-cache/stats")
+def article_cache_stats():
+    if article_response_cache is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **article_response_cache.info()}
+
+
+@router.get("/jobs/stats")
+def job_queue_stats(db: Session = Depends(get_db)):
+    return queue_stats(db)
+
+
+@router.get("/ctr/runs")
+def ctr_runs(
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    return get_ctr_run_history(db, limit)
+
+
 @router.get("/articles", response_model=List[ArticleListOut])
-def admin_articles(db: Session = Depends(get_db)):
-    return (
-        db.query(Article)
-        .filter(Article.is_deleted == False)
-        .order_by(Article.created_at.desc())
-        .all()
-    )
+def admin_articles(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    query = admin_articles_query(db)
+
+    try:
+        articles, next_cursor = keyset_page(query, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return articles
 
 # =========================
 # PHASE 4.4 — SOFT DELETE
@@ -79,7 +155,11 @@ def soft_delete_article(article_id: int, db: Session = Depends(get_db)):
     article.deleted_at = datetime.utcnow()
     article.status = "deleted"
 
+    sync_article(db, article)
     db.commit()
+    invalidate_overview_stats()
+    evict_article_response(article_id)
+    trending_engine.forget(article_id)
     return {"message": "Article soft-deleted"}
 
 
@@ -97,7 +177,10 @@ def restore_article(article_id: int, db: Session = Depends(get_db)):
     article.deleted_at = None
     article.status = "approved"
 
+    sync_article(db, article)
     db.commit()
+    invalidate_overview_stats()
+    evict_article_response(article_id)
     return {"message": "Article restored successfully"}
 
 # =========================
@@ -146,50 +229,105 @@ def disable_ads(article_id: int, db: Session = Depends(get_db)):
 # =========================
 # PHASE 7 — AI AUTO SCHEDULER
 # =========================
-@router.post("/auto-scheduler/run")
-def run_auto_scheduler(db: Session = Depends(get_db)):
+@router.post("/auto-scheduler/run", status_code=202)
+def run_auto_scheduler(
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     article = pick_best_article_to_publish(db)
 
     if not article:
+        response.status_code = 200
         return {"message": "No article ready for auto-publish"}
 
-    if article.is_deleted or article.status == "published":
+    article_id = article.id
+    request_ids, skipped = begin_publish(db, [article_id], ["blogger"])
+
+    if not request_ids:
+        response.status_code = 200
         return {"message": "Article not eligible for publishing"}
 
-    publisher = BloggerPublisher()
-    result = publisher.publish(article)
-
-    article.status = "published"
-    article.published_at = datetime.utcnow()
-    db.commit()
+    background_tasks.add_task(run_publish_requests, request_ids)
 
     return {
-        "message": "Auto-scheduler published article",
-        "article_id": article.id,
-        "url": result.get("url")
+        "message": "Auto-scheduler publish started",
+        "article_id": article_id,
+        "request_id": request_ids[0],
+        "status_url": status_url(request_ids[0])
     }
 
 # =========================
 # MANUAL PUBLISH
 # =========================
-@router.post("/articles/{article_id}/publish")
-def publish_article(article_id: int, db: Session = Depends(get_db)):
-    article = db.query(Article).filter(Article.id == article_id).first()
+@router.post("/articles/{article_id}/publish", status_code=202)
+def publish_article(
+    article_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    request_ids, skipped = begin_publish(db, [article_id], ["blogger"])
 
-    if not article or article.is_deleted:
-        raise HTTPException(status_code=404, detail="Article not publishable")
+    if not request_ids:
+        status = skipped[0]["status"]
+        if status == "not_found":
+            raise HTTPException(status_code=404, detail="Article not publishable")
 
-    if article.status == "published":
-        return {"message": "Article already published"}
+        response.status_code = 200
+        return {"message": f"Article {status.replace('_', ' ')}"}
 
-    publisher = BloggerPublisher()
-    result = publisher.publish(article)
+    # Network call runs after the response, with no DB session held
+    background_tasks.add_task(run_publish_requests, request_ids)
 
-    article.status = "published"
-    article.published_at = datetime.utcnow()
-    db.commit()
+    return {
+        "message": "Publish started",
+        "request_id": request_ids[0],
+        "status_url": status_url(request_ids[0])
+    }
+
+# =========================
+# BATCH PUBLISH
+# =========================
+@router.post("/articles/publish-batch", status_code=202)
+def publish_articles_batch(
+    payload: PublishBatchRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    unsupported = [p for p in payload.platforms if p.lower() not in PUBLISHERS]
+    if unsupported:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported platforms: {', '.join(unsupported)}"
+        )
+
+    request_ids, skipped = begin_publish(db, payload.article_ids, payload.platforms)
+    if not request_ids:
+        # Nothing was claimed: no status URL to poll
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "No articles could be published", "skipped": skipped}
+        )
+
+    background_tasks.add_task(run_publish_requests, request_ids)
+
+    return {
+        "requests": [
+            {"request_id": request_id, "status_url": status_url(request_id)}
+            for request_id in request_ids
+        ],
+        "skipped": skipped
+    }
+
+
+@router.get("/publish-requests/{request_id}")
+def get_publish_request(request_id: int, db: Session = Depends(get_db)):
+    request = db.query(PublishRequest).filter(PublishRequest.id == request_id).first()
+    if not request:
+        raise HTTPException(status_code=404, detail="Publish request not found")
 
-    return {"message": "Published successfully", "url": result.get("url")}
+    return publish_request_out(request)
 
 # =========================
 # PHASE 4.3 — EDIT
@@ -204,6 +342,9 @@ def update_article(
     if not article or article.is_deleted:
         raise HTTPException(status_code=404, detail="Article not editable")
 
+    if article.status == "publishing":
+        raise HTTPException(status_code=409, detail="Article is being published")
+
     if payload.title:
         article.title = payload.title
 
@@ -214,7 +355,10 @@ def update_article(
     article.rewrite_count += 1
     article.last_optimized_at = datetime.utcnow()
 
+    sync_article(db, article)
     db.commit()
+    invalidate_overview_stats()
+    evict_article_response(article_id)
     return {"message": "Article updated successfully"}
 
 # =========================
@@ -226,25 +370,153 @@ def re_optimize_article(article_id: int, db: Session = Depends(get_db)):
     if not article or article.is_deleted:
         raise HTTPException(status_code=404, detail="Article not optimizable")
 
-    structure = generate_structured_blog(article.title)
-    related_posts = get_related_posts(db)
+    new_html = rebuild_article_html(db, article)
+    seo = generate_seo(article.title, new_html)
 
-    new_html = build_blog_html(
-        structure=structure,
-        title=article.title,
-        related_posts=related_posts
-    )
+    apply_reoptimization(db, article, new_html, seo)
+    db.commit()
+    invalidate_overview_stats()
+    evict_article_response(article_id)
+    return {"message": "Article re-optimized successfully"}
 
-    seo = generate_seo(article.title, new_html)
+# =========================
+# BULK RE-OPTIMIZATION
+# =========================
+@router.post("/articles/re-optimize/bulk", status_code=202)
+def start_bulk_reoptimize(payload: BulkReoptimizeRequest, db: Session = Depends(get_db)):
+    """
+    Queues a re-optimization run over every matching article.
+    The worker runs it; poll the returned status URL for progress.
+    """
+    run = create_run(db, payload.model_dump())
+    enqueue(db, "bulk_reoptimize", {"run_id": run.id}, idempotency_key=f"bulk_reoptimize:{run.id}")
+    db.commit()
 
-    article.canonical_content = new_html
-    article.seo_title = seo.get("seo_title")
-    article.meta_description = seo.get("meta_description")
-    article.seo_tags = seo.get("seo_tags")
+    return {
+        **run_progress(run),
+        "status_url": f"/api/admin/articles/re-optimize/bulk/{run.id}"
+    }
 
-    article.status = "approved"
-    article.rewrite_count += 1
-    article.last_optimized_at = datetime.utcnow()
 
+def _get_reoptimize_run(db: Session, run_id: int) -> ReoptimizeRun:
+    run = db.query(ReoptimizeRun).filter(ReoptimizeRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Re-optimize run not found")
+    return run
+
+
+@router.get("/articles/re-optimize/bulk/{run_id}")
+def bulk_reoptimize_progress(run_id: int, db: Session = Depends(get_db)):
+    return run_progress(_get_reoptimize_run(db, run_id))
+
+
+@router.post("/articles/re-optimize/bulk/{run_id}/cancel")
+def cancel_bulk_reoptimize(run_id: int, db: Session = Depends(get_db)):
+    run = _get_reoptimize_run(db, run_id)
+    if run.status not in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Run is already {run.status}")
+
+    # The pipeline notices at its next checkpoint and stops
+    run.status = "cancelled"
+    run.stop_reason = "cancelled by owner"
     db.commit()
-    return {"message": "Article re-optimized successfully"}
+    return run_progress(run)
+
+
+@router.post("/articles/re-optimize/bulk/{run_id}/resume", status_code=202)
+def resume_bulk_reoptimize(run_id: int, db: Session = Depends(get_db)):
+    """
+    Continues a cancelled or failed run from its checkpoint.
+    """
+    run = _get_reoptimize_run(db, run_id)
+    if run.status not in ("cancelled", "failed"):
+        raise HTTPException(status_code=409, detail=f"Run is {run.status}")
+    if is_draining(run):
+        raise HTTPException(status_code=409, detail="Run is still stopping; retry shortly")
+
+    run.status = "queued"
+    run.stop_reason = None
+    enqueue(
+        db,
+        "bulk_reoptimize",
+        {"run_id": run.id},
+        idempotency_key=f"bulk_reoptimize:{run.id}:{datetime.utcnow().isoformat()}"
+    )
+    db.commit()
+    return run_progress(run)
+
+# =========================
+# STREAMING GENERATION (SSE)
+# =========================
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _stream_generation(title: str, related_posts: list):
+    """
+    Server-Sent Events for one structured article: each part's HTML is
+    sent as soon as its JSON is complete, while Gemini keeps writing.
+    """
+    started = time.monotonic()
+    builder = BlogHtmlBuilder(title, related_posts)
+    first_section_ms = None
+    index = 0
+
+    try:
+        for kind, value in stream_structured_blog(title):
+            if kind == "summary_hook":
+                yield _sse("intro", {"html": builder.intro(value)})
+
+            elif kind == "section":
+                html = builder.section(value)
+                if html:
+                    if first_section_ms is None:
+                        first_section_ms = int((time.monotonic() - started) * 1000)
+                    yield _sse("section", {
+                        "index": index,
+                        "heading": value.get("heading", "").strip(),
+                        "html": html
+                    })
+                    index += 1
+
+            elif kind == "conclusion":
+                yield _sse("conclusion", {"html": builder.closing(value)})
+
+            elif kind == "structure":
+                yield _sse("done", {
+                    "structure": value,
+                    "html": builder.html(),
+                    "first_section_ms": first_section_ms,
+                    "elapsed_ms": int((time.monotonic() - started) * 1000)
+                })
+
+    except ValueError as e:
+        yield _sse("error", {"detail": str(e)})
+
+    except Exception:
+        # Headers are already sent: the client only learns about it from this event
+        logger.exception(f"❌ Streaming generation failed for '{title}'")
+        yield _sse("error", {"detail": "Generation failed"})
+
+
+@router.get("/articles/generate/stream")
+def stream_generated_article(
+    title: str = Query(..., min_length=3, max_length=300),
+    db: Session = Depends(get_db)
+):
+    """
+    Preview generation for `title` as an event stream
+    (intro, section..., conclusion, done | error). Nothing is saved:
+    the "done" event carries the structure and the full HTML.
+    """
+    # Loaded up front: the session is closed while the stream runs
+    related_posts = get_related_posts(db, title=title)
+
+    return StreamingResponse(
+        _stream_generation(title, related_posts),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -1,10 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import SessionLocal
 from models import Article
-from schemas import ArticleListOut, ArticleDetailOut
+from schemas import ArticleListOut, ArticleDetailOut, ArticleSearchHit
+from services.view_counter import view_counter
+from services.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    ARTICLE_LIST_FIELDS,
+    article_list_columns,
+    published_articles_query,
+    keyset_page
+)
+from services.search_index import search_articles as run_search
+from services.trending_engine import trending_engine
+from services.article_cache import (
+    CACHE_CONTROL,
+    article_response_cache,
+    build_response,
+    etag_matches,
+    negotiate_coding
+)
 
 router = APIRouter(
     prefix="/api/articles",
@@ -25,35 +43,40 @@ def get_db():
 # GET TRENDING ARTICLES
 # =========================
 @router.get("/trending", response_model=List[ArticleListOut])
-def get_trending_articles(db: Session = Depends(get_db)):
-    articles = (
-        db.query(Article)
-        .filter(Article.status == "published")
-        .order_by(Article.views.desc())
-        .limit(6)
-        .all()
-    )
-    return articles
+def get_trending_articles():
+    # Precomputed decayed leaderboard: no DB query
+    return trending_engine.top(6)
 
 # =========================
 # GET ALL ARTICLES
 # =========================
 @router.get("/", response_model=List[ArticleListOut])
-def get_all_articles(db: Session = Depends(get_db)):
-    articles = (
-        db.query(Article)
-        .filter(Article.status == "published")
-        .all()
-    )
+def get_all_articles(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    query = published_articles_query(db)
+
+    try:
+        articles, next_cursor = keyset_page(query, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
     return articles
 
 # =========================
 # GET ARTICLE BY ID
 # =========================
 @router.get("/{article_id}", response_model=ArticleDetailOut)
-def get_article(article_id: int, db: Session = Depends(get_db)):
-    article = (
-        db.query(Article)
+def get_article(article_id: int, request: Request, db: Session = Depends(get_db)):
+    # Cheap freshness probe: only updated_at, not the (large) content
+    row = (
+        db.query(Article.updated_at)
         .filter(
             Article.id == article_id,
             Article.status == "published"
@@ -61,25 +84,98 @@ def get_article(article_id: int, db: Session = Depends(get_db)):
         .first()
     )
 
-    if not article:
+    if row is None:
         raise HTTPException(
             status_code=404,
             detail="Article not found"
         )
 
-    return article
+    entry = None
+    if article_response_cache is not None:
+        entry = article_response_cache.get(article_id, row.updated_at)
+
+    if entry is None:
+        article = (
+            db.query(Article)
+            .filter(
+                Article.id == article_id,
+                Article.status == "published"
+            )
+            .first()
+        )
+
+        if not article:
+            raise HTTPException(
+                status_code=404,
+                detail="Article not found"
+            )
+
+        entry = build_response(
+            article.updated_at,
+            ArticleDetailOut.model_validate(article, from_attributes=True).model_dump(mode="json", by_alias=True)
+        )
+        if article_response_cache is not None:
+            article_response_cache.put(article.id, entry)
+
+    view_counter.record(article_id)
+    trending_engine.record(article_id)
+
+    coding = negotiate_coding(entry, request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": entry.etags[coding],
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding"
+    }
+
+    if etag_matches(entry, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+
+    return Response(
+        content=entry.bodies[coding],
+        media_type="application/json",
+        headers=headers
+    )
 
 # =========================
 # SEARCH ARTICLES
 # =========================
-@router.get("/search/{keyword}", response_model=List[ArticleListOut])
-def search_articles(keyword: str, db: Session = Depends(get_db)):
-    results = (
-        db.query(Article)
-        .filter(
-            Article.title.ilike(f"%{keyword}%"),
-            Article.status == "published"
+@router.get("/search/{keyword}", response_model=List[ArticleSearchHit])
+def search_articles(
+    keyword: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    hits = run_search(db, keyword, limit=limit, offset=offset)
+    if not hits:
+        return []
+
+    articles = {
+        a.id: a
+        for a in (
+            db.query(Article)
+            .options(article_list_columns())
+            .filter(
+                Article.id.in_([hit.article_id for hit in hits]),
+                Article.status == "published"
+            )
+            .all()
         )
-        .all()
-    )
-    return results
+    }
+
+    # Keep the index's ranking order
+    return [
+        {
+            **{
+                field: getattr(articles[hit.article_id], field)
+                for field in ARTICLE_LIST_FIELDS
+            },
+            "score": hit.score,
+            "highlight": hit.highlight,
+        }
+        for hit in hits
+        if hit.article_id in articles
+    ]
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date
-from datetime import timedelta, date
+from sqlalchemy import func, case, and_
+from datetime import timedelta, datetime
+from typing import List
 
 from database import SessionLocal
 from models import Article
+from schemas import TimeSeriesPoint, PublicOverviewStats
+from services.stats_cache import overview_cache
+from services.trending_engine import trending_engine
+from services.view_rollups import (
+    WEEKLY,
+    MONTHLY,
+    daily_totals,
+    period_series,
+    bucket_label
+)
 
 router = APIRouter(
     prefix="/api/public/analytics",
@@ -24,16 +35,17 @@ def get_db():
 # =========================
 # OVERVIEW
 # =========================
-@router.get("/overview")
-def public_overview(db: Session = Depends(get_db)):
-    total_articles = db.query(Article).filter(Article.is_deleted == False).count()
+def _compute_public_overview(db: Session) -> dict:
+    is_live = Article.is_deleted == False
 
-    published_articles = db.query(Article).filter(
-        Article.status == "published",
-        Article.is_deleted == False
-    ).count()
-
-    total_views = db.query(func.sum(Article.view_count)).scalar() or 0
+    total_articles, published_articles, total_views = db.query(
+        func.coalesce(func.sum(case((is_live, 1), else_=0)), 0),
+        func.coalesce(func.sum(case(
+            (and_(is_live, Article.status == "published"), 1),
+            else_=0
+        )), 0),
+        func.coalesce(func.sum(Article.view_count), 0)
+    ).one()
 
     return {
         "total_articles": total_articles,
@@ -41,48 +53,37 @@ def public_overview(db: Session = Depends(get_db)):
         "total_views": total_views
     }
 
+
+@router.get("/overview", response_model=PublicOverviewStats)
+def public_overview(db: Session = Depends(get_db)):
+    stats, age = overview_cache.get_or_compute(
+        "public_overview",
+        lambda: _compute_public_overview(db)
+    )
+
+    return {**stats, "cache_age_seconds": round(age, 1)}
+
 # =========================
 # TRENDING
 # =========================
 @router.get("/trending")
-def trending_articles(limit: int = 5, db: Session = Depends(get_db)):
-    return (
-        db.query(Article)
-        .filter(
-            Article.status == "published",
-            Article.is_deleted == False
-        )
-        .order_by(Article.view_count.desc())
-        .limit(limit)
-        .all()
-    )
+def trending_articles(limit: int = Query(5, ge=1, le=50)):
+    # Precomputed decayed leaderboard: no DB query
+    return trending_engine.top(limit)
 
 # =========================
 # DAILY VIEWS (LAST 30 DAYS)
 # =========================
-@router.get("/charts/daily")
+@router.get("/charts/daily", response_model=List[TimeSeriesPoint])
 def daily_views(db: Session = Depends(get_db)):
-    today = date.today()
+    today = datetime.utcnow().date()
     start_date = today - timedelta(days=29)
 
-    rows = (
-        db.query(
-            cast(Article.created_at, Date).label("day"),
-            func.sum(Article.view_count).label("views")
-        )
-        .filter(
-            Article.status == "published",
-            Article.is_deleted == False,
-            Article.created_at >= start_date
-        )
-        .group_by("day")
-        .order_by("day")
-        .all()
-    )
+    totals = daily_totals(db, start_date, today)
 
     return [
-        {"date": row.day, "views": int(row.views)}
-        for row in rows
+        {"date": day, "views": totals.get(day, 0)}
+        for day in (start_date + timedelta(days=i) for i in range(30))
     ]
 
 # =========================
@@ -90,24 +91,9 @@ def daily_views(db: Session = Depends(get_db)):
 # =========================
 @router.get("/charts/weekly")
 def weekly_views(db: Session = Depends(get_db)):
-    rows = (
-        db.query(
-            func.strftime("%Y-%W", Article.created_at).label("week"),
-            func.sum(Article.view_count).label("views")
-        )
-        .filter(
-            Article.status == "published",
-            Article.is_deleted == False
-        )
-        .group_by("week")
-        .order_by("week")
-        .limit(12)
-        .all()
-    )
-
     return [
-        {"week": row.week, "views": int(row.views)}
-        for row in rows
+        {"week": bucket_label(WEEKLY, start), "views": views}
+        for start, views in period_series(db, WEEKLY)
     ]
 
 # =========================
@@ -115,22 +101,7 @@ def weekly_views(db: Session = Depends(get_db)):
 # =========================
 @router.get("/charts/monthly")
 def monthly_views(db: Session = Depends(get_db)):
-    rows = (
-        db.query(
-            func.strftime("%Y-%m", Article.created_at).label("month"),
-            func.sum(Article.view_count).label("views")
-        )
-        .filter(
-            Article.status == "published",
-            Article.is_deleted == False
-        )
-        .group_by("month")
-        .order_by("month")
-        .limit(12)
-        .all()
-    )
-
     return [
-        {"month": row.month, "views": int(row.views)}
-        for row in rows
+        {"month": bucket_label(MONTHLY, start), "views": views}
+        for start, views in period_series(db, MONTHLY)
     ]
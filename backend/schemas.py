@@ -19,6 +19,25 @@ class ArticleUpdateRequest(BaseModel):
     canonical_content: Optional[str] = None
 
 
+# =========================
+# BATCH PUBLISH
+# =========================
+class PublishBatchRequest(BaseModel):
+    article_ids: List[int] = Field(..., min_length=1, max_length=100)
+    platforms: List[str] = Field(default_factory=lambda: ["blogger"], min_length=1)
+
+
+# =========================
+# BULK RE-OPTIMIZE
+# =========================
+class BulkReoptimizeRequest(BaseModel):
+    statuses: List[str] = Field(default_factory=lambda: ["published"], min_length=1)
+    min_age_days: Optional[int] = Field(None, ge=0)
+    max_age_days: Optional[int] = Field(None, ge=0)
+    min_views: Optional[int] = Field(None, ge=0)
+    max_views: Optional[int] = Field(None, ge=0)
+
+
 # =========================
 # PUBLIC ANALYTICS (CHARTS)
 # =========================
@@ -31,6 +50,7 @@ class PublicOverviewStats(BaseModel):
     total_articles: int
     published_articles: int
     total_views: int
+    cache_age_seconds: float = 0.0
 
 
 # =========================
@@ -60,6 +80,11 @@ class ArticleListOut(ArticleBase):
     pass
 
 
+class ArticleSearchHit(ArticleListOut):
+    score: float = 0.0
+    highlight: Optional[str] = None
+
+
 class ArticleDetailOut(ArticleBase):
     content: Optional[str] = Field(None, alias="canonical_content")
 
@@ -1,8 +1,16 @@
 import os
+import hashlib
 import logging
+import threading
+import time
+from datetime import timedelta
 from dotenv import load_dotenv
 import google.generativeai as genai
 
+from services.llm_client import LLMClient, FakeModel, LLMUnavailableError
+from services.llm_cache import get_llm_cache
+from services.prompt_builder import StaticPrompt, count_tokens
+
 # =========================
 # ENV & LOGGING
 # =========================
@@ -13,6 +21,19 @@ logger = logging.getLogger(__name__)
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Offline mode: route every call through a local fake model (load tests, dev)
+LLM_FAKE_MODEL = os.getenv("LLM_FAKE_MODEL", "false").lower() == "true"
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+
+# Static prompt prefixes (StaticPrompt) kept server-side via context caching
+PROMPT_CONTEXT_CACHE_ENABLED = os.getenv("PROMPT_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+# Caching needs an explicitly versioned model
+PROMPT_CONTEXT_CACHE_MODEL = os.getenv("PROMPT_CONTEXT_CACHE_MODEL", "models/gemini-1.5-flash-002")
+PROMPT_CONTEXT_TTL_SECONDS = int(os.getenv("PROMPT_CONTEXT_TTL_SECONDS", "3600"))
+# The API rejects smaller contexts; don't spend a request finding that out
+PROMPT_CONTEXT_MIN_TOKENS = int(os.getenv("PROMPT_CONTEXT_MIN_TOKENS", "32768"))
+
 # =========================
 # GENAI SETUP (LAZY)
 # =========================
@@ -35,7 +56,7 @@ def get_gemini_model():
 
     try:
         genai.configure(api_key=GEMINI_API_KEY)
-        _model = genai.GenerativeModel("gemini-1.5-flash")
+        _model = genai.GenerativeModel(GEMINI_MODEL_NAME)
         logger.info("Gemini model initialized successfully")
         return _model
 
@@ -44,19 +65,101 @@ def get_gemini_model():
         return None
 
 
-def generate_canonical_article(master_prompt: str, user_topic: str) -> str:
+# =========================
+# CACHED CONTEXT (STATIC PROMPT PREFIX)
+# =========================
+_context_models = {}
+_context_lock = threading.Lock()
+
+
+def _create_context_model(context: str):
     """
-    Generates canonical article content using Gemini.
-    Returns plain text only.
-    NEVER raises exception (safe for schedulers).
+    (model, seconds it stays valid) holding `context`: a server-side
+    cached context when the API accepts it, else the local stand-in,
+    the same text as a system instruction (re-sent with each call).
     """
+    if PROMPT_CONTEXT_CACHE_ENABLED and count_tokens(context) >= PROMPT_CONTEXT_MIN_TOKENS:
+        try:
+            cached = genai.caching.CachedContent.create(
+                model=PROMPT_CONTEXT_CACHE_MODEL,
+                system_instruction=context,
+                ttl=timedelta(seconds=PROMPT_CONTEXT_TTL_SECONDS)
+            )
+            logger.info(f"Prompt context cached as {cached.name}")
+            # Replaced shortly before the server drops it
+            return genai.GenerativeModel.from_cached_content(cached), PROMPT_CONTEXT_TTL_SECONDS * 0.9
 
-    model = get_gemini_model()
-    if model is None:
-        logger.warning("Gemini model unavailable. Skipping content generation.")
-        return ""
+        except Exception as e:
+            logger.warning(f"Context caching unavailable, using system instruction: {e}")
+
+    model = genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=context)
+    return model, PROMPT_CONTEXT_TTL_SECONDS
+
+
+def get_context_model(context: str):
+    """
+    Model with `context` as its fixed prefix, reused until it expires.
+    None in offline mode or without an API key (the client then
+    prepends the context to the prompt).
+    """
+    if LLM_FAKE_MODEL or get_gemini_model() is None:
+        return None
+
+    digest = hashlib.sha256(context.encode("utf-8")).hexdigest()
+    now = time.monotonic()
+
+    with _context_lock:
+        entry = _context_models.get(digest)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        try:
+            model, ttl = _create_context_model(context)
+        except Exception as e:
+            logger.exception(f"Failed to initialize context model: {e}")
+            return None
 
-    prompt = f"""
+        # Old master prompt versions expire instead of piling up
+        for key in [key for key, (_, expires) in _context_models.items() if expires <= now]:
+            del _context_models[key]
+        _context_models[digest] = (model, now + ttl)
+
+    return model
+
+
+# =========================
+# ASYNC CLIENT (SHARED)
+# =========================
+_client = None
+_fake_model = FakeModel()
+
+
+def _model_factory():
+    if LLM_FAKE_MODEL:
+        return _fake_model
+
+    return get_gemini_model()
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Process-wide async LLM client built around get_gemini_model().
+    Owns the concurrency limit, timeouts and retries for every AI call.
+    """
+    global _client
+
+    if _client is None:
+        _client = LLMClient(
+            model_factory=_model_factory,
+            cache=get_llm_cache(),
+            context_model_factory=get_context_model
+        )
+
+    return _client
+
+
+def build_canonical_prompt(master_prompt: str, user_topic: str) -> str:
+    return f"""
 {master_prompt}
 
 User Input:
@@ -69,15 +172,115 @@ IMPORTANT RULES:
 - Professional, human-written tech blog
 """
 
+
+def _prompt_parts(master_prompt: str, user_topic: str) -> tuple:
+    """
+    (prompt, context): a StaticPrompt master prompt is sent as the cached
+    context rather than inside every prompt.
+    """
+    if isinstance(master_prompt, StaticPrompt) and master_prompt:
+        return build_canonical_prompt("", user_topic), str(master_prompt)
+
+    return build_canonical_prompt(master_prompt, user_topic), None
+
+
+def generate_canonical_article(
+    master_prompt: str,
+    user_topic: str,
+    cache_family: str | None = None
+) -> str:
+    """
+    Generates canonical article content using Gemini.
+    Returns plain text only.
+    NEVER raises exception (safe for schedulers).
+    """
+
+    prompt, context = _prompt_parts(master_prompt, user_topic)
+
     try:
-        response = model.generate_content(prompt)
+        return get_llm_client().generate_sync(prompt, cache_family=cache_family, context=context)
+
+    except LLMUnavailableError:
+        logger.warning("Gemini model unavailable. Skipping content generation.")
+        return ""
+
+    except Exception as e:
+        logger.exception(f"Gemini content generation failed: {e}")
+        return ""
 
-        if not response or not getattr(response, "text", None):
-            logger.error("Empty response received from Gemini")
-            return ""
 
-        return response.text.strip()
+async def generate_canonical_article_async(
+    master_prompt: str,
+    user_topic: str,
+    cache_family: str | None = None
+) -> str:
+    """
+    Async variant of generate_canonical_article.
+    NEVER raises exception.
+    """
+
+    prompt, context = _prompt_parts(master_prompt, user_topic)
+
+    try:
+        return await get_llm_client().generate(prompt, cache_family=cache_family, context=context)
+
+    except LLMUnavailableError:
+        logger.warning("Gemini model unavailable. Skipping content generation.")
+        return ""
 
     except Exception as e:
         logger.exception(f"Gemini content generation failed: {e}")
         return ""
+
+
+def stream_canonical_article(
+    master_prompt: str,
+    user_topic: str,
+    cache_family: str | None = None
+):
+    """
+    Streaming variant of generate_canonical_article: yields text chunks
+    as Gemini produces them (stream=True).
+    NEVER raises exception: a failure ends the stream early.
+    """
+
+    prompt, context = _prompt_parts(master_prompt, user_topic)
+
+    try:
+        yield from get_llm_client().stream_sync(prompt, cache_family=cache_family, context=context)
+
+    except LLMUnavailableError:
+        logger.warning("Gemini model unavailable. Skipping content generation.")
+
+    except Exception as e:
+        logger.exception(f"Gemini content generation failed: {e}")
+
+
+def generate_canonical_articles(requests: list, cache_family: str | None = None) -> list:
+    """
+    Fans out many (master_prompt, user_topic) pairs concurrently.
+    Returns texts in input order; failed items come back as "".
+    """
+
+    prompts = [
+        build_canonical_prompt(master_prompt, user_topic)
+        for master_prompt, user_topic in requests
+    ]
+
+    if not prompts:
+        return []
+
+    results = get_llm_client().generate_many_sync(prompts, cache_family=cache_family)
+
+    texts = []
+    for result in results:
+        if isinstance(result, LLMUnavailableError):
+            logger.warning("Gemini model unavailable. Skipping content generation.")
+            texts.append("")
+        elif isinstance(result, Exception):
+            logger.error(f"Gemini content generation failed: {result!r}")
+            texts.append("")
+        else:
+            texts.append(result)
+
+    return texts
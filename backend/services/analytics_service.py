@@ -1,18 +1,15 @@
 from sqlalchemy.orm import Session
 from datetime import datetime
 from models import Article
+from services.view_counter import view_counter
 
 
 def register_article_view(db: Session, article_id: int):
     """
-    Increment view count for an article
+    Increment view count for an article.
+    Buffered in memory; written by the view counter flush.
     """
-    article = db.query(Article).filter(Article.id == article_id).first()
-    if not article:
-        return
-
-    article.view_count += 1
-    db.commit()
+    view_counter.record(article_id)
 
 
 def mark_article_optimized(db: Session, article_id: int):
@@ -0,0 +1,210 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# =========================
+# CONFIG
+# =========================
+ARTICLE_CACHE_ENABLED = os.getenv("ARTICLE_CACHE_ENABLED", "true").lower() == "true"
+ARTICLE_CACHE_MAX_ENTRIES = int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", "1000"))
+ARTICLE_CACHE_MAX_BYTES = int(os.getenv("ARTICLE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Bodies embed view_count, which changes without touching updated_at:
+# rebuild entries this often so counts stay roughly current
+ARTICLE_CACHE_TTL_SECONDS = float(os.getenv("ARTICLE_CACHE_TTL_SECONDS", "60"))
+ARTICLE_CACHE_MAX_AGE_SECONDS = int(os.getenv("ARTICLE_CACHE_MAX_AGE_SECONDS", "60"))
+# Smaller bodies are sent as-is
+ARTICLE_CACHE_MIN_COMPRESS_BYTES = int(os.getenv("ARTICLE_CACHE_MIN_COMPRESS_BYTES", "512"))
+
+CACHE_CONTROL = f"public, max-age={ARTICLE_CACHE_MAX_AGE_SECONDS}"
+
+
+@dataclass
+class CachedResponse:
+    """
+    One article detail body, serialized once and stored per content-coding.
+    Each coding has its own strong ETag (they are different byte sequences).
+    """
+    updated_at: datetime | None
+    bodies: dict        # coding ("identity" | "gzip" | "br") -> bytes
+    etags: dict         # coding -> quoted ETag
+    built_at: float
+
+    @property
+    def size(self) -> int:
+        return sum(len(body) for body in self.bodies.values())
+
+
+def _encode(payload: dict) -> tuple:
+    identity = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    bodies = {"identity": identity}
+
+    if len(identity) >= ARTICLE_CACHE_MIN_COMPRESS_BYTES:
+        # mtime=0: same bytes (and ETag) on every rebuild of unchanged content
+        bodies["gzip"] = gzip.compress(identity, compresslevel=6, mtime=0)
+        if brotli is not None:
+            bodies["br"] = brotli.compress(identity, quality=5)
+
+    digest = hashlib.sha256(identity).hexdigest()[:32]
+    etags = {
+        coding: f'"{digest}"' if coding == "identity" else f'"{digest}-{coding}"'
+        for coding in bodies
+    }
+    return bodies, etags
+
+
+def build_response(updated_at: datetime | None, payload: dict) -> CachedResponse:
+    bodies, etags = _encode(payload)
+    return CachedResponse(
+        updated_at=updated_at,
+        bodies=bodies,
+        etags=etags,
+        built_at=time.monotonic()
+    )
+
+
+def _accepted_codings(accept_encoding: str | None) -> set:
+    accepted = set()
+    for token in (accept_encoding or "").split(","):
+        coding, _, params = token.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        q = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+
+        if q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def negotiate_coding(entry: CachedResponse, accept_encoding: str | None) -> str:
+    """
+    Best stored coding the client accepts: br, then gzip, else identity.
+    """
+    accepted = _accepted_codings(accept_encoding)
+    for coding in ("br", "gzip"):
+        if coding in entry.bodies and (coding in accepted or "*" in accepted):
+            return coding
+    return "identity"
+
+
+def etag_matches(entry: CachedResponse, if_none_match: str | None) -> bool:
+    """
+    If-None-Match against any coding's ETag of this entry (weak comparison,
+    as RFC 9110 specifies for If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag in tags for etag in entry.etags.values())
+
+
+class ArticleResponseCache:
+    """
+    In-process LRU of serialized public article responses.
+
+    Entries are keyed on article id and only served while the row's
+    updated_at still matches, so edits made by another process are never
+    served stale; evict() drops an entry immediately after a local write.
+    Bounded by entry count and total stored bytes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ARTICLE_CACHE_MAX_ENTRIES,
+        max_bytes: int = ARTICLE_CACHE_MAX_BYTES,
+        ttl: float = ARTICLE_CACHE_TTL_SECONDS
+    ):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, article_id: int, updated_at: datetime | None) -> CachedResponse | None:
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(article_id)
+            if (
+                entry is None
+                or entry.updated_at != updated_at
+                or now - entry.built_at >= self.ttl
+            ):
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(article_id)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, article_id: int, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._drop(article_id)
+            self._entries[article_id] = entry
+            self._bytes += entry.size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+
+    def _drop(self, article_id: int):
+        entry = self._entries.pop(article_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def evict(self, article_id: int | None = None):
+        with self._lock:
+            if article_id is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                self._drop(article_id)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "brotli": brotli is not None,
+                **self.stats
+            }
+
+
+article_response_cache = ArticleResponseCache() if ARTICLE_CACHE_ENABLED else None
+
+
+def evict_article_response(article_id: int):
+    """
+    Call after any owner write to an article (update, re-optimize, delete, restore).
+    """
+    if article_response_cache is not None:
+        article_response_cache.evict(article_id)
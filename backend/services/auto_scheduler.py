@@ -3,7 +3,11 @@ from models import Article
 from datetime import datetime
 
 
-def pick_best_article_to_publish(db: Session):
+def auto_publish_queue(db: Session):
+    """
+    Approved auto-publish articles, best first (also EXPLAIN-checked by
+    `python -m migrations check`).
+    """
     return (
         db.query(Article)
         .filter(
@@ -15,5 +19,8 @@ def pick_best_article_to_publish(db: Session):
             Article.rewrite_count.desc(),
             Article.created_at.asc()
         )
-        .first()
     )
+
+
+def pick_best_article_to_publish(db: Session):
+    return auto_publish_queue(db).first()
@@ -1,8 +1,9 @@
 import json
-from services.agentic_brain import generate_canonical_article
+from services.agentic_brain import generate_canonical_article, stream_canonical_article
+from services.prompt_builder import StaticPrompt
 
 
-BLOG_STRUCTURE_PROMPT = """
+BLOG_STRUCTURE_PROMPT = StaticPrompt("""
 You are a professional senior tech blog editor.
 
 STRICT RULES:
@@ -41,7 +42,21 @@ JSON FORMAT (STRICT):
   ],
   "conclusion": "Final closing paragraph"
 }
-"""
+""")
+
+
+def _validate_structure(data: dict) -> dict:
+    # Basic validation
+    if not data.get("sections"):
+        raise ValueError("No sections generated")
+
+    if not data.get("summary_hook"):
+        raise ValueError("Missing summary_hook")
+
+    if not data.get("conclusion"):
+        raise ValueError("Missing conclusion")
+
+    return data
 
 
 def generate_structured_blog(title: str) -> dict:
@@ -52,25 +67,151 @@ def generate_structured_blog(title: str) -> dict:
 
     raw = generate_canonical_article(
         master_prompt=BLOG_STRUCTURE_PROMPT,
-        user_topic=title
+        user_topic=title,
+        cache_family="structure"
     )
 
     try:
-        data = json.loads(raw)
-
-        # Basic validation
-        if not data.get("sections"):
-            raise ValueError("No sections generated")
-
-        if not data.get("summary_hook"):
-            raise ValueError("Missing summary_hook")
-
-        if not data.get("conclusion"):
-            raise ValueError("Missing conclusion")
-
-        return data
+        return _validate_structure(json.loads(raw))
 
     except Exception as e:
         raise ValueError(
             f"AI did not return valid structured JSON: {str(e)}"
         )
+
+
+# =========================
+# STREAMING
+# =========================
+
+def _loads_or_none(fragment: str):
+    # A malformed fragment is not emitted; finish() reports the error
+    try:
+        return json.loads(fragment)
+    except ValueError:
+        return None
+
+
+class StructureStreamParser:
+    """
+    Incremental parser for the BLOG_STRUCTURE_PROMPT schema.
+
+    feed() takes raw text chunks and returns the parts that completed in
+    them, as soon as their closing quote / brace arrives:
+
+        ("summary_hook", str)
+        ("section", dict)       one per finished object in "sections"
+        ("conclusion", str)
+
+    Anything before the first "{" (e.g. a ```json fence) is ignored.
+    finish() parses the whole object and validates it like
+    generate_structured_blog().
+    """
+
+    STRING_FIELDS = ("summary_hook", "conclusion")
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._start = None   # offset of the top-level "{"
+        self._end = None     # offset just past the matching "}"
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+        self._key = None         # current top-level key
+        self._expect_key = True  # at depth 1: next string is a key
+        self._item_start = None  # offset of the open section object
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        self._buf += chunk
+        buf = self._buf
+
+        while self._pos < len(buf) and self._end is None:
+            i = self._pos
+            ch = buf[i]
+            self._pos += 1
+
+            if self._start is None:
+                if ch == "{":
+                    self._start = i
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        value = _loads_or_none(buf[self._string_start:i + 1])
+                        if self._expect_key:
+                            self._key = value
+                        elif self._key in self.STRING_FIELDS and isinstance(value, str):
+                            events.append((self._key, value))
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "{" and self._depth == 3 and self._key == "sections":
+                    self._item_start = i
+
+            elif ch in "}]":
+                if ch == "}" and self._depth == 3 and self._item_start is not None:
+                    section = _loads_or_none(buf[self._item_start:i + 1])
+                    if isinstance(section, dict):
+                        events.append(("section", section))
+                    self._item_start = None
+
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end = i + 1
+
+            elif self._depth == 1:
+                if ch == ":":
+                    self._expect_key = False
+                elif ch == ",":
+                    self._expect_key = True
+
+        return events
+
+    def finish(self) -> dict:
+        if self._start is None or self._end is None:
+            raise ValueError("AI did not return valid structured JSON: incomplete object")
+
+        try:
+            return _validate_structure(json.loads(self._buf[self._start:self._end]))
+
+        except Exception as e:
+            raise ValueError(
+                f"AI did not return valid structured JSON: {str(e)}"
+            )
+
+
+def stream_structured_blog(title: str):
+    """
+    Streaming variant of generate_structured_blog.
+    Yields the StructureStreamParser events while Gemini is still writing,
+    then ("structure", dict) with the complete, validated layout.
+    Raises ValueError if the finished output is not valid.
+    """
+
+    parser = StructureStreamParser()
+
+    for chunk in stream_canonical_article(
+        master_prompt=BLOG_STRUCTURE_PROMPT,
+        user_topic=title,
+        cache_family="structure"
+    ):
+        yield from parser.feed(chunk)
+
+    yield ("structure", parser.finish())
@@ -1,10 +1,14 @@
 from datetime import datetime, timedelta
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 import logging
 import json
+import os
 
 from models import Article
 from services.agentic_brain import generate_canonical_article
+from services.search_index import sync_article
+from services.prompt_builder import trim_to_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +18,35 @@ logger = logging.getLogger(__name__)
 WEAK_VIEW_THRESHOLD = 50
 MAX_REWRITE_LIMIT = 2
 GRACE_PERIOD_HOURS = 24
+# Article excerpt sent to the model (whole sentences, ~1500 characters)
+CTR_CONTENT_TOKENS = int(os.getenv("CTR_CONTENT_TOKENS", "375"))
+
+
+def ctr_eligibility_filter(
+    now: datetime | None = None,
+    skip_optimized_since: datetime | None = None
+) -> list:
+    """
+    SQL form of is_ctr_weak(); keep the two in sync.
+    skip_optimized_since lets a retried run resume instead of redoing articles.
+    """
+    now = now or datetime.utcnow()
+
+    criteria = [
+        Article.status == "published",
+        Article.published_at.isnot(None),
+        Article.published_at <= now - timedelta(hours=GRACE_PERIOD_HOURS),
+        func.coalesce(Article.view_count, 0) < WEAK_VIEW_THRESHOLD,
+        func.coalesce(Article.rewrite_count, 0) < MAX_REWRITE_LIMIT,
+    ]
+
+    if skip_optimized_since:
+        criteria.append(or_(
+            Article.last_optimized_at.is_(None),
+            Article.last_optimized_at < skip_optimized_since
+        ))
+
+    return criteria
 
 
 def is_ctr_weak(article: Article) -> bool:
@@ -37,13 +70,8 @@ def is_ctr_weak(article: Article) -> bool:
     return True
 
 
-def generate_ctr_optimized_seo(article: Article) -> dict:
-    """
-    Generates improved SEO title & meta description
-    using AI-based CTR optimization
-    """
-
-    prompt = f"""
+def build_ctr_prompt(article: Article) -> str:
+    return f"""
 You are an expert CTR optimization strategist.
 
 TASK:
@@ -71,15 +99,16 @@ Article Title:
 {article.title}
 
 Article Content:
-{article.canonical_content[:1500]}
+{trim_to_tokens(article.canonical_content, CTR_CONTENT_TOKENS)}
 """
 
-    try:
-        raw = generate_canonical_article(
-            master_prompt=prompt,
-            user_topic=""
-        )
 
+def parse_ctr_response(article: Article, raw: str) -> dict:
+    """
+    Parses the AI JSON reply, falling back to the current SEO fields
+    """
+
+    try:
         data = json.loads(raw)
 
         return {
@@ -100,6 +129,29 @@ Article Content:
         }
 
 
+def generate_ctr_optimized_seo(article: Article) -> dict:
+    """
+    Generates improved SEO title & meta description
+    using AI-based CTR optimization
+    """
+
+    raw = generate_canonical_article(
+        master_prompt=build_ctr_prompt(article),
+        user_topic="",
+        cache_family="ctr_seo"
+    )
+
+    return parse_ctr_response(article, raw)
+
+
+def apply_ctr_seo(db: Session, article: Article, seo_data: dict):
+    article.seo_title = seo_data["seo_title"]
+    article.meta_description = seo_data["meta_description"]
+    article.rewrite_count = (article.rewrite_count or 0) + 1
+    article.last_optimized_at = datetime.utcnow()
+    sync_article(db, article)
+
+
 def optimize_article_ctr(db: Session, article_id: int) -> bool:
     """
     Full CTR optimization pipeline
@@ -116,10 +168,7 @@ def optimize_article_ctr(db: Session, article_id: int) -> bool:
             return False
 
         seo_data = generate_ctr_optimized_seo(article)
-
-        article.seo_title = seo_data["seo_title"]
-        article.meta_description = seo_data["meta_description"]
-        article.rewrite_count = (article.rewrite_count or 0) + 1
+        apply_ctr_seo(db, article, seo_data)
 
         db.commit()
 
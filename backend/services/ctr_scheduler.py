@@ -1,63 +1,223 @@
 from sqlalchemy.orm import Session
 import logging
-from datetime import datetime, timedelta
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 from database import SessionLocal
 from models import Article
-from services.ctr_optimizer import optimize_article_ctr
+from models_ctr import CtrRun
+from services.agentic_brain import generate_canonical_articles
+from services.ctr_optimizer import (
+    ctr_eligibility_filter,
+    is_ctr_weak,
+    build_ctr_prompt,
+    parse_ctr_response,
+    apply_ctr_seo
+)
 
 logger = logging.getLogger(__name__)
 
-CTR_CHECK_DELAY_HOURS = 24
+# =========================
+# CONFIG
+# =========================
+CTR_BATCH_SIZE = int(os.getenv("CTR_BATCH_SIZE", "20"))
+CTR_MAX_WORKERS = int(os.getenv("CTR_MAX_WORKERS", "4"))
+CTR_MAX_LLM_CALLS = int(os.getenv("CTR_MAX_LLM_CALLS", "200"))
+CTR_MAX_WALL_SECONDS = float(os.getenv("CTR_MAX_WALL_SECONDS", "1800"))
 
 
-def run_ctr_optimization():
+class RunBudget:
     """
-    Runs CTR optimization for eligible published articles
+    Per-run cap on LLM calls and wall time, shared by all workers.
     """
-    db: Session = SessionLocal()
-    optimized_count = 0
-    failed_count = 0
 
-    try:
-        logger.info("🚀 CTR optimization job started")
+    def __init__(self, max_llm_calls: int, max_wall_seconds: float):
+        self.max_llm_calls = max_llm_calls
+        self.deadline = time.monotonic() + max_wall_seconds
+        self.llm_calls = 0
+        self.stop_reason = None
+        self._lock = threading.Lock()
+
+    def reserve(self, wanted: int) -> int:
+        """
+        Returns how many of `wanted` LLM calls may proceed.
+        """
+        with self._lock:
+            if time.monotonic() >= self.deadline:
+                self.stop_reason = self.stop_reason or "max wall time reached"
+                return 0
+
+            granted = max(0, min(wanted, self.max_llm_calls - self.llm_calls))
+            if granted < wanted:
+                self.stop_reason = self.stop_reason or "max LLM calls reached"
+
+            self.llm_calls += granted
+            return granted
+
+    def release(self, unused: int):
+        """
+        Returns reserved calls that were never made.
+        """
+        with self._lock:
+            self.llm_calls -= unused
+
+    def expired(self) -> bool:
+        with self._lock:
+            if time.monotonic() < self.deadline:
+                return False
+            self.stop_reason = self.stop_reason or "max wall time reached"
+            return True
+
+
+def eligible_articles_query(db: Session, skip_optimized_since: datetime | None = None):
+    return (
+        db.query(Article.id)
+        .filter(*ctr_eligibility_filter(skip_optimized_since=skip_optimized_since))
+        .order_by(Article.id)
+    )
+
 
-        cutoff_time = datetime.utcnow() - timedelta(hours=CTR_CHECK_DELAY_HOURS)
+def _eligible_article_ids(db: Session, skip_optimized_since: datetime | None = None) -> list:
+    return [row[0] for row in eligible_articles_query(db, skip_optimized_since).all()]
 
+
+def _process_batch(article_ids: list, budget: RunBudget) -> dict:
+    """
+    Optimizes one batch in its own session.
+    Every ID ends up in exactly one of optimized / failed / deferred / skipped.
+    """
+    result = {"optimized": 0, "failed": 0, "deferred": 0, "skipped": 0}
+
+    granted = budget.reserve(len(article_ids))
+    result["deferred"] = len(article_ids) - granted
+    if not granted:
+        return result
+
+    db: Session = SessionLocal()
+    try:
         articles = (
             db.query(Article)
-            .filter(Article.status == "published")
-            .filter(Article.published_at <= cutoff_time)
+            .filter(Article.id.in_(article_ids[:granted]))
             .all()
         )
+        # Re-check in Python: rows may have changed since the ID scan
+        articles = [a for a in articles if is_ctr_weak(a)]
+        result["skipped"] = granted - len(articles)
+        budget.release(result["skipped"])
+
+        if articles and budget.expired():
+            result["deferred"] += len(articles)
+            budget.release(len(articles))
+            return result
 
-        logger.info(f"Found {len(articles)} eligible articles for CTR optimization")
+        try:
+            raw_responses = generate_canonical_articles([
+                (build_ctr_prompt(article), "")
+                for article in articles
+            ], cache_family="ctr_seo")
+        except Exception:
+            result["failed"] += len(articles)
+            logger.exception(f"❌ CTR batch failed for article IDs {article_ids[:granted]}")
+            return result
 
-        for article in articles:
+        # Responses are paid for: always apply them (only DB writes remain)
+        for article, raw in zip(articles, raw_responses):
             try:
-                success = optimize_article_ctr(db, article.id)
+                if not raw:
+                    result["failed"] += 1
+                    logger.warning(f"⚠️ No AI response for article ID {article.id}")
+                    continue
 
-                if success:
-                    optimized_count += 1
-                    logger.info(f"✅ CTR optimized for article ID {article.id}")
-                else:
-                    logger.warning(f"⚠️ CTR optimization skipped for article ID {article.id}")
+                apply_ctr_seo(db, article, parse_ctr_response(article, raw))
+                db.commit()
+
+                result["optimized"] += 1
+                logger.info(f"✅ CTR optimized for article ID {article.id}")
 
             except Exception as article_error:
-                failed_count += 1
+                result["failed"] += 1
                 db.rollback()
                 logger.exception(
                     f"❌ CTR optimization failed for article ID {article.id}: {article_error}"
                 )
 
+    finally:
+        db.close()
+
+    return result
+
+
+def run_ctr_optimization(
+    max_llm_calls: int = CTR_MAX_LLM_CALLS,
+    max_wall_seconds: float = CTR_MAX_WALL_SECONDS,
+    skip_optimized_since: datetime | None = None
+):
+    """
+    Runs CTR optimization for eligible published articles.
+    Eligibility is filtered in SQL; batches run on a bounded worker pool.
+    """
+    started = time.monotonic()
+    db: Session = SessionLocal()
+
+    run = CtrRun(started_at=datetime.utcnow(), status="running")
+    db.add(run)
+    db.commit()
+
+    totals = {"optimized": 0, "failed": 0, "deferred": 0, "skipped": 0}
+    budget = RunBudget(max_llm_calls, max_wall_seconds)
+
+    try:
+        logger.info("🚀 CTR optimization job started")
+
+        article_ids = _eligible_article_ids(db, skip_optimized_since)
+        run.eligible = len(article_ids)
+        db.commit()
+        logger.info(f"Found {len(article_ids)} eligible articles for CTR optimization")
+
+        batches = [
+            article_ids[i:i + CTR_BATCH_SIZE]
+            for i in range(0, len(article_ids), CTR_BATCH_SIZE)
+        ]
+
+        with ThreadPoolExecutor(max_workers=CTR_MAX_WORKERS, thread_name_prefix="ctr") as pool:
+            for batch_result in pool.map(lambda ids: _process_batch(ids, budget), batches):
+                for key, value in batch_result.items():
+                    totals[key] += value
+
+        run.status = "budget_exhausted" if budget.stop_reason else "completed"
+        run.stop_reason = budget.stop_reason
+
         logger.info(
             f"🎯 CTR optimization job completed | "
-            f"Optimized: {optimized_count}, Failed: {failed_count}"
+            f"Optimized: {totals['optimized']}, Failed: {totals['failed']}, "
+            f"Deferred: {totals['deferred']}, Skipped: {totals['skipped']}"
         )
 
     except Exception as e:
         db.rollback()
+        run.status = "failed"
+        run.stop_reason = str(e)[:255]
         logger.exception("🔥 CTR scheduler job failed unexpectedly")
 
     finally:
+        run.optimized = totals["optimized"]
+        run.failed = totals["failed"]
+        run.deferred = totals["deferred"]
+        run.skipped = totals["skipped"]
+        run.llm_calls = budget.llm_calls
+        run.finished_at = datetime.utcnow()
+        run.duration_seconds = round(time.monotonic() - started, 2)
+
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to persist CTR run summary")
+
+        status = run.status
         db.close()
+
+    return {**totals, "status": status}
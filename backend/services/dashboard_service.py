@@ -1,8 +1,11 @@
 from datetime import datetime, timedelta
+from sqlalchemy import func, case, and_
 from sqlalchemy.orm import Session
 
 from models import Article
 from models_trend_memory import TrendMemory
+from models_ctr import CtrRun
+from services.stats_cache import overview_cache
 
 # CTR rules (same as ctr_optimizer)
 WEAK_VIEW_THRESHOLD = 50
@@ -40,26 +43,40 @@ def _get_ctr_status(article: Article) -> str:
 # DASHBOARD APIs
 # =========================
 
-def get_overview_stats(db: Session):
-    total = db.query(Article).count()
-    published = db.query(Article).filter(Article.status == "published").count()
-    drafts = total - published
-
-    weak_ctr = (
-        db.query(Article)
-        .filter(Article.status == "published")
-        .filter(Article.view_count < WEAK_VIEW_THRESHOLD)
-        .count()
+def overview_stats_query(db: Session):
+    is_published = Article.status == "published"
+
+    # One pass over articles with conditional aggregates
+    return db.query(
+        func.count(Article.id),
+        func.coalesce(func.sum(case((is_published, 1), else_=0)), 0),
+        func.coalesce(func.sum(case(
+            (and_(is_published, Article.view_count < WEAK_VIEW_THRESHOLD), 1),
+            else_=0
+        )), 0)
     )
 
+
+def _compute_overview_stats(db: Session) -> dict:
+    total, published, weak_ctr = overview_stats_query(db).one()
+
     return {
         "total_articles": total,
         "published_articles": published,
-        "draft_articles": drafts,
+        "draft_articles": total - published,
         "weak_ctr_articles": weak_ctr
     }
 
 
+def get_overview_stats(db: Session):
+    stats, age = overview_cache.get_or_compute(
+        "admin_overview",
+        lambda: _compute_overview_stats(db)
+    )
+
+    return {**stats, "cache_age_seconds": round(age, 1)}
+
+
 def get_low_view_articles(db: Session, limit: int = 5):
     articles = (
         db.query(Article)
@@ -117,3 +134,30 @@ def get_trending_memory_stats(db: Session, limit: int = 5):
         }
         for r in records
     ]
+
+
+def get_ctr_run_history(db: Session, limit: int = 10):
+    runs = (
+        db.query(CtrRun)
+        .order_by(CtrRun.started_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return [
+        {
+            "id": r.id,
+            "started_at": r.started_at,
+            "finished_at": r.finished_at,
+            "status": r.status,
+            "stop_reason": r.stop_reason,
+            "eligible": r.eligible,
+            "optimized": r.optimized,
+            "failed": r.failed,
+            "deferred": r.deferred,
+            "skipped": r.skipped,
+            "llm_calls": r.llm_calls,
+            "duration_seconds": r.duration_seconds
+        }
+        for r in runs
+    ]
@@ -1,6 +1,12 @@
-from services.related_block import build_related_posts_html
-import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from html import escape
+from types import SimpleNamespace
 import hashlib
+import os
+import re
+
+from services.related_block import build_related_posts_html
 
 # ============================================================
 # IMAGE CONFIG (Blogger + Mobile Safe)
@@ -9,9 +15,18 @@ import hashlib
 MAX_IMAGES_TOTAL = 4   # 1 intro + 2–3 body
 IMAGE_WIDTH_DESKTOP = "720px"
 
+# ============================================================
+# BULK RENDERING CONFIG
+# ============================================================
+
+HTML_RENDER_WORKERS = int(os.getenv("HTML_RENDER_WORKERS", str(os.cpu_count() or 2)))
+# Below this many articles a process pool costs more than it saves
+HTML_POOL_MIN_BATCH = int(os.getenv("HTML_POOL_MIN_BATCH", "200"))
+
 def _safe_slug(text: str) -> str:
     return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
 
+@lru_cache(maxsize=8192)
 def _unique_image_url(seed_text: str) -> str:
     """
     Generates a deterministic but UNIQUE image per topic/section.
@@ -20,122 +35,217 @@ def _unique_image_url(seed_text: str) -> str:
     seed = int(hashlib.md5(seed_text.encode()).hexdigest()[:8], 16)
     return f"https://picsum.photos/seed/{seed}/800/450.webp"
 
-def _image_html(src: str, alt: str) -> str:
-    return f"""
+# ============================================================
+# TEMPLATES (built once, filled with str.format)
+# ============================================================
+# Every value is HTML-escaped before it is substituted: AI text is
+# never trusted as markup. Element text keeps its quotes (only &, <, >
+# change); attribute values are fully escaped.
+
+_IMAGE_TEMPLATE = """
     <div style="text-align:center;margin:22px 0;">
         <img src="{src}"
              alt="{alt}"
              loading="lazy"
-             style="max-width:100%;width:{IMAGE_WIDTH_DESKTOP};height:auto;border-radius:8px;" />
+             style="max-width:100%;width:""" + IMAGE_WIDTH_DESKTOP + """;height:auto;border-radius:8px;" />
+    </div>
+    """
+
+_INTRO_HEADING = "<h2>Introduction</h2>"
+_INTRO_TEMPLATE = "<p><em>{text}</em></p>"
+_HEADING_TEMPLATE = "<h2>{text}</h2>"
+_PARAGRAPH_TEMPLATE = "<p>{text}</p>"
+_CONCLUSION_HEADING = "<h2>Conclusion</h2>"
+_CTA_SPACER = "<br><br>"
+
+def _text(value: str) -> str:
+    return escape(value, quote=False)
+
+def _image_html(src: str, alt: str) -> str:
+    return _IMAGE_TEMPLATE.format(src=escape(src), alt=escape(alt))
+
+_CTA_HTML = """
+    <div style="text-align:center;margin-top:30px;">
+        <a href="/"
+           style="
+             display:inline-block;
+             padding:12px 26px;
+             background:#1a73e8;
+             color:#ffffff;
+             text-decoration:none;
+             border-radius:999px;
+             font-weight:600;
+           ">
+           Check More
+        </a>
     </div>
     """
 
 # ============================================================
-# MAIN BUILDER (COMPOSE-SAFE)
+# INCREMENTAL BUILDER (STREAMING)
 # ============================================================
 
-def build_blog_html(structure: dict, title: str, related_posts=None) -> str:
+class BlogHtmlBuilder:
     """
-    Blogger-safe, Compose-compatible HTML builder.
-    NO scripts, NO inline JS, NO title repetition.
+    Builds the article piece by piece, so each part can be sent as soon
+    as its structure arrives. intro(), section() and closing() return the
+    HTML fragment they added ("" when nothing was added); html() is the
+    full document, identical to build_blog_html() for the same structure.
     """
 
-    html_parts = []
-    images_used = 0
+    def __init__(self, title: str, related_posts=None):
+        self.title = title
+        self.related_posts = related_posts
+        self.images_used = 0
+        self.parts = []
+
+    def _add(self, parts: list) -> str:
+        self.parts.extend(parts)
+        return "\n".join(parts)
 
     # --------------------------------------------------------
     # INTRODUCTION
     # --------------------------------------------------------
 
-    html_parts.append("<h2>Introduction</h2>")
+    def intro(self, summary_hook: str | None) -> str:
+        parts = [_INTRO_HEADING]
 
-    intro_text = structure.get("summary_hook") or ""
-    intro_text = intro_text.strip()
+        intro_text = summary_hook or ""
+        intro_text = intro_text.strip()
 
-    if intro_text:
-        html_parts.append(f"<p><em>{intro_text}</em></p>")
+        if intro_text:
+            parts.append(_INTRO_TEMPLATE.format(text=_text(intro_text)))
 
-        # ONE intro image ONLY
-        intro_img = _unique_image_url(title)
-        html_parts.append(
-            _image_html(
-                intro_img,
-                f"{title} overview illustration"
+            # ONE intro image ONLY
+            intro_img = _unique_image_url(self.title)
+            parts.append(
+                _image_html(
+                    intro_img,
+                    f"{self.title} overview illustration"
+                )
             )
-        )
-        images_used += 1
+            self.images_used += 1
+
+        return self._add(parts)
 
     # --------------------------------------------------------
-    # BODY SECTIONS
+    # BODY SECTION
     # --------------------------------------------------------
 
-    for section in structure.get("sections", []):
-
-        if images_used >= MAX_IMAGES_TOTAL:
-            break
+    def section(self, section: dict) -> str:
+        # Image budget spent: no further sections
+        if self.images_used >= MAX_IMAGES_TOTAL:
+            return ""
 
         heading = section.get("heading", "").strip()
         content = section.get("content", "").strip()
 
         if not heading or not content:
-            continue
+            return ""
 
-        html_parts.append(f"<h2>{heading}</h2>")
-        html_parts.append(f"<p>{content}</p>")
+        parts = [
+            _HEADING_TEMPLATE.format(text=_text(heading)),
+            _PARAGRAPH_TEMPLATE.format(text=_text(content))
+        ]
 
         # Insert ONE image per section (after first paragraph)
-        if images_used < MAX_IMAGES_TOTAL:
-            img_src = _unique_image_url(f"{title}-{heading}")
-            html_parts.append(
+        if self.images_used < MAX_IMAGES_TOTAL:
+            img_src = _unique_image_url(f"{self.title}-{heading}")
+            parts.append(
                 _image_html(
                     img_src,
                     f"{heading} explained"
                 )
             )
-            images_used += 1
+            self.images_used += 1
 
         # Optional extra paragraph
         for sub in section.get("subsections", []):
             sub_text = sub.get("content", "").strip()
             if sub_text:
-                html_parts.append(f"<p>{sub_text}</p>")
+                parts.append(_PARAGRAPH_TEMPLATE.format(text=_text(sub_text)))
+
+        return self._add(parts)
 
     # --------------------------------------------------------
-    # CONCLUSION (NO IMAGE)
+    # CONCLUSION (NO IMAGE) + CTA + RELATED POSTS
     # --------------------------------------------------------
 
-    conclusion = structure.get("conclusion", "").strip()
-    if conclusion:
-        html_parts.append("<h2>Conclusion</h2>")
-        html_parts.append(f"<p>{conclusion}</p>")
+    def closing(self, conclusion: str | None) -> str:
+        parts = []
 
-    # --------------------------------------------------------
-    # CTA BUTTON
-    # --------------------------------------------------------
+        conclusion = (conclusion or "").strip()
+        if conclusion:
+            parts.append(_CONCLUSION_HEADING)
+            parts.append(_PARAGRAPH_TEMPLATE.format(text=_text(conclusion)))
 
-    html_parts.append("<br><br>")
-    html_parts.append("""
-    <div style="text-align:center;margin-top:30px;">
-        <a href="/"
-           style="
-             display:inline-block;
-             padding:12px 26px;
-             background:#1a73e8;
-             color:#ffffff;
-             text-decoration:none;
-             border-radius:999px;
-             font-weight:600;
-           ">
-           Check More
-        </a>
-    </div>
-    """)
+        parts.append(_CTA_SPACER)
+        parts.append(_CTA_HTML)
 
-    # --------------------------------------------------------
-    # RELATED POSTS (SAFE)
-    # --------------------------------------------------------
+        if self.related_posts:
+            parts.append(build_related_posts_html(self.related_posts))
+
+        return self._add(parts)
+
+    def html(self) -> str:
+        return "\n".join(self.parts)
 
-    if related_posts:
-        html_parts.append(build_related_posts_html(related_posts))
+# ============================================================
+# MAIN BUILDER (COMPOSE-SAFE)
+# ============================================================
+
+def build_blog_html(structure: dict, title: str, related_posts=None) -> str:
+    """
+    Blogger-safe, Compose-compatible HTML builder.
+    NO scripts, NO inline JS, NO title repetition.
+    """
+
+    builder = BlogHtmlBuilder(title, related_posts)
+
+    builder.intro(structure.get("summary_hook"))
 
-    return "\n".join(html_parts)
+    for section in structure.get("sections", []):
+        builder.section(section)
+
+    builder.closing(structure.get("conclusion", ""))
+
+    return builder.html()
+
+
+# ============================================================
+# BULK RENDERING (PROCESS POOL)
+# ============================================================
+
+def _portable_related(related_posts) -> list:
+    # Only titles are rendered; ORM objects do not travel to worker processes
+    return [SimpleNamespace(title=post.title) for post in related_posts or []]
+
+def _render_chunk(jobs: list) -> list:
+    return [
+        build_blog_html(structure, title, related_posts)
+        for structure, title, related_posts in jobs
+    ]
+
+def build_blog_html_many(
+    items,
+    max_workers: int | None = None,
+    chunksize: int = 50
+) -> list:
+    """
+    Renders many articles; returns the HTML strings in input order.
+    Each item is (structure, title) or (structure, title, related_posts).
+    Large batches are spread over a process pool in chunks; small ones
+    (under HTML_POOL_MIN_BATCH) render in this process.
+    """
+    jobs = []
+    for item in items:
+        structure, title, *rest = item
+        jobs.append((structure, title, _portable_related(rest[0] if rest else None)))
+
+    workers = max(1, max_workers or HTML_RENDER_WORKERS)
+    if workers == 1 or len(jobs) < HTML_POOL_MIN_BATCH:
+        return _render_chunk(jobs)
+
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return [html for rendered in pool.map(_render_chunk, chunks) for html in rendered]
@@ -0,0 +1,293 @@
+import json
+import logging
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import and_, or_, select, update, delete, func
+from sqlalchemy.orm import Session
+
+from database import is_sqlite, dialect_insert
+from models_jobs import Job
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE_SECONDS = float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "30"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "3600"))
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "14"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+DEAD = "dead"
+
+_jobs = Job.__table__
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+
+
+# =========================
+# HANDLER REGISTRY
+# =========================
+JOB_HANDLERS: dict = {}
+
+
+def job_handler(kind: str):
+    """
+    Registers `fn(db, job)` as the handler for `kind`.
+    Writes made through `db` are committed together with the job's completion,
+    so a crash or lost lease never leaves them half-applied.
+    """
+    def register(fn: Callable):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+# =========================
+# ENQUEUE
+# =========================
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: dict | None = None,
+    idempotency_key: str | None = None,
+    run_at: datetime | None = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS
+) -> bool:
+    """
+    Adds a job to the caller's transaction (the caller commits).
+    Returns False when a job with the same idempotency key already exists.
+    """
+    values = {
+        "kind": kind,
+        "payload": json.dumps(payload or {}),
+        "idempotency_key": idempotency_key,
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "run_at": run_at or datetime.utcnow(),
+        "created_at": datetime.utcnow(),
+    }
+
+    stmt = dialect_insert(_jobs).values(**values)
+    if idempotency_key:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[_jobs.c.idempotency_key])
+
+    return db.execute(stmt).rowcount == 1
+
+
+# =========================
+# LEASES
+# =========================
+
+def _claimable(now: datetime):
+    return or_(
+        and_(_jobs.c.status == QUEUED, _jobs.c.run_at <= now),
+        and_(_jobs.c.status == RUNNING, _jobs.c.lease_expires_at < now),
+    )
+
+
+def _bury_expired(db: Session, now: datetime):
+    """
+    Running jobs whose lease expired on their last allowed attempt
+    (the worker died every time) are not retried again.
+    """
+    db.execute(
+        update(_jobs)
+        .where(
+            _jobs.c.status == RUNNING,
+            _jobs.c.lease_expires_at < now,
+            _jobs.c.attempts >= _jobs.c.max_attempts
+        )
+        .values(status=DEAD, last_error="Lease expired on final attempt", finished_at=now)
+    )
+
+
+def claim_next(db: Session, worker_id: str, kinds: list | None = None) -> ClaimedJob | None:
+    """
+    Leases the next due job to `worker_id`, or returns None.
+    The conditional UPDATE is the arbiter: of several workers racing
+    for the same row, exactly one sees rowcount == 1.
+    """
+    now = datetime.utcnow()
+    _bury_expired(db, now)
+
+    candidates = (
+        select(_jobs.c.id)
+        .where(_claimable(now))
+        .order_by(_jobs.c.run_at, _jobs.c.id)
+        .limit(5)
+    )
+    if kinds:
+        candidates = candidates.where(_jobs.c.kind.in_(kinds))
+    if not is_sqlite:
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    for job_id in db.execute(candidates).scalars().all():
+        claimed = db.execute(
+            update(_jobs)
+            .where(_jobs.c.id == job_id, _claimable(now))
+            .values(
+                status=RUNNING,
+                attempts=_jobs.c.attempts + 1,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS),
+                heartbeat_at=now
+            )
+        ).rowcount
+
+        if claimed:
+            row = db.execute(select(_jobs).where(_jobs.c.id == job_id)).one()
+            db.commit()
+            return ClaimedJob(
+                id=row.id,
+                kind=row.kind,
+                payload=json.loads(row.payload or "{}"),
+                attempts=row.attempts,
+                max_attempts=row.max_attempts,
+                created_at=row.created_at
+            )
+
+    db.commit()
+    return None
+
+
+def _owned(job_id: int, worker_id: str):
+    return and_(
+        _jobs.c.id == job_id,
+        _jobs.c.status == RUNNING,
+        _jobs.c.lease_owner == worker_id
+    )
+
+
+def heartbeat(db: Session, job_id: int, worker_id: str) -> bool:
+    """
+    Extends the lease. False means the lease was lost to another worker.
+    """
+    now = datetime.utcnow()
+    extended = db.execute(
+        update(_jobs)
+        .where(_owned(job_id, worker_id))
+        .values(
+            lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS),
+            heartbeat_at=now
+        )
+    ).rowcount
+    db.commit()
+    return extended == 1
+
+
+def mark_succeeded(db: Session, job_id: int, worker_id: str) -> bool:
+    """
+    Adds the completion to the caller's transaction (the caller commits).
+    False means the lease was lost; the caller must roll back.
+    """
+    return db.execute(
+        update(_jobs)
+        .where(_owned(job_id, worker_id))
+        .values(
+            status=SUCCEEDED,
+            lease_owner=None,
+            lease_expires_at=None,
+            last_error=None,
+            finished_at=datetime.utcnow()
+        )
+    ).rowcount == 1
+
+
+def retry_delay(attempts: int) -> float:
+    # Exponential with jitter on the upper half: never retries immediately
+    ceiling = min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def mark_failed(db: Session, job: ClaimedJob, worker_id: str, error: str):
+    """
+    Requeues with backoff, or buries the job after its last attempt.
+    """
+    now = datetime.utcnow()
+
+    if job.attempts >= job.max_attempts:
+        values = {"status": DEAD, "finished_at": now}
+    else:
+        values = {
+            "status": QUEUED,
+            "run_at": now + timedelta(seconds=retry_delay(job.attempts))
+        }
+
+    db.execute(
+        update(_jobs)
+        .where(_owned(job.id, worker_id))
+        .values(
+            lease_owner=None,
+            lease_expires_at=None,
+            last_error=error[:2000],
+            **values
+        )
+    )
+    db.commit()
+
+    return values["status"]
+
+
+# =========================
+# RETENTION
+# =========================
+
+def purge_finished_jobs(db: Session, older_than_days: int = JOB_RETENTION_DAYS) -> int:
+    """
+    Deletes succeeded / dead jobs that finished more than `older_than_days` ago
+    (the caller commits). Their idempotency keys go with them, which is safe:
+    recurring keys are only re-enqueued within the misfire grace window.
+    Returns the number of rows deleted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    return db.execute(
+        delete(_jobs).where(
+            _jobs.c.status.in_((SUCCEEDED, DEAD)),
+            _jobs.c.finished_at < cutoff
+        )
+    ).rowcount
+
+
+# =========================
+# STATS
+# =========================
+
+def queue_stats(db: Session) -> dict:
+    counts = dict(
+        db.query(Job.status, func.count(Job.id))
+        .group_by(Job.status)
+        .all()
+    )
+    oldest_due = (
+        db.query(func.min(Job.run_at))
+        .filter(Job.status == QUEUED, Job.run_at <= datetime.utcnow())
+        .scalar()
+    )
+
+    return {
+        "counts": {status: counts.get(status, 0) for status in (QUEUED, RUNNING, SUCCEEDED, DEAD)},
+        "oldest_due_seconds": (
+            round((datetime.utcnow() - oldest_due).total_seconds(), 1)
+            if oldest_due else 0.0
+        )
+    }
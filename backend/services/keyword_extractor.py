@@ -0,0 +1,408 @@
+"""
+Local keyword / keyphrase extraction (no LLM calls).
+
+RAKE candidate phrases, each word weighted by its inverse document
+frequency over the article corpus. Document frequencies live in a hashed
+int32 array (one bucket per crc32(word) % buckets, ~1 MB), snapshotted to
+disk by the batch mode and shared with the root seo_generator.py.
+
+    cd backend
+    python -m services.keyword_extractor --rebuild              # corpus statistics
+    python -m services.keyword_extractor --tag [--all] [--dry-run]
+
+Stdlib only at import time: the database is imported only by the batch functions.
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from array import array
+from datetime import datetime
+from html import unescape
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# =========================
+# CONFIG
+# =========================
+# Snapshot prefix: <path>.bin (document frequencies) + <path>.json (meta, link targets)
+KEYWORD_STATS_PATH = os.getenv("KEYWORD_STATS_PATH", os.path.join(BASE_DIR, "data", "keyword_stats"))
+KEYWORD_DF_BUCKETS = int(os.getenv("KEYWORD_DF_BUCKETS", str(1 << 18)))
+KEYWORD_TAG_LIMIT = int(os.getenv("KEYWORD_TAG_LIMIT", "8"))
+KEYWORD_LINK_LIMIT = int(os.getenv("KEYWORD_LINK_LIMIT", "3"))
+KEYWORD_MAX_PHRASE_WORDS = 3
+
+# Title words count this much more in a phrase's score
+_TITLE_BOOST = 1.5
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_FRAGMENT_RE = re.compile(r"[.,;:!?()\[\]{}\"|/\n\r\t•–—]+")
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#'-]*[a-z0-9+#]|[a-z0-9]")
+_STOPWORDS = frozenset("""
+a about above across actually after again against all almost along already also although always
+am among an and another any anyone anything are around as ask asked at away be became because
+become becomes been before began being below best better between beyond both bring brings but
+by came can cannot come comes could cut cuts did do does doing done down during each easily
+easy either else enough especially etc even ever every everything example far few find finds
+first for found from further get gets getting give gives go goes going good got great had handle
+handles has have having he help helps her here hers herself high him himself his how however i
+if important in including instead into is it its itself just keep keeps know large last least
+less let lets like likely locally long look made main make makes making many may maybe me mean
+means might more most mostly much must my myself need needs never new next no nor not now
+of off offer offers often old on once one only onto or other others otherwise our ours ourselves
+out over own part per perhaps put quickly quite rather real really right run runs said same
+say says see seem seems set several she should show shows simply since small so some something
+sometimes soon still such take takes than that the their theirs them themselves then there
+therefore these they thing things think this those though through thus to today together too
+took toward towards try turn under unlike until up upon us use used useful uses using usually
+very via want wants was way ways we well went were what whatever when where whether which while
+who whom whose why will win wins with within without work works would yet you your yours
+yourself yourselves
+""".split())
+
+
+def strip_markup(value: str | None) -> str:
+    if not value:
+        return ""
+    return unescape(_TAG_RE.sub(" ", value))
+
+
+def words(text: str) -> list:
+    return [
+        word for word in _WORD_RE.findall(text.lower())
+        if word not in _STOPWORDS and not word.isdigit()
+    ]
+
+
+def meta_description(text: str, limit: int = 160) -> str:
+    """
+    First sentence (up to the first "."), clipped to `limit` characters.
+    Scans only as far as that first period.
+    """
+    end = text.find(".")
+    sentence = (text if end < 0 else text[:end]).replace("\n", " ").strip()
+    return sentence[:limit - 3] + "..." if len(sentence) > limit else sentence
+
+
+def _candidates(text: str):
+    """
+    RAKE candidates: runs of content words between stopwords and
+    punctuation, cut into phrases of at most KEYWORD_MAX_PHRASE_WORDS.
+    """
+    for fragment in _FRAGMENT_RE.split(text.lower()):
+        run = []
+        for word in _WORD_RE.findall(fragment):
+            if word in _STOPWORDS or word.isdigit():
+                if run:
+                    yield from _chunks(run)
+                run = []
+            else:
+                run.append(word)
+        if run:
+            yield from _chunks(run)
+
+
+def _chunks(run: list):
+    for start in range(0, len(run), KEYWORD_MAX_PHRASE_WORDS):
+        yield tuple(run[start:start + KEYWORD_MAX_PHRASE_WORDS])
+
+
+# =========================
+# EXTRACTOR
+# =========================
+class KeywordExtractor:
+    """
+    Corpus document frequencies plus the link targets (published
+    articles) seen when they were built.
+    """
+
+    def __init__(self, buckets: int = KEYWORD_DF_BUCKETS):
+        self.df = array("i", bytes(4 * buckets))
+        self.docs = 0
+        self.link_targets = []   # [{"id", "title", "url"}]
+        self.built_at = None
+
+    def _bucket(self, word: str) -> int:
+        return zlib.crc32(word.encode()) % len(self.df)
+
+    # -------------------------
+    # CORPUS
+    # -------------------------
+    def add_document(self, text: str):
+        for word in set(words(text)):
+            self.df[self._bucket(word)] += 1
+        self.docs += 1
+
+    def idf(self, word: str) -> float:
+        return math.log((1 + self.docs) / (1 + self.df[self._bucket(word)])) + 1.0
+
+    def save(self, path: str = KEYWORD_STATS_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(f"{path}.bin.tmp", "wb") as f:
+            self.df.tofile(f)
+        with open(f"{path}.json.tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "docs": self.docs,
+                "buckets": len(self.df),
+                "built_at": self.built_at,
+                "link_targets": self.link_targets
+            }, f)
+
+        # Meta last: readers reload when it changes
+        os.replace(f"{path}.bin.tmp", f"{path}.bin")
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str = KEYWORD_STATS_PATH) -> "KeywordExtractor":
+        with open(f"{path}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        extractor = cls(buckets=0)
+        with open(f"{path}.bin", "rb") as f:
+            extractor.df.fromfile(f, meta["buckets"])
+        extractor.docs = meta["docs"]
+        extractor.built_at = meta.get("built_at")
+        extractor.link_targets = meta.get("link_targets", [])
+        return extractor
+
+    # -------------------------
+    # EXTRACTION
+    # -------------------------
+    def keyphrases(self, text: str, title: str = "", limit: int = 10) -> list:
+        """
+        [(phrase, score)] best first. Word score is RAKE's degree / frequency
+        times IDF; a phrase scores the sum of its words, boosted by how
+        often it occurs and whether it shares words with the title.
+        """
+        phrases = {}
+        frequency = {}
+        degree = {}
+
+        for source in (title, text):
+            for phrase in _candidates(source):
+                phrases[phrase] = phrases.get(phrase, 0) + 1
+                for word in phrase:
+                    frequency[word] = frequency.get(word, 0) + 1
+                    degree[word] = degree.get(word, 0) + len(phrase)
+
+        title_words = set(words(title))
+        weights = {
+            word: degree[word] / frequency[word] * self.idf(word)
+            for word in frequency
+        }
+
+        scored = []
+        for phrase, count in phrases.items():
+            score = sum(weights[word] for word in phrase) * (1 + math.log(count))
+            if title_words.intersection(phrase):
+                score *= _TITLE_BOOST
+            scored.append((" ".join(phrase), score))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def tags(self, text: str, title: str = "", limit: int = KEYWORD_TAG_LIMIT) -> list:
+        """
+        Top keyphrases, skipping any whose words are all covered by a
+        better one ("ai laptops" makes a later "laptops" redundant).
+        """
+        chosen, covered = [], set()
+        for phrase, _ in self.keyphrases(text, title, limit=limit * 4):
+            phrase_words = set(phrase.split())
+            if phrase_words <= covered:
+                continue
+            chosen.append(phrase)
+            covered |= phrase_words
+            if len(chosen) == limit:
+                break
+        return chosen
+
+    def internal_links(
+        self,
+        text: str,
+        title: str = "",
+        limit: int = KEYWORD_LINK_LIMIT,
+        targets: list | None = None,
+        exclude_id: int | None = None
+    ) -> list:
+        """
+        Link targets whose titles best match this article's keyphrases:
+        [{"id", "title", "url", "anchor", "score"}], anchor being the
+        matching phrase to link from.
+        """
+        phrases = self.keyphrases(text, title, limit=20)
+        if not phrases:
+            return []
+
+        weights = {}
+        for phrase, score in phrases:
+            for word in phrase.split():
+                weights[word] = max(weights.get(word, 0.0), score)
+
+        own_title = title.strip().lower()
+        suggestions = []
+        for target in self.link_targets if targets is None else targets:
+            if target.get("id") == exclude_id or target["title"].strip().lower() == own_title:
+                continue
+
+            target_words = set(words(target["title"]))
+            score = sum(weights.get(word, 0.0) for word in target_words)
+            if not score:
+                continue
+
+            anchor = next(
+                phrase for phrase, _ in phrases
+                if target_words.intersection(phrase.split())
+            )
+            suggestions.append({**target, "anchor": anchor, "score": round(score, 3)})
+
+        suggestions.sort(key=lambda item: item["score"], reverse=True)
+        return suggestions[:limit]
+
+
+_extractor = None
+_extractor_mtime = None
+_extractor_lock = threading.Lock()
+
+
+def get_keyword_extractor() -> KeywordExtractor:
+    """
+    Process-wide extractor from the latest snapshot (reloaded when the
+    batch mode writes a new one). Without a snapshot every word has the
+    same IDF, i.e. plain RAKE.
+    """
+    global _extractor, _extractor_mtime
+
+    try:
+        mtime = os.stat(f"{KEYWORD_STATS_PATH}.json").st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    with _extractor_lock:
+        if _extractor is None or mtime != _extractor_mtime:
+            try:
+                _extractor = KeywordExtractor.load() if mtime else KeywordExtractor()
+            except (OSError, ValueError, KeyError):
+                logger.exception("Keyword statistics unreadable; using plain RAKE")
+                _extractor = KeywordExtractor()
+            _extractor_mtime = mtime
+
+    return _extractor
+
+
+# =========================
+# BATCH MODE (DB)
+# =========================
+
+def _article_batches(db, *filters, batch_size: int = 500):
+    from models import Article
+
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Article)
+            .filter(Article.id > last_id, *filters)
+            .order_by(Article.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return
+        # Read before yielding: the caller commits and expunges the batch
+        last_id = batch[-1].id
+        yield batch
+
+
+def rebuild_keyword_stats(db) -> KeywordExtractor:
+    """
+    Document frequencies over every live article, plus the published
+    ones as internal-link targets; saves the snapshot.
+    """
+    from models import Article
+    from services.related_block import _slugify
+
+    extractor = KeywordExtractor()
+    for batch in _article_batches(db, Article.is_deleted == False):
+        for article in batch:
+            extractor.add_document(f"{article.title or ''}\n{strip_markup(article.canonical_content)}")
+            if article.status == "published":
+                extractor.link_targets.append({
+                    "id": article.id,
+                    "title": article.title,
+                    "url": f"/{_slugify(article.title)}"
+                })
+        db.expunge_all()
+
+    extractor.built_at = datetime.utcnow().isoformat(timespec="seconds")
+    extractor.save()
+    logger.info(f"Keyword statistics rebuilt ({extractor.docs} articles)")
+    return extractor
+
+
+def tag_articles(db, only_missing: bool = True, dry_run: bool = False) -> int:
+    """
+    Writes locally extracted seo_tags for live articles (by default only
+    those without tags), one commit per batch. Returns articles tagged.
+    """
+    from models import Article
+    from services.search_index import sync_article
+
+    extractor = get_keyword_extractor()
+    filters = [Article.is_deleted == False]
+    if only_missing:
+        filters.append((Article.seo_tags == None) | (Article.seo_tags == ""))
+
+    tagged = 0
+    for batch in _article_batches(db, *filters):
+        for article in batch:
+            tags = ",".join(extractor.tags(strip_markup(article.canonical_content), article.title or ""))
+            if not tags:
+                continue
+            tagged += 1
+            if dry_run:
+                print(f"{article.id}\t{article.title}\t{tags}")
+                continue
+            article.seo_tags = tags[:500]
+            sync_article(db, article)
+
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        db.expunge_all()
+
+    return tagged
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local keyword extraction over the article DB")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild corpus statistics")
+    parser.add_argument("--tag", action="store_true", help="Write seo_tags for articles")
+    parser.add_argument("--all", action="store_true", help="With --tag: retag articles that already have tags")
+    parser.add_argument("--dry-run", action="store_true", help="With --tag: print tags, write nothing")
+    args = parser.parse_args()
+
+    if not (args.rebuild or args.tag):
+        parser.error("choose --rebuild and/or --tag")
+
+    logging.basicConfig(level=logging.INFO)
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            extractor = rebuild_keyword_stats(db)
+            print(f"Corpus: {extractor.docs} articles, {len(extractor.link_targets)} link targets")
+        if args.tag:
+            count = tag_articles(db, only_missing=not args.all, dry_run=args.dry_run)
+            print(f"Tagged {count} articles{' (dry run)' if args.dry_run else ''}")
+    finally:
+        db.close()
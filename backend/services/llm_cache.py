@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# =========================
+# CONFIG
+# =========================
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+# Under data/ (the Docker volume): survives deploys, shared by API and worker
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(BASE_DIR, "data", "llm_cache.db"))
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# family -> (ttl_seconds, max_entries, require_json)
+# Only families listed here are cached; everything else goes straight to the model.
+FAMILY_POLICIES = {
+    "seo": (7 * DAY, 2000, True),
+    "ctr_seo": (3 * DAY, 2000, True),
+    "structure": (7 * DAY, 500, True),
+    "trending": (12 * HOUR, 50, False),
+}
+
+
+def make_cache_key(model_name: str, prompt: str, params: dict | None = None) -> str:
+    """
+    Content address of one LLM call: sha256 over model, prompt and params.
+    """
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "prompt": prompt,
+            "params": params or {},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Persistent SQLite cache of LLM responses.
+    TTL and LRU eviction are applied per prompt family.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, policies: dict | None = None):
+        self.path = path
+        self.policies = policies if policies is not None else FAMILY_POLICIES
+
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                family TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_cache_family_access "
+            "ON llm_cache (family, last_access)"
+        )
+        self._conn.commit()
+
+        self._counters = {
+            family: {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+            for family in self.policies
+        }
+
+    def is_cacheable(self, family: str | None) -> bool:
+        return family in self.policies
+
+    def get(self, family: str, key: str) -> str | None:
+        ttl, _, _ = self.policies[family]
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row and now - row[1] <= ttl:
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                    (now, key)
+                )
+                self._conn.commit()
+                self._counters[family]["hits"] += 1
+                return row[0]
+
+            if row:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+
+            self._counters[family]["misses"] += 1
+            return None
+
+    def set(self, family: str, key: str, response: str):
+        _, max_entries, require_json = self.policies[family]
+
+        if require_json:
+            try:
+                json.loads(response)
+            except ValueError:
+                # Never pin a malformed reply for the whole TTL
+                return
+
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache
+                    (key, family, response, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, family, response, now, now)
+            )
+
+            evicted = self._conn.execute(
+                """
+                DELETE FROM llm_cache
+                WHERE family = ? AND key IN (
+                    SELECT key FROM llm_cache
+                    WHERE family = ?
+                    ORDER BY last_access DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (family, family, max_entries)
+            ).rowcount
+            self._conn.commit()
+
+            self._counters[family]["stores"] += 1
+            self._counters[family]["evictions"] += max(evicted, 0)
+
+    def clear(self, family: str | None = None):
+        with self._lock:
+            if family:
+                self._conn.execute("DELETE FROM llm_cache WHERE family = ?", (family,))
+            else:
+                self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = dict(
+                self._conn.execute(
+                    "SELECT family, COUNT(*) FROM llm_cache GROUP BY family"
+                ).fetchall()
+            )
+
+        result = {}
+        for family, counters in self._counters.items():
+            lookups = counters["hits"] + counters["misses"]
+            result[family] = {
+                **counters,
+                "entries": sizes.get(family, 0),
+                "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+            }
+        return result
+
+
+# =========================
+# SINGLETON
+# =========================
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache | None:
+    """
+    Returns the shared cache, or None when caching is disabled/unavailable.
+    """
+    global _cache
+
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = LLMCache()
+            except Exception as e:
+                logger.exception(f"LLM cache unavailable: {e}")
+                return None
+
+    return _cache
@@ -0,0 +1,627 @@
+import asyncio
+import contextvars
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from services.llm_cache import make_cache_key
+from services.prompt_builder import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "20"))
+# Whole-response bound for streamed calls (they run longer than one-shot ones)
+LLM_STREAM_TIMEOUT_SECONDS = float(os.getenv("LLM_STREAM_TIMEOUT_SECONDS", "180"))
+
+# Marks the end of a streamed response on the chunk queue
+_STREAM_END = object()
+
+
+class LLMUnavailableError(RuntimeError):
+    pass
+
+
+class EmptyLLMResponseError(RuntimeError):
+    pass
+
+
+# HTTP statuses worth another attempt (besides any 5xx)
+_RETRYABLE_STATUSES = {408, 429}
+# Same conditions when the SDK surfaces a gRPC status instead
+_RETRYABLE_GRPC_CODES = {"DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED", "UNAVAILABLE", "INTERNAL"}
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Timeouts, dropped connections, 429 and 5xx are transient; anything else
+    (invalid argument, permission denied, empty/blocked response) fails the
+    same way on every attempt.
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if callable(status):
+        # grpc.RpcError.code() -> StatusCode
+        return getattr(status(), "name", None) in _RETRYABLE_GRPC_CODES
+
+    # google.api_core exceptions carry the HTTP status as .code
+    return isinstance(status, int) and (status in _RETRYABLE_STATUSES or status >= 500)
+
+
+@dataclass
+class TokenUsage:
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+# Where the current caller's token counts go (see track_token_usage)
+_usage_sink = contextvars.ContextVar("llm_token_usage", default=None)
+
+
+@contextmanager
+def track_token_usage():
+    """
+    Yields a TokenUsage that counts the billed tokens of LLM calls made
+    inside the block by this thread / task only. client.stats is the
+    process-wide total.
+    """
+    usage = TokenUsage()
+    reset_token = _usage_sink.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage_sink.reset(reset_token)
+
+
+async def _with_usage_sink(coro, usage):
+    # Runs on the client's loop: carry the submitting caller's sink over
+    _usage_sink.set(usage)
+    return await coro
+
+
+def _token_usage(prompt: str, text: str, response=None) -> tuple:
+    """
+    (prompt_tokens, output_tokens) from the response's usage metadata,
+    else counted locally.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+
+    if prompt_tokens is None:
+        prompt_tokens = count_tokens(prompt)
+    if output_tokens is None:
+        output_tokens = count_tokens(text)
+
+    return prompt_tokens, output_tokens
+
+
+# =========================
+# ASYNC CLIENT
+# =========================
+class LLMClient:
+    """
+    Async client around a Gemini-style model (anything with generate_content).
+    All calls run on one private event loop, so the concurrency semaphore is
+    shared by every caller: API requests, schedulers and sync code alike.
+
+    Cache lookups and stores (blocking SQLite I/O) run on the loop's default
+    executor, never on the loop itself or on the LLM call workers.
+
+    A call may pass a static `context` (e.g. the master prompt):
+    context_model_factory(context) returns a model that already holds it
+    (cached content); without one, the context is prepended to the prompt.
+    """
+
+    def __init__(
+        self,
+        model_factory,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE_SECONDS,
+        backoff_max: float = LLM_BACKOFF_MAX_SECONDS,
+        cache=None,
+        context_model_factory=None,
+    ):
+        self._model_factory = model_factory
+        self._context_model_factory = context_model_factory
+        self.cache = cache
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._semaphore = None
+        self._executor = None
+
+        self.stats = {
+            "calls": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "in_flight": 0,
+            # Billed calls only (cache hits cost nothing)
+            "prompt_tokens": 0,
+            "output_tokens": 0,
+        }
+
+    # -------------------------
+    # LOOP MANAGEMENT
+    # -------------------------
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="llm-client-loop",
+                    daemon=True
+                ).start()
+
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="llm-call"
+                )
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._loop = loop
+
+        return self._loop
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(
+            _with_usage_sink(coro, _usage_sink.get()),
+            self._ensure_loop()
+        )
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._executor.shutdown(wait=False)
+            self._loop = None
+            self._semaphore = None
+            self._executor = None
+
+    # -------------------------
+    # CORE CALL
+    # -------------------------
+    def _backoff_delay(self, attempt: int) -> float:
+        # Full jitter: uniform(0, min(cap, base * 2^attempt))
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def _count_tokens(self, prompt: str, text: str, response=None):
+        prompt_tokens, output_tokens = _token_usage(prompt, text, response)
+        self.stats["prompt_tokens"] += prompt_tokens
+        self.stats["output_tokens"] += output_tokens
+
+        usage = _usage_sink.get()
+        if usage is not None:
+            usage.prompt_tokens += prompt_tokens
+            usage.output_tokens += output_tokens
+
+    def tokens_used(self) -> int:
+        return self.stats["prompt_tokens"] + self.stats["output_tokens"]
+
+    async def _resolve_model(self, prompt: str, context: str | None):
+        """
+        (model, prompt to send) for one call with an optional static context.
+        """
+        if context and self._context_model_factory is not None:
+            # May create the cached context (a network call): keep it off the loop
+            loop = asyncio.get_running_loop()
+            model = await loop.run_in_executor(self._executor, self._context_model_factory, context)
+            if model is not None:
+                return model, prompt
+
+        model = self._model_factory()
+        if model is None:
+            raise LLMUnavailableError("LLM model unavailable")
+
+        return model, f"{context}\n{prompt}" if context else prompt
+
+    async def _run_in_worker(self, fn, timeout: float):
+        """
+        Runs blocking fn on an executor worker, within the concurrency limit.
+        The slot is freed when the worker thread actually returns, not when
+        the caller stops waiting: a timed-out call still blocked in the SDK
+        keeps its slot, so later calls wait for a free worker instead of
+        queueing behind it and timing out before they even start.
+        """
+        await self._semaphore.acquire()
+        self.stats["in_flight"] += 1
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, fn)
+
+        def _release(done):
+            self.stats["in_flight"] -= 1
+            self._semaphore.release()
+            if not done.cancelled():
+                done.exception()  # retrieved: no "never retrieved" warning after a timeout
+
+        future.add_done_callback(_release)
+
+        # shield: a timeout must not cancel (and so release) the running future
+        return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+
+    async def _call_model(self, model, prompt: str, **params):
+        return await self._run_in_worker(
+            lambda: model.generate_content(
+                prompt,
+                request_options={"timeout": self.timeout},
+                **params
+            ),
+            timeout=self.timeout
+        )
+
+    async def _generate(
+        self,
+        prompt: str,
+        cache_family: str | None = None,
+        context: str | None = None,
+        **params
+    ) -> str:
+        full_prompt = f"{context}\n{prompt}" if context else prompt
+        model, prompt = await self._resolve_model(prompt, context)
+
+        cache_key = None
+        if self.cache is not None and self.cache.is_cacheable(cache_family):
+            cache_key = make_cache_key(
+                getattr(model, "model_name", type(model).__name__),
+                full_prompt,
+                params
+            )
+            cached = await asyncio.to_thread(self.cache.get, cache_family, cache_key)
+            if cached is not None:
+                return cached
+
+        self.stats["calls"] += 1
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                response = await self._call_model(model, prompt, **params)
+
+                text = getattr(response, "text", None) if response else None
+                if not text:
+                    raise EmptyLLMResponseError("Empty response received from LLM")
+
+                self.stats["succeeded"] += 1
+                self._count_tokens(full_prompt, text, response)
+                text = text.strip()
+
+                if cache_key:
+                    await asyncio.to_thread(self.cache.set, cache_family, cache_key, text)
+
+                return text
+
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["timeouts"] += 1
+
+                if attempt > self.max_retries or not _is_retryable(e):
+                    self.stats["failed"] += 1
+                    raise
+
+                delay = self._backoff_delay(attempt)
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"LLM call failed (attempt {attempt}/{self.max_retries + 1}): "
+                    f"{e!r}. Retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    # -------------------------
+    # STREAMING
+    # -------------------------
+    def _pump_stream(
+        self,
+        model,
+        prompt: str,
+        chunks: queue.Queue,
+        parts: list,
+        stop: threading.Event,
+        closed: threading.Event,
+        **params
+    ):
+        # Runs on an executor thread: the model's stream iterator blocks
+        response = model.generate_content(
+            prompt,
+            stream=True,
+            request_options={"timeout": LLM_STREAM_TIMEOUT_SECONDS},
+            **params
+        )
+        for chunk in response:
+            if stop.is_set() or closed.is_set():
+                return
+            text = getattr(chunk, "text", None)
+            if text:
+                parts.append(text)
+                chunks.put(text)
+
+    async def _stream(
+        self,
+        prompt: str,
+        chunks: queue.Queue,
+        closed: threading.Event,
+        cache_family: str | None = None,
+        context: str | None = None,
+        **params
+    ):
+        """
+        Puts text chunks on `chunks` as the model produces them, then
+        _STREAM_END, or the exception that ended the call.
+        Retries only while nothing has been emitted yet; stops early
+        (without caching the partial text) once the consumer is `closed`.
+        """
+        try:
+            full_prompt = f"{context}\n{prompt}" if context else prompt
+            model, prompt = await self._resolve_model(prompt, context)
+
+            cache_key = None
+            if self.cache is not None and self.cache.is_cacheable(cache_family):
+                cache_key = make_cache_key(
+                    getattr(model, "model_name", type(model).__name__),
+                    full_prompt,
+                    params
+                )
+                cached = await asyncio.to_thread(self.cache.get, cache_family, cache_key)
+                if cached is not None:
+                    chunks.put(cached)
+                    chunks.put(_STREAM_END)
+                    return
+
+            self.stats["calls"] += 1
+            attempt = 0
+
+            while True:
+                attempt += 1
+                parts = []
+                # Per attempt: silences a timed-out pump that is still running
+                stop = threading.Event()
+                try:
+                    await self._run_in_worker(
+                        lambda: self._pump_stream(model, prompt, chunks, parts, stop, closed, **params),
+                        timeout=LLM_STREAM_TIMEOUT_SECONDS
+                    )
+
+                    if closed.is_set():
+                        return
+
+                    text = "".join(parts).strip()
+                    if not text:
+                        raise EmptyLLMResponseError("Empty response received from LLM")
+
+                    self.stats["succeeded"] += 1
+                    self._count_tokens(full_prompt, text)
+                    if cache_key:
+                        await asyncio.to_thread(self.cache.set, cache_family, cache_key, text)
+
+                    chunks.put(_STREAM_END)
+                    return
+
+                except Exception as e:
+                    stop.set()
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.stats["timeouts"] += 1
+
+                    # Chunks already reached the caller: a retry would duplicate them
+                    if parts or attempt > self.max_retries or not _is_retryable(e):
+                        self.stats["failed"] += 1
+                        raise
+
+                    delay = self._backoff_delay(attempt)
+                    self.stats["retries"] += 1
+                    logger.warning(
+                        f"LLM stream failed (attempt {attempt}/{self.max_retries + 1}): "
+                        f"{e!r}. Retrying in {delay:.2f}s"
+                    )
+                    await asyncio.sleep(delay)
+
+        except Exception as e:
+            chunks.put(e)
+
+    def stream_sync(self, prompt: str, **params):
+        """
+        Iterator over text chunks as they are generated (stream=True).
+        Same concurrency limit, retries and cache as generate_sync().
+        Raises whatever ended the call, after the chunks received so far.
+        """
+        chunks = queue.Queue()
+        closed = threading.Event()
+        self._submit(self._stream(prompt, chunks, closed, **params))
+
+        try:
+            while True:
+                item = chunks.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Consumer went away (e.g. SSE client disconnected): stop reading
+            closed.set()
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+    async def generate(self, prompt: str, **params) -> str:
+        """
+        Awaitable from any event loop (e.g. FastAPI handlers).
+        Pass cache_family (see llm_cache.FAMILY_POLICIES) to reuse identical calls,
+        context for a static prompt prefix kept in a cached context.
+        """
+        return await asyncio.wrap_future(self._submit(self._generate(prompt, **params)))
+
+    async def generate_many(self, prompts, **params) -> list:
+        """
+        Fans out all prompts at once; the semaphore bounds real concurrency.
+        Failed prompts come back as the exception instance.
+        """
+        return await asyncio.gather(
+            *(self.generate(prompt, **params) for prompt in prompts),
+            return_exceptions=True
+        )
+
+    def generate_sync(self, prompt: str, **params) -> str:
+        """
+        Blocking shim for existing sync callers (routes, schedulers).
+        """
+        return self._submit(self._generate(prompt, **params)).result()
+
+    def generate_many_sync(self, prompts, **params) -> list:
+        async def _gather():
+            return await asyncio.gather(
+                *(self._generate(prompt, **params) for prompt in prompts),
+                return_exceptions=True
+            )
+
+        return self._submit(_gather()).result()
+
+
+# =========================
+# OFFLINE FAKE MODEL
+# =========================
+class SimulatedServerError(RuntimeError):
+    code = 503
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Local stand-in for genai.GenerativeModel.
+    Simulates latency and failures so the client can be load-tested offline.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.1,
+        failure_rate: float = 0.0,
+        response_text: str | None = None
+    ):
+        self.model_name = "fake-model"
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.response_text = response_text
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        if random.random() < self.failure_rate:
+            raise SimulatedServerError("Simulated LLM failure")
+
+        text = (
+            self.response_text
+            or f"Fake response for a {len(str(prompt))} character prompt"
+        )
+
+        if stream:
+            return self._stream_chunks(text)
+
+        return FakeResponse(text)
+
+    def _stream_chunks(self, text: str, chunk_size: int = 40):
+        # Spread the full latency again across the chunks, like token streaming
+        pause = self.latency / max(1, len(text) // chunk_size)
+        for start in range(0, len(text), chunk_size):
+            if start:
+                time.sleep(pause)
+            yield FakeResponse(text[start:start + chunk_size])
+
+
+# =========================
+# LOAD TEST
+# =========================
+def load_test(
+    requests: int = 200,
+    concurrency: int = 16,
+    latency: float = 0.2,
+    failure_rate: float = 0.0
+) -> dict:
+    model = FakeModel(latency=latency, failure_rate=failure_rate)
+    client = LLMClient(
+        model_factory=lambda: model,
+        max_concurrency=concurrency,
+        backoff_base=0.05,
+        backoff_max=0.5
+    )
+
+    latencies = []
+
+    async def _timed(prompt):
+        started = time.perf_counter()
+        try:
+            return await client._generate(prompt)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    async def _run():
+        return await asyncio.gather(
+            *(_timed(f"prompt {i}") for i in range(requests)),
+            return_exceptions=True
+        )
+
+    started = time.perf_counter()
+    results = client._submit(_run()).result()
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    latencies.sort()
+    failures = sum(1 for r in results if isinstance(r, Exception))
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "failures": failures,
+        "retries": client.stats["retries"],
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 2) if elapsed else 0.0,
+        "p50_seconds": round(latencies[len(latencies) // 2], 3),
+        "p95_seconds": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline LLM client load test")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(load_test(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        failure_rate=args.failure_rate
+    ))
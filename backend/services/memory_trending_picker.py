@@ -1,19 +1,38 @@
+import logging
+
 from services.trending_agent import get_trending_topics
+from services.trend_memory_service import check_topics
+
+logger = logging.getLogger(__name__)
 
 
-def pick_memory_safe_trending_topic(db, region: str = "global"):
+def pick_memory_safe_trending_topic(
+    db,
+    region: str = "global",
+    master_prompt: str = "",
+    limit: int = 5
+):
     """
-    Picks a trending topic while avoiding repetition
+    Picks a trending topic while avoiding repetition:
+    the first candidate that trend memory admits (not a near-duplicate of
+    a topic on cooldown or used too often). Checked in one query.
     """
     topics = get_trending_topics(
-        master_prompt="",
+        master_prompt=master_prompt,
         region=region,
-        limit=5
+        limit=limit
     )
 
     if not topics:
         raise RuntimeError("No trending topics available")
 
-    # Simple selection strategy (can be improved later)
-    return topics[0]
+    for decision in check_topics(db, topics):
+        if decision.allowed:
+            return decision.topic
+
+        logger.info(
+            f"Skipping topic '{decision.topic}': {decision.reason}"
+            + (f" (matches '{decision.matched}')" if decision.matched else "")
+        )
 
+    raise RuntimeError("All trending topics were used recently")
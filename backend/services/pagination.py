@@ -0,0 +1,119 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query, Session, load_only
+
+from models import Article
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Columns behind ArticleListOut
+ARTICLE_LIST_FIELDS = (
+    "id",
+    "title",
+    "meta_description",
+    "view_count",
+    "status",
+    "created_at",
+    "platform_target",
+    "is_deleted",
+    "deleted_at",
+    "verified",
+)
+
+
+def article_list_columns():
+    """
+    Loader option restricting list queries to the ArticleListOut columns.
+    Keeps canonical_content / content (large Text) out of list responses.
+    """
+    return load_only(*(getattr(Article, field) for field in ARTICLE_LIST_FIELDS))
+
+
+# =========================
+# CURSOR ENCODING
+# =========================
+
+def encode_cursor(created_at: datetime, article_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{article_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Raises ValueError on malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, article_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(article_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+# =========================
+# LIST QUERIES
+# =========================
+
+def published_articles_query(db: Session) -> Query:
+    # routes/public.get_all_articles
+    return (
+        db.query(Article)
+        .options(article_list_columns())
+        .filter(Article.status == "published")
+    )
+
+
+def admin_articles_query(db: Session) -> Query:
+    # routes/owner.admin_articles
+    return (
+        db.query(Article)
+        .options(article_list_columns())
+        .filter(Article.is_deleted == False)
+    )
+
+
+# =========================
+# KEYSET PAGE
+# =========================
+
+def keyset_query(query: Query, limit: int, cursor: str | None = None) -> Query:
+    """
+    One newest-first page over (created_at, id), plus one row to detect
+    whether another page follows.
+    """
+    if cursor:
+        created_at, article_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Article.created_at, Article.id) < tuple_(created_at, article_id)
+        )
+
+    return query.order_by(Article.created_at.desc(), Article.id.desc()).limit(limit + 1)
+
+
+def keyset_page(query: Query, limit: int | None, cursor: str | None = None) -> tuple:
+    """
+    Newest-first page over (created_at, id).
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Without limit and cursor every row is returned, as before paging
+    existed (clients that don't page still see the whole list);
+    a cursor alone pages with DEFAULT_PAGE_SIZE.
+    """
+    if limit is None:
+        if not cursor:
+            return query.order_by(Article.created_at.desc(), Article.id.desc()).all(), None
+        limit = DEFAULT_PAGE_SIZE
+
+    rows = keyset_query(query, limit, cursor).all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
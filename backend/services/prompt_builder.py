@@ -0,0 +1,94 @@
+import os
+import re
+import threading
+
+# =========================
+# TOKEN COUNTING (LOCAL)
+# =========================
+# Words, numbers and punctuation runs: roughly what a
+# SentencePiece/BPE tokenizer splits English prose into
+_PIECE_RE = re.compile(r"\w+|[^\w\s]+")
+
+# Where a trimmed excerpt may end: after . ! ? (then whitespace) or at a newline
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s)|\n")
+_WORD_END_RE = re.compile(r"\S(?=\s)")
+
+# Common English words are one token; longer ones split every ~4 characters
+_CHARS_PER_TOKEN = 4
+
+
+def _piece_tokens(piece: str) -> int:
+    if not piece.isascii():
+        # CJK and other non-Latin scripts: about one token per character
+        return len(piece)
+    return max(1, round(len(piece) / _CHARS_PER_TOKEN))
+
+
+def count_tokens(text: str) -> int:
+    """
+    Local estimate of the model's token count (no API call),
+    close to ~4 characters per token on English prose.
+    """
+    if not text:
+        return 0
+    return sum(_piece_tokens(piece) for piece in _PIECE_RE.findall(text))
+
+
+def _trim_at(text: str, boundaries, budget: int) -> str:
+    used, start, end = 0, 0, 0
+    for match in boundaries:
+        used += count_tokens(text[start:match.end()])
+        if used > budget:
+            break
+        start = end = match.end()
+    return text[:end].rstrip()
+
+
+def trim_to_tokens(text: str, budget: int) -> str:
+    """
+    Longest prefix of `text` within `budget` tokens that ends on a
+    sentence boundary (a word boundary if the first sentence alone is over).
+    """
+    text = (text or "").strip()
+    if count_tokens(text) <= budget:
+        return text
+
+    trimmed = _trim_at(text, _SENTENCE_END_RE.finditer(text), budget)
+    return trimmed or _trim_at(text, _WORD_END_RE.finditer(text), budget)
+
+
+# =========================
+# PROMPT FILES (MEMOIZED)
+# =========================
+class StaticPrompt(str):
+    """
+    A prompt that is identical on every call (master prompt, fixed
+    instructions). The LLM client keeps it in a cached context instead of
+    re-sending it as part of each request.
+    """
+
+
+_prompts = {}
+_prompts_lock = threading.Lock()
+
+
+def load_prompt(path: str) -> StaticPrompt:
+    """
+    Reads a prompt file once; re-reads only when its mtime or size changes.
+    Raises FileNotFoundError if it is missing.
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    with _prompts_lock:
+        cached = _prompts.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        prompt = StaticPrompt(f.read())
+
+    with _prompts_lock:
+        _prompts[path] = (signature, prompt)
+
+    return prompt
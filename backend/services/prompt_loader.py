@@ -1,12 +1,13 @@
 import os
 
+from services.prompt_builder import load_prompt
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 PROMPT_PATH = os.path.join(BASE_DIR, "master_prompt.txt")
 
 def load_master_prompt():
+    # Memoized: the file is only re-read after it changes on disk
     if not os.path.exists(PROMPT_PATH):
         raise FileNotFoundError(f"master_prompt.txt not found at {PROMPT_PATH}")
 
-    with open(PROMPT_PATH, "r", encoding="utf-8") as f:
-        return f.read()
-
+    return load_prompt(PROMPT_PATH)
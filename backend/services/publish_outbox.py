@@ -0,0 +1,309 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import logging
+import os
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Article
+from models_publish import PublishRequest
+from services.publishers.registry import publish_to_platforms
+from services.search_index import sync_article
+from services.stats_cache import invalidate_overview_stats
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+# Longer than any publisher's HTTP timeout: older in-flight rows were interrupted
+PUBLISH_STUCK_MINUTES = int(os.getenv("PUBLISH_STUCK_MINUTES", "15"))
+
+PUBLISHING = "publishing"
+PUBLISHED = "published"
+FAILED = "failed"
+UNKNOWN = "unknown"
+
+# Article status after an interrupted publish: kept out of the auto-publish
+# queue so a post that may already be live is not published twice
+PUBLISH_FAILED = "publish_failed"
+
+
+def status_url(request_id: int) -> str:
+    return f"/api/admin/publish-requests/{request_id}"
+
+
+def publish_request_out(request: PublishRequest) -> dict:
+    return {
+        "request_id": request.id,
+        "article_id": request.article_id,
+        "platform": request.platform,
+        "status": request.status,
+        "url": request.url,
+        "error": request.error,
+        "created_at": request.created_at,
+        "finished_at": request.finished_at,
+        "status_url": status_url(request.id)
+    }
+
+
+# =========================
+# STEP 1: CLAIM (short transaction)
+# =========================
+
+def begin_publish(db: Session, article_ids: list, platforms: list) -> tuple:
+    """
+    Moves each article to "publishing" and writes one outbox row per
+    (article, platform), then commits. Nothing is sent yet.
+    The status change is a compare-and-set, so two concurrent requests
+    can never both claim the same article.
+    Returns (request_ids, skipped) where skipped lists {"article_id", "status"}.
+    """
+    article_ids = list(dict.fromkeys(article_ids))
+    platforms = list(dict.fromkeys(p.lower() for p in platforms))
+
+    current = dict(
+        db.query(Article.id, Article.status)
+        .filter(Article.id.in_(article_ids), Article.is_deleted == False)
+        .all()
+    )
+
+    requests = []
+    skipped = []
+    # One timestamp per claim: it identifies the claim's rows when settling
+    claimed_at = datetime.utcnow()
+
+    for article_id in article_ids:
+        status = current.get(article_id)
+
+        if article_id not in current:
+            skipped.append({"article_id": article_id, "status": "not_found"})
+            continue
+
+        if status in (PUBLISHED, PUBLISHING):
+            skipped.append({"article_id": article_id, "status": f"already_{status}"})
+            continue
+
+        claimed = db.execute(
+            update(Article)
+            .where(Article.id == article_id, Article.status == status)
+            .values(status=PUBLISHING)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if not claimed:
+            skipped.append({"article_id": article_id, "status": "conflict"})
+            continue
+
+        for platform in platforms:
+            request = PublishRequest(
+                article_id=article_id,
+                platform=platform,
+                status=PUBLISHING,
+                previous_status=status,
+                created_at=claimed_at
+            )
+            db.add(request)
+            requests.append(request)
+
+    db.flush()
+    request_ids = [r.id for r in requests]
+    db.commit()
+
+    return request_ids, skipped
+
+
+# =========================
+# STEP 2: SEND (no session held)
+# =========================
+
+def _snapshot(article: Article) -> SimpleNamespace:
+    # Only what publishers read; detached from any session
+    return SimpleNamespace(
+        id=article.id,
+        title=article.title,
+        canonical_content=article.canonical_content,
+        seo_tags=article.seo_tags
+    )
+
+
+def run_publish_requests(request_ids: list) -> list:
+    """
+    Sends the given outbox rows and records the outcome.
+    The DB is touched twice, briefly: once to read what to send and
+    once to record results; no connection is held during network calls.
+    """
+    if not request_ids:
+        return []
+
+    db: Session = SessionLocal()
+    try:
+        requests = (
+            db.query(PublishRequest)
+            .filter(PublishRequest.id.in_(request_ids), PublishRequest.status == PUBLISHING)
+            .all()
+        )
+        articles = {
+            a.id: _snapshot(a)
+            for a in db.query(Article).filter(
+                Article.id.in_({r.article_id for r in requests})
+            ).all()
+        }
+        by_platform = defaultdict(list)
+        for r in requests:
+            if r.article_id in articles:
+                by_platform[r.platform].append((r.id, articles[r.article_id]))
+    finally:
+        db.close()
+
+    per_platform = publish_to_platforms({
+        platform: [article for _, article in items]
+        for platform, items in by_platform.items()
+    })
+
+    outcomes = []
+    for platform, results in per_platform.items():
+        outcomes.extend(
+            (request_id, result)
+            for (request_id, _), result in zip(by_platform[platform], results)
+        )
+
+    record_publish_results(outcomes)
+    return outcomes
+
+
+# =========================
+# STEP 3: RECORD (short transaction)
+# =========================
+
+def _settle_articles(db: Session, article_ids: set, now: datetime):
+    """
+    An article is published once any platform accepted it; when every
+    row has finished without success its previous status is restored.
+    """
+    rows = (
+        db.query(PublishRequest)
+        .filter(PublishRequest.article_id.in_(article_ids))
+        .order_by(PublishRequest.id)
+        .all()
+    )
+    by_article = defaultdict(list)
+    for r in rows:
+        by_article[r.article_id].append(r)
+
+    for article in db.query(Article).filter(Article.id.in_(article_ids)).all():
+        if article.status != PUBLISHING:
+            continue
+
+        # Rows of the current claim share its created_at (see begin_publish)
+        latest = max(r.created_at for r in by_article[article.id])
+        attempt = [r for r in by_article[article.id] if r.created_at == latest]
+        statuses = {r.status for r in attempt}
+
+        if PUBLISHED in statuses:
+            article.status = PUBLISHED
+            article.published_at = now
+            sync_article(db, article)
+        elif PUBLISHING not in statuses:
+            article.status = PUBLISH_FAILED if UNKNOWN in statuses else attempt[0].previous_status
+
+
+def record_publish_results(outcomes: list):
+    if not outcomes:
+        return
+
+    now = datetime.utcnow()
+    db: Session = SessionLocal()
+    try:
+        requests = {
+            r.id: r
+            for r in db.query(PublishRequest)
+            .filter(PublishRequest.id.in_([request_id for request_id, _ in outcomes]))
+            .all()
+        }
+
+        for request_id, result in outcomes:
+            request = requests.get(request_id)
+            if request is None or request.status != PUBLISHING:
+                continue
+
+            if result["status"] == PUBLISHED:
+                request.status = PUBLISHED
+                request.post_id = result.get("post_id")
+                request.url = result.get("url")
+            else:
+                request.status = FAILED
+                request.error = result.get("error")
+            request.finished_at = now
+
+        db.flush()
+        _settle_articles(db, {r.article_id for r in requests.values()}, now)
+        db.commit()
+
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to record publish results; the reconciler will settle them")
+        raise
+
+    finally:
+        db.close()
+
+    invalidate_overview_stats()
+
+    for request_id, result in outcomes:
+        if result["status"] == PUBLISHED:
+            logger.info(f"Published request {request_id}: {result.get('url')}")
+        else:
+            logger.warning(f"Publish request {request_id} failed: {result.get('error')}")
+
+
+# =========================
+# RECONCILER
+# =========================
+
+def reconcile_stuck_publishes(db: Session, now: datetime | None = None) -> int:
+    """
+    Settles outbox rows left in "publishing" by a crash or restart.
+    Their outcome is unknown (the post may be live), so they are marked
+    "unknown" and the article is parked in "publish_failed" for review
+    rather than retried automatically.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(minutes=PUBLISH_STUCK_MINUTES)
+
+    stuck = (
+        db.query(PublishRequest)
+        .filter(PublishRequest.status == PUBLISHING, PublishRequest.created_at < cutoff)
+        .all()
+    )
+    if not stuck:
+        return 0
+
+    for request in stuck:
+        request.status = UNKNOWN
+        request.error = "Interrupted before the result was recorded; check the platform before retrying"
+        request.finished_at = now
+
+    db.flush()
+    _settle_articles(db, {r.article_id for r in stuck}, now)
+    db.commit()
+
+    logger.warning(f"Reconciled {len(stuck)} stuck publish requests")
+    return len(stuck)
+
+
+def run_publish_reconciler():
+    """
+    Scheduler entry point
+    """
+    db = SessionLocal()
+    try:
+        reconcile_stuck_publishes(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Publish reconciler failed")
+    finally:
+        db.close()
@@ -1,10 +1,122 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class RateLimiter:
+    """
+    Token bucket: `per_minute` publishes per minute, bursts up to `burst`.
+    A rate of 0 (or less) means no limit.
+    """
+
+    def __init__(self, per_minute: float, burst: int = 5):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """
+        Takes one token; returns 0, or the seconds to wait before retrying.
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, count: int = 1):
+        for _ in range(count):
+            while (wait := self._take()) > 0:
+                time.sleep(wait)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(platform: str, per_minute: float) -> RateLimiter:
+    """
+    One limiter per platform per process, shared by every publisher instance.
+    """
+    with _rate_limiters_lock:
+        if platform not in _rate_limiters:
+            _rate_limiters[platform] = RateLimiter(per_minute)
+        return _rate_limiters[platform]
+
+
+def published_result(article, platform: str, post_id: str, url: str) -> dict:
+    return {
+        "article_id": article.id,
+        "platform": platform,
+        "post_id": post_id,
+        "url": url,
+        "status": "published",
+        "published_at": datetime.utcnow().isoformat()
+    }
+
+
+def failed_result(article, platform: str, error: Exception) -> dict:
+    return {
+        "article_id": article.id,
+        "platform": platform,
+        "status": "failed",
+        "error": f"{type(error).__name__}: {error}"
+    }
+
+
 class BasePublisher:
     """
     Abstract publisher class.
     All CMS publishers must follow this contract.
     """
 
+    platform = "base"
+    rate_per_minute = 60.0
+    max_concurrency = 4
+
     def publish(self, article):
         raise NotImplementedError(
             "Publisher must implement publish() method"
         )
+
+    def rate_limiter(self) -> RateLimiter:
+        return get_rate_limiter(self.platform, self.rate_per_minute)
+
+    def publish_many(self, articles: list) -> list:
+        """
+        Publishes each article, at most `max_concurrency` at a time and within
+        the platform rate limit. Returns one result per article, in order;
+        a failing item yields a "failed" result instead of raising.
+        """
+        if not articles:
+            return []
+
+        limiter = self.rate_limiter()
+
+        def publish_one(article):
+            limiter.acquire()
+            try:
+                return {
+                    "article_id": article.id,
+                    "platform": self.platform,
+                    **self.publish(article)
+                }
+            except Exception as e:
+                return failed_result(article, self.platform, e)
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(articles)),
+            thread_name_prefix=f"publish-{self.platform}"
+        ) as pool:
+            return list(pool.map(publish_one, articles))
+
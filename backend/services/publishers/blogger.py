@@ -1,10 +1,18 @@
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.http import BatchHttpRequest, HttpRequest
+import httplib2
+import logging
 import os
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 
-from services.publishers.base import BasePublisher
+from services.publishers.base import BasePublisher, failed_result, published_result
+
+logger = logging.getLogger(__name__)
 
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
@@ -14,36 +22,202 @@ TOKEN_FILE = os.path.join(CREDENTIALS_DIR, "blogger_token.json")
 
 SCOPES = ["https://www.googleapis.com/auth/blogger"]
 
+BLOGGER_ROOT_URL = "https://blogger.googleapis.com/"
 
-class BloggerPublisher(BasePublisher):
+# =========================
+# CONFIG
+# =========================
+# Skips blog discovery entirely when set
+BLOGGER_BLOG_ID = os.getenv("BLOGGER_BLOG_ID")
+BLOGGER_BLOG_ID_TTL_SECONDS = float(os.getenv("BLOGGER_BLOG_ID_TTL_SECONDS", "3600"))
+# Refresh the access token this long before it expires
+BLOGGER_TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("BLOGGER_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+# Alternate API root / OAuth token endpoint, e.g. a local stand-in server for benchmarks
+BLOGGER_API_ENDPOINT = os.getenv("BLOGGER_API_ENDPOINT")
+BLOGGER_TOKEN_URI = os.getenv("BLOGGER_TOKEN_URI")
+# Blogger's insert quota is low; keep bulk publishing well under it (0 = no limit)
+BLOGGER_PUBLISH_RATE_PER_MINUTE = float(os.getenv("BLOGGER_PUBLISH_RATE_PER_MINUTE", "30"))
+# Posts per batch HTTP request in publish_many()
+BLOGGER_BATCH_SIZE = int(os.getenv("BLOGGER_BATCH_SIZE", "10"))
+# Bounds every API call, so an in-flight publish always ends (see PUBLISH_STUCK_MINUTES)
+BLOGGER_HTTP_TIMEOUT_SECONDS = float(os.getenv("BLOGGER_HTTP_TIMEOUT_SECONDS", "60"))
 
-    def _get_service(self):
-        if not os.path.exists(TOKEN_FILE):
+
+class BloggerClient:
+    """
+    Process-wide Blogger API access.
+    Credentials, the discovery-built service and the blog id are built once
+    and shared by every publish; the token is refreshed ahead of expiry
+    under a lock, and re-read if the token file changes on disk.
+    """
+
+    def __init__(
+        self,
+        token_file: str = TOKEN_FILE,
+        api_endpoint: str | None = BLOGGER_API_ENDPOINT,
+        token_uri: str | None = BLOGGER_TOKEN_URI,
+        blog_id: str | None = BLOGGER_BLOG_ID,
+        blog_id_ttl: float = BLOGGER_BLOG_ID_TTL_SECONDS,
+        refresh_margin: float = BLOGGER_TOKEN_REFRESH_MARGIN_SECONDS
+    ):
+        self.token_file = token_file
+        self.api_endpoint = api_endpoint
+        self.token_uri = token_uri
+        self.fixed_blog_id = blog_id
+        self.blog_id_ttl = blog_id_ttl
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+
+        self._lock = threading.RLock()
+        self._creds = None
+        self._token_mtime = None
+        self._service = None
+        self._blog_id = None
+        self._blog_id_expires = 0.0
+
+        # httplib2.Http is not thread-safe: one connection per thread
+        self._local = threading.local()
+
+    # -------------------------
+    # CREDENTIALS
+    # -------------------------
+
+    def _load_credentials(self):
+        if not os.path.exists(self.token_file):
             raise RuntimeError("Blogger token not found. Run blogger_auth first.")
 
-        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        mtime = os.path.getmtime(self.token_file)
+        if self._creds is None or mtime != self._token_mtime:
+            self._creds = Credentials.from_authorized_user_file(self.token_file, SCOPES)
+            if self.token_uri:
+                expiry = self._creds.expiry
+                self._creds = self._creds.with_token_uri(self.token_uri)
+                self._creds.expiry = expiry  # not carried over by with_token_uri
+            self._token_mtime = mtime
 
-        # 🔐 Auto refresh token
-        if creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-            with open(TOKEN_FILE, "w") as f:
-                f.write(creds.to_json())
+    def _needs_refresh(self) -> bool:
+        creds = self._creds
+        if not creds.token:
+            return True
+        if creds.expiry is None:
+            return False
+        return creds.expiry - self.refresh_margin <= datetime.utcnow()
 
-        return build("blogger", "v3", credentials=creds)
+    def credentials(self) -> Credentials:
+        with self._lock:
+            self._load_credentials()
 
-    def get_blog_id(self):
-        service = self._get_service()
-        blogs = service.blogs().listByUser(userId="self").execute()
+            # 🔐 Proactive refresh: never hand out a token about to expire
+            if self._needs_refresh() and self._creds.refresh_token:
+                self._creds.refresh(Request())
 
-        if not blogs.get("items"):
-            raise RuntimeError("No Blogger blogs found")
+                # Atomic replace: other processes (API, worker) may be reading it
+                tmp_file = f"{self.token_file}.{os.getpid()}.tmp"
+                with open(tmp_file, "w") as f:
+                    f.write(self._creds.to_json())
+                os.replace(tmp_file, self.token_file)
 
-        return blogs["items"][0]["id"]
+                self._token_mtime = os.path.getmtime(self.token_file)
+                logger.info("Blogger access token refreshed")
 
-    def publish(self, article):
-        service = self._get_service()
-        blog_id = self.get_blog_id()
+            return self._creds
+
+    # -------------------------
+    # SERVICE
+    # -------------------------
+
+    def _thread_http(self):
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = httplib2.Http(timeout=BLOGGER_HTTP_TIMEOUT_SECONDS)
+        return http
+
+    def _build_request(self, http, *args, **kwargs):
+        authed = AuthorizedHttp(self.credentials(), http=self._thread_http())
+        return HttpRequest(authed, *args, **kwargs)
+
+    def service(self):
+        with self._lock:
+            if self._service is None:
+                client_options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+                self._service = build(
+                    "blogger",
+                    "v3",
+                    http=AuthorizedHttp(self.credentials(), http=httplib2.Http(timeout=BLOGGER_HTTP_TIMEOUT_SECONDS)),
+                    requestBuilder=self._build_request,
+                    client_options=client_options,
+                    cache_discovery=False
+                )
+            return self._service
+
+    # -------------------------
+    # BLOG ID
+    # -------------------------
+
+    def blog_id(self) -> str:
+        if self.fixed_blog_id:
+            return self.fixed_blog_id
+
+        with self._lock:
+            if self._blog_id and time.monotonic() < self._blog_id_expires:
+                return self._blog_id
+
+            blogs = self.service().blogs().listByUser(userId="self").execute()
+
+            if not blogs.get("items"):
+                raise RuntimeError("No Blogger blogs found")
+
+            self._blog_id = blogs["items"][0]["id"]
+            self._blog_id_expires = time.monotonic() + self.blog_id_ttl
+            return self._blog_id
+
+    def new_batch(self, callback=None) -> BatchHttpRequest:
+        """
+        Batch request against the configured API root (build() would always
+        point batches at the public endpoint, ignoring api_endpoint).
+        """
+        root = self.api_endpoint or BLOGGER_ROOT_URL
+        return BatchHttpRequest(callback=callback, batch_uri=f"{root.rstrip('/')}/batch")
+
+    def reset(self):
+        """
+        Drops cached state (e.g. after re-running blogger_auth with another account).
+        """
+        with self._lock:
+            self._creds = None
+            self._token_mtime = None
+            self._service = None
+            self._blog_id = None
+            self._blog_id_expires = 0.0
 
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_blogger_client() -> BloggerClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = BloggerClient()
+    return _client
+
+
+class BloggerPublisher(BasePublisher):
+
+    platform = "blogger"
+    rate_per_minute = BLOGGER_PUBLISH_RATE_PER_MINUTE
+
+    def __init__(self, client: BloggerClient | None = None):
+        self.client = client or get_blogger_client()
+
+    def _get_service(self):
+        return self.client.service()
+
+    def get_blog_id(self):
+        return self.client.blog_id()
+
+    def _insert_request(self, service, blog_id: str, article):
         body = {
             "kind": "blogger#post",
             "title": article.title,  # Blogger title only
@@ -51,11 +225,17 @@ class BloggerPublisher(BasePublisher):
             "labels": article.seo_tags.split(",") if article.seo_tags else []
         }
 
-        post = service.posts().insert(
+        return service.posts().insert(
             blogId=blog_id,
             body=body,
             isDraft=False
-        ).execute()
+        )
+
+    def publish(self, article):
+        service = self._get_service()
+        blog_id = self.get_blog_id()
+
+        post = self._insert_request(service, blog_id, article).execute()
 
         return {
             "post_id": post["id"],
@@ -63,3 +243,49 @@ class BloggerPublisher(BasePublisher):
             "status": "published",
             "published_at": datetime.utcnow().isoformat()
         }
+
+    def publish_many(self, articles: list) -> list:
+        """
+        Sends up to BLOGGER_BATCH_SIZE inserts per HTTP round trip through
+        the Blogger batch endpoint. Per-item results, in order.
+        """
+        if len(articles) <= 1:
+            return super().publish_many(articles)
+
+        try:
+            service = self._get_service()
+            blog_id = self.get_blog_id()
+        except Exception as e:
+            return [failed_result(article, self.platform, e) for article in articles]
+
+        limiter = self.rate_limiter()
+        results = [None] * len(articles)
+
+        def collect(request_id, post, exception):
+            index = int(request_id)
+            article = articles[index]
+            if exception is not None:
+                results[index] = failed_result(article, self.platform, exception)
+            else:
+                results[index] = published_result(article, self.platform, post["id"], post["url"])
+
+        for start in range(0, len(articles), BLOGGER_BATCH_SIZE):
+            chunk = range(start, min(start + BLOGGER_BATCH_SIZE, len(articles)))
+            limiter.acquire(len(chunk))
+
+            batch = self.client.new_batch(callback=collect)
+            for index in chunk:
+                batch.add(
+                    self._insert_request(service, blog_id, articles[index]),
+                    request_id=str(index)
+                )
+
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.exception("Blogger batch request failed")
+                for index in chunk:
+                    if results[index] is None:
+                        results[index] = failed_result(articles[index], self.platform, e)
+
+        return results
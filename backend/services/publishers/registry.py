@@ -1,14 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from services.publishers.base import failed_result
 from services.publishers.blogger import BloggerPublisher
 from services.publishers.wordpress import WordPressPublisher
 
 
+PUBLISHERS = {
+    "blogger": BloggerPublisher,
+    "wordpress": WordPressPublisher,
+}
+
+
 def get_publisher(platform: str):
     platform = platform.lower()
 
-    if platform == "blogger":
-        return BloggerPublisher()
+    if platform not in PUBLISHERS:
+        raise ValueError("Unsupported publishing platform")
+
+    return PUBLISHERS[platform]()
+
+
+def publish_to_platforms(batches: dict) -> dict:
+    """
+    platform -> articles. Platforms run concurrently, each through its
+    publisher's publish_many() (own concurrency and rate limit).
+    Returns platform -> per-article results, in order; a platform that
+    fails outright yields a "failed" result for each of its articles.
+    """
+    def send(platform: str, articles: list) -> list:
+        try:
+            return get_publisher(platform).publish_many(articles)
+        except Exception as e:
+            return [failed_result(article, platform, e) for article in articles]
+
+    if not batches:
+        return {}
 
-    if platform == "wordpress":
-        return WordPressPublisher()
+    with ThreadPoolExecutor(max_workers=len(batches), thread_name_prefix="publish-platforms") as pool:
+        futures = {
+            platform: pool.submit(send, platform, articles)
+            for platform, articles in batches.items()
+        }
 
-    raise ValueError("Unsupported publishing platform")
+    return {platform: future.result() for platform, future in futures.items()}
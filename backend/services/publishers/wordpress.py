@@ -2,6 +2,8 @@ from services.publishers.base import BasePublisher
 
 
 class WordPressPublisher(BasePublisher):
+    platform = "wordpress"
+
     def publish(self, article):
         """
         WordPress publishing logic will be implemented in Step 6.3
@@ -1,15 +1,65 @@
 from sqlalchemy.orm import Session
 from models import Article
+from services.related_index import get_related_index
+from services.search_index import strip_html
+from html import escape
+import logging
 import re
 
+logger = logging.getLogger(__name__)
 
-def get_related_posts(db: Session, limit: int = 5):
+
+def get_related_posts(
+    db: Session,
+    limit: int = 5,
+    title: str | None = None,
+    seo_tags: str | None = None,
+    content: str | None = None,
+    exclude_id: int | None = None
+):
     """
-    Fetch latest published articles
+    Published articles most similar to the given title / tags / content
+    (cosine over the related-posts index), fetched by primary key.
+    Without any text, or if the index finds nothing, falls back to the
+    latest published articles.
     """
+    document = {
+        "title": title or "",
+        "seo_tags": (seo_tags or "").replace(",", " "),
+        "body": strip_html(content),
+    }
+
+    if any(document.values()):
+        try:
+            # Extra candidates: some may have been unpublished since indexing
+            neighbours = get_related_index().neighbours(document, limit * 2, exclude_id)
+        except Exception:
+            logger.exception("Related-posts lookup failed; using latest articles")
+            neighbours = []
+
+        if neighbours:
+            ids = [article_id for article_id, _ in neighbours]
+            found = {
+                a.id: a
+                for a in db.query(Article).filter(
+                    Article.id.in_(ids),
+                    Article.status == "published",
+                    Article.is_deleted == False
+                )
+            }
+            related = [found[article_id] for article_id in ids if article_id in found]
+            if related:
+                return related[:limit]
+
+    query = db.query(Article).filter(
+        Article.status == "published",
+        Article.is_deleted == False
+    )
+    if exclude_id is not None:
+        query = query.filter(Article.id != exclude_id)
+
     return (
-        db.query(Article)
-        .filter(Article.status == "published")
+        query
         .order_by(Article.created_at.desc())
         .limit(limit)
         .all()
@@ -23,28 +73,32 @@ def _slugify(text: str) -> str:
     return text
 
 
-def build_related_posts_html(posts) -> str:
-    """
-    Builds HTML block for related articles
-    """
-    if not posts:
-        return ""
-
-    html = """
+_RELATED_HEAD = """
     <hr/>
     <h2 style="margin-top:40px;">Related Articles</h2>
     <ul style="line-height:1.8; padding-left:18px;">
     """
 
-    for post in posts:
-        slug = _slugify(post.title)
-        html += f"""
+_RELATED_ITEM = """
         <li>
             <a href="/{slug}" style="text-decoration:none;">
-                {post.title}
+                {title}
             </a>
         </li>
         """
 
-    html += "</ul>"
-    return html
+
+def build_related_posts_html(posts) -> str:
+    """
+    Builds HTML block for related articles
+    """
+    if not posts:
+        return ""
+
+    parts = [_RELATED_HEAD]
+    parts.extend(
+        _RELATED_ITEM.format(slug=_slugify(post.title), title=escape(post.title, quote=False))
+        for post in posts
+    )
+    parts.append("</ul>")
+    return "".join(parts)
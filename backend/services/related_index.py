@@ -0,0 +1,398 @@
+import fcntl
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Article
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# =========================
+# CONFIG
+# =========================
+RELATED_INDEX_DIR = os.getenv("RELATED_INDEX_DIR", os.path.join(BASE_DIR, "data", "related_index"))
+# Hashed feature space; rows take RELATED_DIMENSIONS * 4 bytes each.
+# Bucket collisions give unrelated articles a cosine of roughly 1/sqrt(dim)
+RELATED_DIMENSIONS = int(os.getenv("RELATED_DIMENSIONS", "4096"))
+# Neighbours below this cosine are not worth linking (keep well above collision noise)
+RELATED_MIN_SCORE = float(os.getenv("RELATED_MIN_SCORE", "0.1"))
+
+# Relative weight of each field in the article vector
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "seo_tags": 2.0,
+    "meta_description": 1.0,
+    "body": 1.0,
+}
+
+_INITIAL_CAPACITY = 1024
+_TOKEN_RE = re.compile(r"[a-z0-9]{2,}")
+_STOPWORDS = frozenset(
+    "an and are as at be but by can do for from has have how if in into is it "
+    "its more most not of on or our so than that the their them then there these "
+    "they this to up was we what when which who why will with you your".split()
+)
+
+
+class RelatedIndex:
+    """
+    Related-posts index: one hashed TF-IDF vector per published article,
+    L2-normalized, in a float32 matrix memory-mapped from disk.
+
+    Files (under `directory`):
+        vectors.f32   capacity x dim matrix, one row per article
+        ids.i64       article id of each row (0 = free row)
+        df.i64        document frequency per hashed feature
+        meta.json     dim, rows, capacity, docs
+
+    Writers (API and worker processes) serialize on an flock; readers map
+    the same pages, and reopen the maps when meta.json changes. Rows are
+    weighted with the IDF current at write time; rebuild() re-weights all.
+    """
+
+    def __init__(self, directory: str = RELATED_INDEX_DIR, dim: int = RELATED_DIMENSIONS):
+        self.directory = directory
+        self.dim = dim
+
+        self._lock = threading.RLock()
+        self._meta_mtime = None
+        self._vectors = None
+        self._ids = None
+        self._df = None
+        self._row_of = {}
+
+        self.rows = 0
+        self.capacity = 0
+        self.docs = 0
+
+    # -------------------------
+    # FILES
+    # -------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _file_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _map(self, name: str, dtype, shape: tuple):
+        path = self._path(name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _remove_files(self):
+        for name in ("vectors.f32", "ids.i64", "df.i64", "meta.json"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+    def _write_meta(self):
+        for array in (self._vectors, self._ids, self._df):
+            array.flush()
+
+        tmp_path = self._path(f"meta.json.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "rows": self.rows,
+                "capacity": self.capacity,
+                "docs": self.docs
+            }, f)
+        os.replace(tmp_path, self._path("meta.json"))
+        self._meta_mtime = os.stat(self._path("meta.json")).st_mtime_ns
+
+    def _open(self, capacity: int | None = None):
+        meta = {}
+        if os.path.exists(self._path("meta.json")):
+            with open(self._path("meta.json")) as f:
+                meta = json.load(f)
+            self._meta_mtime = os.stat(self._path("meta.json")).st_mtime_ns
+
+        if meta and meta["dim"] != self.dim:
+            # Different feature space: start over (init_related_index rebuilds)
+            self._remove_files()
+            meta = {}
+
+        self.rows = meta.get("rows", 0)
+        self.docs = meta.get("docs", 0)
+        self.capacity = max(capacity or 0, meta.get("capacity", 0), _INITIAL_CAPACITY)
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._vectors = self._map("vectors.f32", np.float32, (self.capacity, self.dim))
+        self._ids = self._map("ids.i64", np.int64, (self.capacity,))
+        self._df = self._map("df.i64", np.int64, (self.dim,))
+
+        used = np.flatnonzero(self._ids[:self.rows])
+        self._row_of = dict(zip(self._ids[used].tolist(), used.tolist()))
+
+    def _refresh(self):
+        """
+        Reopens the maps if another process changed the index shape.
+        """
+        try:
+            mtime = os.stat(self._path("meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if self._vectors is None or mtime != self._meta_mtime:
+            self._open()
+
+    # -------------------------
+    # VECTORS
+    # -------------------------
+    def _features(self, document: dict) -> dict:
+        """
+        Signed hashed term counts: bucket -> weight.
+        """
+        features = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in _TOKEN_RE.findall((document.get(field) or "").lower()):
+                if token in _STOPWORDS:
+                    continue
+                h = zlib.crc32(token.encode())
+                bucket = h % self.dim
+                sign = 1.0 if h & 0x80000000 else -1.0
+                features[bucket] = features.get(bucket, 0.0) + sign * weight
+        return features
+
+    def _vector(self, features: dict) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not features:
+            return vector
+
+        buckets = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        counts = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+
+        # Sublinear TF x smoothed IDF
+        idf = np.log((1 + self.docs) / (1 + self._df[buckets])) + 1.0
+        vector[buckets] = np.sign(counts) * np.log1p(np.abs(counts)) * idf
+
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    # -------------------------
+    # WRITES
+    # -------------------------
+    def _remove_row(self, row: int):
+        present = np.flatnonzero(self._vectors[row])
+        self._df[present] -= 1
+        self.docs -= 1
+        self._vectors[row] = 0
+        self._ids[row] = 0
+
+    def _upsert_locked(self, article_id: int, document: dict):
+        row = self._row_of.get(article_id)
+        if row is not None:
+            self._remove_row(row)
+        else:
+            if self.rows >= self.capacity:
+                self._open(capacity=self.capacity * 2)
+            row = self.rows
+            self.rows += 1
+            self._row_of[article_id] = row
+
+        features = self._features(document)
+        present = np.fromiter(
+            (bucket for bucket, weight in features.items() if weight),
+            dtype=np.int64
+        )
+        self._df[present] += 1
+        self.docs += 1
+
+        self._vectors[row] = self._vector(features)
+        self._ids[row] = article_id
+
+    def upsert(self, article_id: int, document: dict):
+        with self._lock, self._file_lock():
+            self._refresh()
+            self._upsert_locked(article_id, document)
+            self._write_meta()
+
+    def remove(self, article_id: int):
+        with self._lock, self._file_lock():
+            self._refresh()
+            row = self._row_of.pop(article_id, None)
+            if row is None:
+                return
+            self._remove_row(row)
+            self._write_meta()
+
+    def rebuild(self, documents) -> int:
+        """
+        Re-creates the index from (article_id, document) pairs. Two passes:
+        document frequencies first, so every row gets the final IDF.
+        """
+        # Only the (small) feature dicts are kept, not the documents
+        features = [
+            (article_id, self._features(document))
+            for article_id, document in documents
+        ]
+
+        with self._lock, self._file_lock():
+            self._remove_files()
+            self._open(capacity=1 << math.ceil(math.log2(len(features) + 1)))
+
+            for _, feature in features:
+                present = np.fromiter((b for b, w in feature.items() if w), dtype=np.int64)
+                self._df[present] += 1
+            self.docs = len(features)
+
+            for row, (article_id, feature) in enumerate(features):
+                self._vectors[row] = self._vector(feature)
+                self._ids[row] = article_id
+                self._row_of[article_id] = row
+            self.rows = len(features)
+
+            self._write_meta()
+
+        return self.rows
+
+    # -------------------------
+    # QUERY
+    # -------------------------
+    def neighbours(self, document: dict, limit: int = 5, exclude_id: int | None = None) -> list:
+        """
+        [(article_id, cosine)] best first: one matrix-vector product over
+        the mapped rows plus a partial sort.
+        """
+        with self._lock:
+            self._refresh()
+            rows = self.rows
+            if not rows or limit <= 0:
+                return []
+
+            query = self._vector(self._features(document))
+            vectors = self._vectors[:rows]
+            ids = self._ids[:rows]
+
+        if not query.any():
+            return []
+
+        scores = vectors @ query
+        scores[ids == 0] = -1.0
+        if exclude_id is not None:
+            scores[ids == exclude_id] = -1.0
+
+        wanted = min(limit, rows)
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (int(ids[row]), float(scores[row]))
+            for row in top
+            if scores[row] >= RELATED_MIN_SCORE
+        ]
+
+    def info(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "articles": len(self._row_of),
+                "rows": self.rows,
+                "capacity": self.capacity,
+                "dim": self.dim,
+                "bytes": self.capacity * self.dim * 4
+            }
+
+
+_related_index = None
+_related_index_lock = threading.Lock()
+
+
+def get_related_index() -> RelatedIndex:
+    global _related_index
+
+    with _related_index_lock:
+        if _related_index is None:
+            _related_index = RelatedIndex()
+
+    return _related_index
+
+
+# =========================
+# PUBLIC API
+# =========================
+
+def is_indexed(article: Article) -> bool:
+    return article.status == "published" and not article.is_deleted
+
+
+def sync_related_article(article: Article, document: dict):
+    """
+    Adds / refreshes / drops one article's vector to match its state.
+    Never raises: the index is a cache and rebuilds from the DB.
+    """
+    try:
+        index = get_related_index()
+        if is_indexed(article):
+            index.upsert(article.id, document)
+        else:
+            index.remove(article.id)
+    except Exception:
+        logger.exception(f"Related index update failed for article {article.id}")
+
+
+def rebuild_related_index(db: Session, batch_size: int = 500) -> int:
+    # Imported here: search_index imports this module for sync_article()
+    from services.search_index import article_document
+
+    def documents():
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Article)
+                .filter(
+                    Article.id > last_id,
+                    Article.status == "published",
+                    Article.is_deleted == False
+                )
+                .order_by(Article.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                return
+
+            for article in batch:
+                yield article.id, article_document(article)
+            last_id = batch[-1].id
+            db.expunge_all()
+
+    return get_related_index().rebuild(documents())
+
+
+def init_related_index():
+    """
+    Startup hook: builds the index when it is empty.
+    """
+    db = SessionLocal()
+    try:
+        index = get_related_index()
+        if not index.info()["articles"]:
+            built = rebuild_related_index(db)
+            logger.info(f"Related-posts index built ({built} articles)")
+    except Exception:
+        logger.exception("Related-posts index initialization failed")
+    finally:
+        db.close()
@@ -0,0 +1,497 @@
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from database import SessionLocal
+from models import Article
+from models_reoptimize import ReoptimizeRun
+from services.blog_structure import generate_structured_blog
+from services.html_builder import build_blog_html
+from services.llm_client import track_token_usage
+from services.related_block import get_related_posts
+from services.search_index import sync_article
+from services.seo_generator import generate_seo
+from services.stats_cache import invalidate_overview_stats
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+# Concurrent structure generations (LLM call + related posts + HTML)
+REOPT_STRUCTURE_CONCURRENCY = int(os.getenv("REOPT_STRUCTURE_CONCURRENCY", "4"))
+# Concurrent SEO generations (LLM call + write)
+REOPT_SEO_CONCURRENCY = int(os.getenv("REOPT_SEO_CONCURRENCY", "2"))
+# Articles buffered between stages; bounds memory and work lost on a crash
+REOPT_QUEUE_SIZE = int(os.getenv("REOPT_QUEUE_SIZE", "16"))
+REOPT_PAGE_SIZE = int(os.getenv("REOPT_PAGE_SIZE", "100"))
+REOPT_CHECKPOINT_SECONDS = float(os.getenv("REOPT_CHECKPOINT_SECONDS", "5"))
+# A cancelled run silent this long has no pipeline left (its worker died)
+REOPT_STALE_SECONDS = float(os.getenv("REOPT_STALE_SECONDS", str(REOPT_CHECKPOINT_SECONDS * 6)))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+_runs = ReoptimizeRun.__table__
+_DONE = object()
+
+
+# =========================
+# SINGLE ARTICLE
+# =========================
+
+def rebuild_article_html(db: Session, article) -> str:
+    """
+    Structure stage: new layout from the LLM, related posts, HTML.
+    """
+    structure = generate_structured_blog(article.title)
+    related_posts = get_related_posts(
+        db,
+        title=article.title,
+        seo_tags=article.seo_tags,
+        content=article.canonical_content,
+        exclude_id=article.id
+    )
+
+    return build_blog_html(
+        structure=structure,
+        title=article.title,
+        related_posts=related_posts
+    )
+
+
+def apply_reoptimization(
+    db: Session,
+    article: Article,
+    html: str,
+    seo: dict,
+    keep_status: bool = False
+):
+    """
+    Stores the new HTML and SEO fields; the caller commits.
+    A single re-optimization goes back to "approved" for review; bulk runs
+    pass keep_status so live articles stay published.
+    """
+    article.canonical_content = html
+    article.seo_title = seo.get("seo_title")
+    article.meta_description = seo.get("meta_description")
+    article.seo_tags = seo.get("seo_tags")
+
+    if not keep_status:
+        article.status = "approved"
+    article.rewrite_count += 1
+    article.last_optimized_at = datetime.utcnow()
+
+    sync_article(db, article)
+
+
+# =========================
+# SELECTION
+# =========================
+
+def reoptimize_filter(filters: dict, as_of: datetime) -> list:
+    """
+    WHERE clauses for a run: statuses, age in days and view range.
+    Ages are measured from `as_of` (the run's creation), so the selection
+    does not drift while a run is resumed.
+    """
+    clauses = [Article.is_deleted == False]
+
+    if filters.get("statuses"):
+        clauses.append(Article.status.in_(filters["statuses"]))
+    if filters.get("min_age_days") is not None:
+        clauses.append(Article.created_at <= as_of - timedelta(days=filters["min_age_days"]))
+    if filters.get("max_age_days") is not None:
+        clauses.append(Article.created_at >= as_of - timedelta(days=filters["max_age_days"]))
+    if filters.get("min_views") is not None:
+        clauses.append(Article.view_count >= filters["min_views"])
+    if filters.get("max_views") is not None:
+        clauses.append(Article.view_count <= filters["max_views"])
+
+    # Already re-optimized by this run (e.g. before a crash)
+    clauses.append(or_(
+        Article.last_optimized_at == None,
+        Article.last_optimized_at < as_of
+    ))
+    return clauses
+
+
+def create_run(db: Session, filters: dict) -> ReoptimizeRun:
+    """
+    Records a queued run and counts its articles; the caller commits
+    and enqueues the bulk_reoptimize job.
+    """
+    now = datetime.utcnow()
+    run = ReoptimizeRun(
+        filters=json.dumps(filters),
+        status=QUEUED,
+        created_at=now,
+        updated_at=now
+    )
+    run.total = db.query(Article.id).filter(*reoptimize_filter(filters, now)).count()
+
+    db.add(run)
+    db.flush()
+    return run
+
+
+def is_draining(run: ReoptimizeRun, now: datetime | None = None) -> bool:
+    """
+    True while a cancelled run's pipeline is still stopping: it keeps
+    checkpointing until its threads are done, then writes finished_at.
+    A second pipeline started meanwhile would overwrite its counters.
+    """
+    if run.status != CANCELLED or run.started_at is None or run.finished_at is not None:
+        return False
+
+    now = now or datetime.utcnow()
+    return (now - run.updated_at).total_seconds() < REOPT_STALE_SECONDS
+
+
+def run_progress(run: ReoptimizeRun) -> dict:
+    handled = run.optimized + run.failed
+    minutes = run.active_seconds / 60
+    tokens = run.prompt_tokens + run.output_tokens
+
+    articles_per_minute = handled / minutes if minutes else 0.0
+    remaining = max(0, run.total - handled)
+
+    return {
+        "id": run.id,
+        "status": run.status,
+        "stop_reason": run.stop_reason,
+        "filters": json.loads(run.filters or "{}"),
+        "total": run.total,
+        "optimized": run.optimized,
+        "failed": run.failed,
+        "remaining": remaining,
+        "checkpoint_id": run.checkpoint_id,
+        "prompt_tokens": run.prompt_tokens,
+        "output_tokens": run.output_tokens,
+        "active_seconds": round(run.active_seconds, 1),
+        "articles_per_minute": round(articles_per_minute, 2),
+        "tokens_per_minute": round(tokens / minutes, 1) if minutes else 0.0,
+        "eta_seconds": (
+            round(remaining / articles_per_minute * 60)
+            if articles_per_minute and run.status == RUNNING else None
+        ),
+        "created_at": run.created_at,
+        "started_at": run.started_at,
+        "updated_at": run.updated_at,
+        "finished_at": run.finished_at
+    }
+
+
+# =========================
+# PIPELINE
+# =========================
+
+class _Progress:
+    """
+    Shared counters, plus the checkpoint: articles are issued in id order
+    but finish out of order, so the checkpoint is just below the lowest
+    article still in flight.
+    """
+
+    def __init__(self, checkpoint_id: int):
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._highest = checkpoint_id
+        self.optimized = 0
+        self.failed = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def add_tokens(self, usage):
+        with self._lock:
+            self.prompt_tokens += usage.prompt_tokens
+            self.output_tokens += usage.output_tokens
+
+    def issued(self, article_id: int):
+        with self._lock:
+            self._in_flight.add(article_id)
+            self._highest = article_id
+
+    def finished(self, article_id: int, ok: bool):
+        with self._lock:
+            self._in_flight.discard(article_id)
+            if ok:
+                self.optimized += 1
+            else:
+                self.failed += 1
+
+    def checkpoint(self) -> int:
+        with self._lock:
+            return min(self._in_flight) - 1 if self._in_flight else self._highest
+
+
+class BulkReoptimizer:
+    """
+    Producer -> structure stage -> SEO stage, connected by bounded queues.
+
+    The producer pages matching articles in id order (keyset, from the
+    checkpoint); each stage has its own thread count, so SEO calls for
+    finished layouts overlap with the next layouts being generated. The
+    shared LLM client still bounds total in-flight calls.
+    """
+
+    def __init__(
+        self,
+        run_id: int,
+        structure_workers: int = REOPT_STRUCTURE_CONCURRENCY,
+        seo_workers: int = REOPT_SEO_CONCURRENCY,
+        queue_size: int = REOPT_QUEUE_SIZE
+    ):
+        self.run_id = run_id
+        self.structure_workers = max(1, structure_workers)
+        self.seo_workers = max(1, seo_workers)
+
+        self._structure_queue = queue.Queue(maxsize=queue_size)
+        self._seo_queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._finished = threading.Event()
+        self._left_lock = threading.Lock()
+        self._structure_left = self.structure_workers
+        self._seo_left = self.seo_workers
+
+        self.filters = {}
+        self.as_of = None
+        self.progress = None
+        self.error = None
+
+    # -------------------------
+    # STAGES
+    # -------------------------
+    def _produce(self):
+        db = SessionLocal()
+        try:
+            last_id = self.progress.checkpoint()
+            clauses = reoptimize_filter(self.filters, self.as_of)
+
+            while not self._stop.is_set():
+                rows = (
+                    db.query(Article.id, Article.title, Article.seo_tags, Article.canonical_content)
+                    .filter(Article.id > last_id, *clauses)
+                    .order_by(Article.id)
+                    .limit(REOPT_PAGE_SIZE)
+                    .all()
+                )
+                if not rows:
+                    return
+
+                for row in rows:
+                    if self._stop.is_set():
+                        return
+                    self.progress.issued(row.id)
+                    self._structure_queue.put(SimpleNamespace(**row._asdict()))
+                last_id = rows[-1].id
+                db.rollback()
+
+        except Exception as e:
+            self.error = e
+            self._stop.set()
+            logger.exception(f"Re-optimize run {self.run_id}: article scan failed")
+
+        finally:
+            db.close()
+            for _ in range(self.structure_workers):
+                self._structure_queue.put(_DONE)
+
+    def _structure_stage(self):
+        db = SessionLocal()
+        try:
+            while True:
+                article = self._structure_queue.get()
+                if article is _DONE:
+                    return
+                # Stopping: drain without work; the checkpoint stays below these
+                if self._stop.is_set():
+                    continue
+
+                try:
+                    with track_token_usage() as usage:
+                        html = rebuild_article_html(db, article)
+                    db.rollback()
+                except Exception as e:
+                    db.rollback()
+                    self.progress.finished(article.id, ok=False)
+                    logger.warning(f"Re-optimize: structure failed for article {article.id}: {e}")
+                    continue
+                finally:
+                    self.progress.add_tokens(usage)
+
+                self._seo_queue.put((article, html))
+
+        finally:
+            db.close()
+            with self._left_lock:
+                self._structure_left -= 1
+                last = self._structure_left == 0
+            if last:
+                for _ in range(self.seo_workers):
+                    self._seo_queue.put(_DONE)
+
+    def _seo_stage(self):
+        db = SessionLocal()
+        try:
+            while True:
+                item = self._seo_queue.get()
+                if item is _DONE:
+                    return
+                if self._stop.is_set():
+                    continue
+
+                snapshot, html = item
+                ok = False
+                try:
+                    with track_token_usage() as usage:
+                        seo = generate_seo(snapshot.title, html)
+                    self.progress.add_tokens(usage)
+
+                    article = db.query(Article).filter(Article.id == snapshot.id).first()
+                    if article is None or article.is_deleted:
+                        logger.info(f"Re-optimize: article {snapshot.id} deleted meanwhile, skipped")
+                    else:
+                        apply_reoptimization(db, article, html, seo, keep_status=True)
+                        db.commit()
+                        ok = True
+
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Re-optimize: SEO/save failed for article {snapshot.id}: {e}")
+
+                finally:
+                    self.progress.finished(snapshot.id, ok=ok)
+
+        finally:
+            db.close()
+            with self._left_lock:
+                self._seo_left -= 1
+                if self._seo_left == 0:
+                    self._finished.set()
+
+    # -------------------------
+    # CHECKPOINTS
+    # -------------------------
+    def _save(self, db: Session, base: dict, started: float, **values) -> bool:
+        """
+        Writes progress (and `values`). False when the run was cancelled
+        meanwhile: the counters are still saved, `values` are not.
+        """
+        progress = {
+            "optimized": base["optimized"] + self.progress.optimized,
+            "failed": base["failed"] + self.progress.failed,
+            "checkpoint_id": self.progress.checkpoint(),
+            "prompt_tokens": base["prompt_tokens"] + self.progress.prompt_tokens,
+            "output_tokens": base["output_tokens"] + self.progress.output_tokens,
+            "active_seconds": base["active_seconds"] + time.monotonic() - started,
+            "updated_at": datetime.utcnow(),
+        }
+
+        saved = db.execute(
+            update(_runs)
+            .where(_runs.c.id == self.run_id, _runs.c.status == RUNNING)
+            .values(**progress, **values)
+        ).rowcount == 1
+
+        if not saved:
+            db.execute(update(_runs).where(_runs.c.id == self.run_id).values(**progress))
+
+        db.commit()
+        return saved
+
+    # -------------------------
+    # RUN
+    # -------------------------
+    def run(self) -> dict:
+        db = SessionLocal()
+        started = time.monotonic()
+        try:
+            run = db.query(ReoptimizeRun).filter(ReoptimizeRun.id == self.run_id).first()
+            if run is None or run.status not in (QUEUED, RUNNING, FAILED):
+                return {"status": run.status if run else "missing"}
+
+            self.filters = json.loads(run.filters or "{}")
+            self.as_of = run.created_at
+            self.progress = _Progress(run.checkpoint_id)
+
+            base = {
+                "optimized": run.optimized,
+                "failed": run.failed,
+                "prompt_tokens": run.prompt_tokens,
+                "output_tokens": run.output_tokens,
+                "active_seconds": run.active_seconds,
+            }
+
+            resumed = run.checkpoint_id > 0
+            run.status = RUNNING
+            run.stop_reason = None
+            run.started_at = run.started_at or datetime.utcnow()
+            run.finished_at = None
+            db.commit()
+
+            logger.info(
+                f"🚀 Re-optimize run {self.run_id} {'resumed after' if resumed else 'started at'} "
+                f"article {run.checkpoint_id} ({run.total} articles, "
+                f"{self.structure_workers} structure / {self.seo_workers} SEO workers)"
+            )
+
+            threads = [threading.Thread(target=self._produce, name="reopt-produce")]
+            threads += [
+                threading.Thread(target=self._structure_stage, name=f"reopt-structure-{i}")
+                for i in range(self.structure_workers)
+            ]
+            threads += [
+                threading.Thread(target=self._seo_stage, name=f"reopt-seo-{i}")
+                for i in range(self.seo_workers)
+            ]
+            for thread in threads:
+                thread.start()
+
+            while not self._finished.wait(REOPT_CHECKPOINT_SECONDS):
+                if not self._save(db, base, started) and not self._stop.is_set():
+                    logger.info(f"Re-optimize run {self.run_id} cancelled; stopping")
+                    self._stop.set()
+
+            for thread in threads:
+                thread.join()
+
+            if self.error is not None:
+                status, reason = FAILED, f"{type(self.error).__name__}: {self.error}"[:255]
+            else:
+                status, reason = COMPLETED, None
+
+            if not self._save(db, base, started, status=status, stop_reason=reason, finished_at=datetime.utcnow()):
+                status = CANCELLED
+                # Every thread has stopped: the run may be resumed now
+                db.execute(update(_runs).where(_runs.c.id == self.run_id).values(finished_at=datetime.utcnow()))
+                db.commit()
+
+            invalidate_overview_stats()
+            logger.info(
+                f"🎯 Re-optimize run {self.run_id} {status} | "
+                f"Optimized: {self.progress.optimized}, Failed: {self.progress.failed}"
+            )
+            return {"status": status, "optimized": self.progress.optimized, "failed": self.progress.failed}
+
+        except Exception:
+            self._stop.set()
+            db.rollback()
+            raise
+
+        finally:
+            db.close()
+
+
+def run_bulk_reoptimize(run_id: int) -> dict:
+    return BulkReoptimizer(run_id).run()
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from models import Article
 from services.agentic_brain import generate_canonical_article
+from services.search_index import sync_article
 
 
 MIN_DAYS_OLD = 30
@@ -29,18 +30,8 @@ def is_rewrite_eligible(article: Article) -> bool:
     return True
 
 
-def rewrite_article_content(db: Session, article_id: int) -> bool:
-    """
-    AI-powered content rewrite pipeline
-    """
-    article = db.query(Article).filter(Article.id == article_id).first()
-    if not article:
-        return False
-
-    if not is_rewrite_eligible(article):
-        return False
-
-    prompt = f"""
+def build_rewrite_prompt(article: Article) -> str:
+    return f"""
     Rewrite the following blog article to improve:
     - Clarity
     - Freshness
@@ -61,14 +52,34 @@ def rewrite_article_content(db: Session, article_id: int) -> bool:
     {article.canonical_content}
     """
 
-    rewritten = generate_canonical_article(prompt)
 
-    if not rewritten or "content" not in rewritten:
+def apply_rewrite(db: Session, article: Article, rewritten: str) -> bool:
+    if not rewritten:
         return False
 
-    article.canonical_content = rewritten["content"]
+    article.canonical_content = rewritten
     article.rewrite_count += 1
     article.last_optimized_at = datetime.utcnow()
 
+    sync_article(db, article)
     db.commit()
     return True
+
+
+def rewrite_article_content(db: Session, article_id: int) -> bool:
+    """
+    AI-powered content rewrite pipeline
+    """
+    article = db.query(Article).filter(Article.id == article_id).first()
+    if not article:
+        return False
+
+    if not is_rewrite_eligible(article):
+        return False
+
+    rewritten = generate_canonical_article(
+        master_prompt=build_rewrite_prompt(article),
+        user_topic=""
+    )
+
+    return apply_rewrite(db, article, rewritten)
@@ -1,6 +1,11 @@
 from sqlalchemy.orm import Session
 from models import Article
-from services.rewrite_engine import rewrite_article_content
+from services.agentic_brain import generate_canonical_articles
+from services.rewrite_engine import (
+    is_rewrite_eligible,
+    build_rewrite_prompt,
+    apply_rewrite
+)
 
 
 def run_rewrite_cycle(db: Session, limit: int = 3):
@@ -15,11 +20,18 @@ def run_rewrite_cycle(db: Session, limit: int = 3):
         .all()
     )
 
+    eligible = [a for a in articles if is_rewrite_eligible(a)]
+
+    # All rewrites are generated concurrently, then saved one by one
+    texts = generate_canonical_articles([
+        (build_rewrite_prompt(article), "")
+        for article in eligible
+    ])
+
     rewritten = 0
 
-    for article in articles:
-        success = rewrite_article_content(db, article.id)
-        if success:
+    for article, text in zip(eligible, texts):
+        if apply_rewrite(db, article, text):
             rewritten += 1
 
     return rewritten
@@ -1,15 +1,22 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 import logging
+import os
+
+from sqlalchemy.orm import Session
 
-from database import SessionLocal
 from models import Article
-from services.trending_agent import get_trending_topics
+from services.memory_trending_picker import pick_memory_safe_trending_topic
+from services.trend_memory_service import record_trend_usages
 from services.prompt_loader import load_master_prompt
 from services.agentic_brain import generate_canonical_article
-from services.publishers.blogger import BloggerPublisher
 from services.scheduler_state import AUTO_PUBLISH_ENABLED
 from services.ctr_scheduler import run_ctr_optimization
+from services.view_rollups import run_view_rollups
+from services.publish_outbox import begin_publish, run_publish_requests, run_publish_reconciler
+from services.reoptimizer import run_bulk_reoptimize
+from services.keyword_extractor import rebuild_keyword_stats
+from services.job_queue import ClaimedJob, enqueue, job_handler, purge_finished_jobs, JOB_RETENTION_DAYS
 
 
 # =========================
@@ -18,108 +25,186 @@ from services.ctr_scheduler import run_ctr_optimization
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How late a recurring job may still be enqueued (e.g. worker was down at 09:00)
+SCHEDULE_MISFIRE_GRACE_SECONDS = int(os.getenv("SCHEDULE_MISFIRE_GRACE_SECONDS", "3600"))
+
+
+# =========================
+# JOB HANDLERS
+# =========================
 
-def daily_auto_publish():
+@job_handler("daily_auto_publish")
+def daily_auto_publish(db: Session, job: ClaimedJob):
     """
     Runs once per day.
     Picks a trending topic, generates an article,
-    and publishes it to Blogger if auto-publish is enabled.
+    and queues it for publishing to Blogger if auto-publish is enabled.
     """
 
     if not AUTO_PUBLISH_ENABLED:
         logger.info("Auto publish is paused. Job skipped.")
         return
 
-    db = SessionLocal()
+    logger.info("Daily auto publish job started")
 
+    # Step 1: Load master prompt & a trending topic not used recently
+    master_prompt = load_master_prompt()
     try:
-        logger.info("Daily auto publish job started")
-
-        # Step 1: Load master prompt & trending topic
-        master_prompt = load_master_prompt()
-        topics = get_trending_topics(
-            master_prompt=master_prompt,
+        topic = pick_memory_safe_trending_topic(
+            db,
             region="global",
-            limit=1
+            master_prompt=master_prompt
         )
+    except RuntimeError as e:
+        logger.warning(f"{e}. Job aborted.")
+        return
 
-        if not topics:
-            logger.warning("No trending topics found. Job aborted.")
-            return
+    # Step 2: Generate canonical article
+    content = generate_canonical_article(
+        master_prompt=master_prompt,
+        user_topic=topic
+    )
 
-        topic = topics[0]
+    if not content:
+        raise RuntimeError("AI content generation failed")
+
+    # Step 3: Save article; committed together with this job's completion,
+    # so a retry never leaves a duplicate draft behind
+    article = Article(
+        title=topic,
+        content=content,
+        canonical_content=content,
+        platform_target="blogger",
+        status="approved",
+        created_at=datetime.utcnow()
+    )
 
-        # Step 2: Generate canonical article
-        content = generate_canonical_article(
-            master_prompt=master_prompt,
-            user_topic=topic
-        )
+    db.add(article)
+    db.flush()
 
-        if not content:
-            logger.error("AI content generation failed. Job aborted.")
-            return
-
-        # Step 3: Save article
-        article = Article(
-            title=topic,
-            canonical_content=content,
-            platform_target="blogger",
-            status="approved",
-            created_at=datetime.utcnow()
-        )
+    # Same transaction as the article: a retried job does not count twice
+    record_trend_usages(db, [topic])
 
-        db.add(article)
-        db.commit()
-        db.refresh(article)
+    # Step 4: Publish to Blogger as its own (retryable) job
+    enqueue(
+        db,
+        "publish_article",
+        {"article_id": article.id},
+        idempotency_key=f"publish_article:{article.id}"
+    )
 
-        # Step 4: Publish to Blogger
-        publisher = BloggerPublisher()
-        result = publisher.publish(article)
 
-        article.status = "published"
-        article.published_at = datetime.utcnow()
-        db.commit()
+@job_handler("publish_article")
+def publish_article_job(db: Session, job: ClaimedJob):
+    """
+    Claim (commit), send with no session held, record in a second transaction.
+    A retry after a crash finds the article already claimed and stops there;
+    the reconciler settles the interrupted row instead of publishing twice.
+    """
+    request_ids, skipped = begin_publish(db, [job.payload["article_id"]], ["blogger"])
 
-        logger.info("Article auto-published successfully")
-        logger.info(f"Published URL: {result.get('url')}")
+    if not request_ids:
+        logger.info(f"Article {job.payload['article_id']} not published: {skipped[0]['status']}")
+        return
 
-    except Exception:
-        logger.exception("Auto publish job failed")
+    for request_id, result in run_publish_requests(request_ids):
+        if result["status"] != "published":
+            raise RuntimeError(result.get("error") or "Publish failed")
 
-    finally:
-        db.close()
 
+@job_handler("ctr_optimization")
+def ctr_optimization_job(db: Session, job: ClaimedJob):
+    # A retry skips articles the interrupted attempt already optimized
+    result = run_ctr_optimization(skip_optimized_since=job.created_at)
 
-def start_scheduler():
-    """
-    Starts background scheduler.
-    - Auto publish: 09:00 AM
-    - CTR optimization: 02:00 AM
-    """
+    if result["status"] == "failed":
+        raise RuntimeError("CTR optimization run failed")
 
-    scheduler = BackgroundScheduler()
 
-    # 🔹 Daily auto publish (09:00 AM)
-    scheduler.add_job(
-        daily_auto_publish,
-        trigger="cron",
-        hour=9,
-        minute=0,
-        id="daily_auto_publish_job",
-        replace_existing=True
-    )
+@job_handler("bulk_reoptimize")
+def bulk_reoptimize_job(db: Session, job: ClaimedJob):
+    # A retry resumes the run from its last checkpoint
+    result = run_bulk_reoptimize(job.payload["run_id"])
 
-    # 🔹 Daily CTR optimization (02:00 AM)
-    scheduler.add_job(
-        run_ctr_optimization,
-        trigger="cron",
-        hour=2,
-        minute=0,
-        id="daily_ctr_optimization_job",
-        replace_existing=True
-    )
+    if result["status"] == "failed":
+        raise RuntimeError(f"Re-optimize run {job.payload['run_id']} failed")
 
-    scheduler.start()
-    logger.info(
-        "Scheduler started. Auto publish + CTR optimization jobs registered."
-    )
+
+@job_handler("view_rollups")
+def view_rollups_job(db: Session, job: ClaimedJob):
+    run_view_rollups()
+
+
+@job_handler("keyword_stats")
+def keyword_stats_job(db: Session, job: ClaimedJob):
+    rebuild_keyword_stats(db)
+
+
+@job_handler("publish_reconciler")
+def publish_reconciler_job(db: Session, job: ClaimedJob):
+    run_publish_reconciler()
+
+
+@job_handler("job_retention")
+def job_retention_job(db: Session, job: ClaimedJob):
+    purged = purge_finished_jobs(db)
+    logger.info(f"🧹 Purged {purged} finished jobs older than {JOB_RETENTION_DAYS} days")
+
+
+# =========================
+# RECURRING SCHEDULE
+# =========================
+
+@dataclass(frozen=True)
+class RecurringJob:
+    """
+    Daily at hour:minute, or every `every_minutes` when that is set.
+    """
+    kind: str
+    hour: int = 0
+    minute: int = 0
+    every_minutes: int | None = None
+
+    def last_fire_time(self, now: datetime) -> datetime:
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.every_minutes:
+            elapsed = int((now - midnight).total_seconds() // 60)
+            return midnight + timedelta(minutes=elapsed - elapsed % self.every_minutes)
+        return midnight.replace(hour=self.hour, minute=self.minute)
+
+
+# Times are UTC
+SCHEDULE = [
+    RecurringJob("daily_auto_publish", hour=9, minute=0),  # 09:00 AM
+    RecurringJob("ctr_optimization", hour=2, minute=0),    # 02:00 AM
+    RecurringJob("view_rollups", hour=0, minute=15),       # 00:15 AM
+    RecurringJob("keyword_stats", hour=1, minute=30),      # 01:30 AM
+    RecurringJob("job_retention", hour=3, minute=30),      # 03:30 AM
+    RecurringJob("publish_reconciler", every_minutes=5),
+]
+
+
+def enqueue_due_recurring(db: Session, now: datetime | None = None) -> list:
+    """
+    Enqueues the current run of every recurring job whose time has come.
+    The idempotency key is per kind and fire time, so any number of workers
+    can call this concurrently and each run is still queued once.
+    """
+    now = now or datetime.utcnow()
+    queued = []
+
+    for entry in SCHEDULE:
+        fire_at = entry.last_fire_time(now)
+        if not fire_at <= now <= fire_at + timedelta(seconds=SCHEDULE_MISFIRE_GRACE_SECONDS):
+            continue
+
+        if enqueue(
+            db,
+            entry.kind,
+            idempotency_key=f"{entry.kind}:{fire_at.isoformat(timespec='minutes')}",
+            run_at=fire_at
+        ):
+            queued.append(entry.kind)
+
+    db.commit()
+    return queued
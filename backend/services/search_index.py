@@ -0,0 +1,460 @@
+import html
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import engine, SessionLocal
+from models import Article
+from services.related_index import sync_related_article
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+SNIPPET_WORDS = 16
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+
+# Snippets are marked with these (private-use, stripped from indexed text),
+# then HTML-escaped, and only then given the real <mark> tags
+_MARK_OPEN = "\ue000"
+_MARK_CLOSE = "\ue001"
+_SENTINELS = {ord(_MARK_OPEN): None, ord(_MARK_CLOSE): None}
+
+# Relative weight of each indexed field (title matters most)
+FIELD_WEIGHTS = {
+    "title": 10.0,
+    "seo_tags": 4.0,
+    "meta_description": 4.0,
+    "body": 1.0,
+}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    article_id: int
+    score: float
+    highlight: str | None = None
+
+
+# =========================
+# DOCUMENT HELPERS
+# =========================
+
+def is_searchable(article: Article) -> bool:
+    return article.status == "published" and not article.is_deleted
+
+
+def strip_html(value: str | None) -> str:
+    """
+    Plain text of stored HTML. Entities are decoded, so the result is NOT
+    safe to embed in HTML: see render_highlight().
+    """
+    if not value:
+        return ""
+    return html.unescape(_TAG_RE.sub(" ", value))
+
+
+def render_highlight(snippet: str | None) -> str | None:
+    """
+    Sentinel-marked plain text -> HTML: the text is escaped first, so the
+    <mark> tags are the only markup in a highlight.
+    """
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(_MARK_OPEN, HIGHLIGHT_OPEN)
+        .replace(_MARK_CLOSE, HIGHLIGHT_CLOSE)
+    )
+
+
+def tokenize(value: str) -> list:
+    return _TOKEN_RE.findall(value.lower())
+
+
+def article_document(article: Article) -> dict:
+    doc = {
+        "title": article.title or "",
+        "seo_tags": (article.seo_tags or "").replace(",", " "),
+        "meta_description": article.meta_description or "",
+        "body": strip_html(article.canonical_content or article.content),
+    }
+    # Stored text must not be able to forge highlight markers
+    return {field: value.translate(_SENTINELS) for field, value in doc.items()}
+
+
+# =========================
+# SQLITE FTS5
+# =========================
+class SqliteFtsBackend:
+    name = "sqlite-fts5"
+
+    def ensure_schema(self, db: Session):
+        db.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+            "title, seo_tags, meta_description, body, "
+            "tokenize = 'porter unicode61')"
+        ))
+
+    def is_empty(self, db: Session) -> bool:
+        return db.execute(text("SELECT 1 FROM articles_fts LIMIT 1")).first() is None
+
+    def upsert(self, db: Session, article_id: int, doc: dict):
+        self.remove(db, article_id)
+        db.execute(
+            text(
+                "INSERT INTO articles_fts (rowid, title, seo_tags, meta_description, body) "
+                "VALUES (:id, :title, :seo_tags, :meta_description, :body)"
+            ),
+            {"id": article_id, **doc}
+        )
+
+    def remove(self, db: Session, article_id: int):
+        db.execute(text("DELETE FROM articles_fts WHERE rowid = :id"), {"id": article_id})
+
+    def clear(self, db: Session):
+        db.execute(text("DELETE FROM articles_fts"))
+
+    def search(self, db: Session, query: str, limit: int, offset: int) -> list:
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        # Quote every term so user input can never inject FTS5 syntax
+        match = " ".join(f'"{term}"' for term in terms)
+        weights = ", ".join(str(w) for w in FIELD_WEIGHTS.values())
+
+        rows = db.execute(
+            text(
+                f"SELECT rowid, bm25(articles_fts, {weights}) AS score, "
+                f"snippet(articles_fts, 3, :open, :close, '…', {SNIPPET_WORDS}) "
+                "FROM articles_fts WHERE articles_fts MATCH :match "
+                "ORDER BY score LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "match": match,
+                "open": _MARK_OPEN,
+                "close": _MARK_CLOSE,
+                "limit": limit,
+                "offset": offset,
+            }
+        ).all()
+
+        # FTS5 bm25() is "lower is better"; flip it so callers see higher = better
+        return [SearchHit(row[0], -float(row[1]), render_highlight(row[2])) for row in rows]
+
+
+# =========================
+# POSTGRESQL TSVECTOR + GIN
+# =========================
+class PostgresFtsBackend:
+    name = "postgresql-tsvector"
+
+    def ensure_schema(self, db: Session):
+        db.execute(text(
+            "CREATE TABLE IF NOT EXISTS article_search ("
+            "article_id INTEGER PRIMARY KEY, "
+            "body TEXT NOT NULL DEFAULT '', "
+            "document TSVECTOR NOT NULL)"
+        ))
+        db.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_article_search_document "
+            "ON article_search USING GIN (document)"
+        ))
+
+    def is_empty(self, db: Session) -> bool:
+        return db.execute(text("SELECT 1 FROM article_search LIMIT 1")).first() is None
+
+    def upsert(self, db: Session, article_id: int, doc: dict):
+        db.execute(
+            text(
+                "INSERT INTO article_search (article_id, body, document) VALUES ("
+                ":id, :body, "
+                "setweight(to_tsvector('english', :title), 'A') || "
+                "setweight(to_tsvector('english', :seo_tags), 'B') || "
+                "setweight(to_tsvector('english', :meta_description), 'B') || "
+                "setweight(to_tsvector('english', :body), 'D')) "
+                "ON CONFLICT (article_id) DO UPDATE SET "
+                "body = EXCLUDED.body, document = EXCLUDED.document"
+            ),
+            {"id": article_id, **doc}
+        )
+
+    def remove(self, db: Session, article_id: int):
+        db.execute(text("DELETE FROM article_search WHERE article_id = :id"), {"id": article_id})
+
+    def clear(self, db: Session):
+        db.execute(text("DELETE FROM article_search"))
+
+    def search(self, db: Session, query: str, limit: int, offset: int) -> list:
+        if not tokenize(query):
+            return []
+
+        # ts_rank_cd (cover density) is PostgreSQL's closest built-in to BM25
+        rows = db.execute(
+            text(
+                "SELECT article_id, ts_rank_cd(document, q, 32) AS score, "
+                "ts_headline('english', body, q, :options) "
+                "FROM article_search, plainto_tsquery('english', :query) q "
+                "WHERE document @@ q "
+                "ORDER BY score DESC LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "query": query,
+                "options": (
+                    f'StartSel="{_MARK_OPEN}", StopSel="{_MARK_CLOSE}", '
+                    f"MaxWords={SNIPPET_WORDS}, MinWords=5, MaxFragments=1"
+                ),
+                "limit": limit,
+                "offset": offset,
+            }
+        ).all()
+
+        return [SearchHit(row[0], float(row[1]), render_highlight(row[2])) for row in rows]
+
+
+# =========================
+# PURE-PYTHON FALLBACK
+# =========================
+class InMemoryBackend:
+    """
+    Inverted index with field-weighted BM25.
+    Used when the database has no native full-text engine.
+    Rebuilt from the DB at startup; not persisted.
+    """
+    name = "in-memory-bm25"
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._postings = defaultdict(dict)   # term -> {article_id: weighted tf}
+        self._doc_terms = {}                 # article_id -> set(terms)
+        self._doc_len = {}                   # article_id -> weighted length
+        self._bodies = {}                    # article_id -> body text (highlights)
+        self._total_len = 0.0
+
+    def ensure_schema(self, db: Session):
+        pass
+
+    def is_empty(self, db: Session) -> bool:
+        return not self._doc_len
+
+    def upsert(self, db: Session, article_id: int, doc: dict):
+        weighted = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(doc[field]):
+                weighted[term] += weight
+
+        with self._lock:
+            self._remove_locked(article_id)
+            for term, tf in weighted.items():
+                self._postings[term][article_id] = tf
+            self._doc_terms[article_id] = set(weighted)
+            self._doc_len[article_id] = sum(weighted.values())
+            self._bodies[article_id] = doc["body"]
+            self._total_len += self._doc_len[article_id]
+
+    def _remove_locked(self, article_id: int):
+        for term in self._doc_terms.pop(article_id, ()):
+            postings = self._postings[term]
+            postings.pop(article_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(article_id, 0.0)
+        self._bodies.pop(article_id, None)
+
+    def remove(self, db: Session, article_id: int):
+        with self._lock:
+            self._remove_locked(article_id)
+
+    def clear(self, db: Session):
+        with self._lock:
+            self._reset()
+
+    def search(self, db: Session, query: str, limit: int, offset: int) -> list:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs:
+                return []
+            avg_len = self._total_len / n_docs
+
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+
+            # AND semantics: iterate the rarest term's postings only
+            candidates = set(min(postings, key=len))
+            for plist in postings:
+                candidates.intersection_update(plist)
+
+            scores = {}
+            for article_id in candidates:
+                doc_len = self._doc_len[article_id]
+                score = 0.0
+                for plist in postings:
+                    tf = plist[article_id]
+                    idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+                    norm = tf + self.K1 * (1 - self.B + self.B * doc_len / avg_len)
+                    score += idf * tf * (self.K1 + 1) / norm
+                scores[article_id] = score
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            page = ranked[offset:offset + limit]
+
+            return [
+                SearchHit(article_id, score, _highlight(self._bodies[article_id], terms))
+                for article_id, score in page
+            ]
+
+
+def _highlight(body: str, terms: list) -> str:
+    words = body.split()
+    wanted = set(terms)
+
+    first = next(
+        (i for i, word in enumerate(words) if set(tokenize(word)) & wanted),
+        0
+    )
+    start = max(0, first - SNIPPET_WORDS // 4)
+    window = words[start:start + SNIPPET_WORDS]
+
+    marked = [
+        f"{_MARK_OPEN}{word}{_MARK_CLOSE}" if set(tokenize(word)) & wanted else word
+        for word in window
+    ]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + SNIPPET_WORDS < len(words) else ""
+    return render_highlight(prefix + " ".join(marked) + suffix)
+
+
+# =========================
+# BACKEND SELECTION
+# =========================
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _fts5_available() -> bool:
+    try:
+        with engine.connect() as conn:
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)"
+            ))
+            conn.execute(text("DROP TABLE temp.fts5_probe"))
+        return True
+    except Exception:
+        return False
+
+
+def get_search_backend():
+    global _backend
+
+    with _backend_lock:
+        if _backend is None:
+            dialect = engine.dialect.name
+            if dialect == "postgresql":
+                _backend = PostgresFtsBackend()
+            elif dialect == "sqlite" and _fts5_available():
+                _backend = SqliteFtsBackend()
+            else:
+                _backend = InMemoryBackend()
+            logger.info(f"Search backend: {_backend.name}")
+
+    return _backend
+
+
+# =========================
+# PUBLIC API
+# =========================
+
+def sync_article(db: Session, article: Article):
+    """
+    Brings the index in line with the article's current state.
+    Runs inside the caller's transaction; call before db.commit().
+    """
+    backend = get_search_backend()
+    document = article_document(article)
+    if is_searchable(article):
+        backend.upsert(db, article.id, document)
+    else:
+        backend.remove(db, article.id)
+
+    # Related-posts vectors follow the same lifecycle
+    sync_related_article(article, document)
+
+
+def search_articles(db: Session, query: str, limit: int = 20, offset: int = 0) -> list:
+    return get_search_backend().search(db, query, limit, offset)
+
+
+def rebuild_index(db: Session, batch_size: int = 500) -> int:
+    backend = get_search_backend()
+    backend.ensure_schema(db)
+    backend.clear(db)
+
+    indexed = 0
+    last_id = 0
+
+    while True:
+        batch = (
+            db.query(Article)
+            .filter(
+                Article.id > last_id,
+                Article.status == "published",
+                Article.is_deleted == False
+            )
+            .order_by(Article.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        for article in batch:
+            backend.upsert(db, article.id, article_document(article))
+        indexed += len(batch)
+        last_id = batch[-1].id
+
+    db.commit()
+    return indexed
+
+
+def init_search_index():
+    """
+    Startup hook: backfills the index when empty.
+    The schema itself is created by migration 0003.
+    """
+    db = SessionLocal()
+    try:
+        backend = get_search_backend()
+        backend.ensure_schema(db)
+        db.commit()
+
+        if backend.is_empty(db):
+            indexed = rebuild_index(db)
+            logger.info(f"Search index built ({indexed} articles)")
+    except Exception:
+        db.rollback()
+        logger.exception("Search index initialization failed")
+    finally:
+        db.close()
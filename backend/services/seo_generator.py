@@ -1,12 +1,22 @@
 import json
+import os
 from services.agentic_brain import generate_canonical_article
+from services.keyword_extractor import get_keyword_extractor, meta_description, strip_markup
+from services.prompt_builder import trim_to_tokens
+
+# Article excerpt sent to the model (whole sentences, ~1200 characters)
+SEO_CONTENT_TOKENS = int(os.getenv("SEO_CONTENT_TOKENS", "300"))
 
 
 def generate_seo(article_title: str, article_content: str):
     """
-    Generates SEO title, meta description and tags using AI.
+    Generates SEO title and meta description using AI;
+    tags come from the local keyword extractor (no LLM tokens).
     """
 
+    text = strip_markup(article_content)
+    seo_tags = ",".join(get_keyword_extractor().tags(text, article_title))
+
     seo_prompt = f"""
 You are an expert SEO strategist.
 
@@ -17,28 +27,29 @@ Rules:
 Format:
 {{
   "seo_title": "...",
-  "meta_description": "...",
-  "seo_tags": "tag1,tag2,tag3"
+  "meta_description": "..."
 }}
 
 Article Title:
 {article_title}
 
 Article Content:
-{article_content[:1200]}
+{trim_to_tokens(text, SEO_CONTENT_TOKENS)}
 """
 
     raw_response = generate_canonical_article(
         master_prompt=seo_prompt,
-        user_topic=""
+        user_topic="",
+        cache_family="seo"
     )
 
     try:
         data = json.loads(raw_response)
+        data["seo_tags"] = seo_tags
         return data
     except Exception:
         return {
             "seo_title": f"{article_title} – Complete Guide",
-            "meta_description": article_title,
-            "seo_tags": ""
+            "meta_description": meta_description(text) or article_title,
+            "seo_tags": seo_tags
         }
@@ -1,3 +1,11 @@
+import os
+
+from services.prompt_builder import trim_to_tokens
+
+# Article excerpt sent to the model (whole sentences, ~1500 characters)
+SEO_PROMPT_CONTENT_TOKENS = int(os.getenv("SEO_PROMPT_CONTENT_TOKENS", "375"))
+
+
 def build_seo_prompt(article_title: str, article_content: str):
     return f"""
 You are an expert SEO strategist and content editor.
@@ -24,5 +32,5 @@ Article Title:
 {article_title}
 
 Article Content:
-{article_content[:1500]}
+{trim_to_tokens(article_content, SEO_PROMPT_CONTENT_TOKENS)}
 """
\ No newline at end of file
@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+
+# =========================
+# CONFIG
+# =========================
+OVERVIEW_CACHE_TTL_SECONDS = float(os.getenv("OVERVIEW_CACHE_TTL_SECONDS", "30"))
+
+
+class TTLCache:
+    """
+    Tiny in-process cache: key -> (value, computed_at).
+    Values are recomputed after `ttl` seconds or on explicit invalidation.
+
+    Invalidation only reaches this process: writes made by another process
+    (e.g. the worker's publish outbox) show up once the TTL expires.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute) -> tuple:
+        """
+        Returns (value, age_seconds).
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[1] < self.ttl:
+                return entry[0], now - entry[1]
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            # Invalidated while computing: the value may predate the write
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic())
+
+        return value, 0.0
+
+    def invalidate(self, key: str | None = None):
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+overview_cache = TTLCache(ttl=OVERVIEW_CACHE_TTL_SECONDS)
+
+
+def invalidate_overview_stats():
+    """
+    Call after publish / delete / restore (anything that moves article counts).
+    Per-process: the API's cache is refreshed by its TTL after worker writes.
+    """
+    overview_cache.invalidate()
@@ -1,44 +1,328 @@
 from sqlalchemy.orm import Session
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import hashlib
+import os
+import re
+import struct
+import threading
 
+from database import dialect_insert
 from models_trend_memory import TrendMemory
 
 
 COOLDOWN_DAYS = 14
 MAX_USAGE = 3
 
+# =========================
+# CONFIG
+# =========================
+# Token-set Jaccard at or above which two topics count as the same topic
+TREND_SIMILARITY_THRESHOLD = float(os.getenv("TREND_SIMILARITY_THRESHOLD", "0.7"))
+# MinHash signature = LSH_BANDS x LSH_ROWS values (at most 32)
+TREND_LSH_BANDS = int(os.getenv("TREND_LSH_BANDS", "16"))
+TREND_LSH_ROWS = int(os.getenv("TREND_LSH_ROWS", "2"))
+# Pick up topics recorded by other processes at most this late
+TREND_INDEX_REFRESH_SECONDS = float(os.getenv("TREND_INDEX_REFRESH_SECONDS", "300"))
 
-def record_trend_usage(db: Session, topic: str):
-    record = (
-        db.query(TrendMemory)
-        .filter(TrendMemory.topic == topic)
-        .first()
-    )
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in into is it its of on or the "
+    "this that to vs what when where which who why will with your you".split()
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
 
-    if record:
-        record.times_used += 1
-        record.last_used_at = datetime.utcnow()
-    else:
-        record = TrendMemory(topic=topic)
-        db.add(record)
+_trend_memory = TrendMemory.__table__
 
-    db.commit()
 
+# =========================
+# NORMALIZATION
+# =========================
 
-def is_topic_allowed(db: Session, topic: str) -> bool:
-    record = (
-        db.query(TrendMemory)
-        .filter(TrendMemory.topic == topic)
-        .first()
-    )
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def topic_tokens(topic: str) -> frozenset:
+    """
+    Case, punctuation, stopword and plural-insensitive token set:
+    "The GPT-5 Release" and "GPT-5 release" both give {"gpt", "5", "release"}.
+    """
+    tokens = {
+        _stem(token)
+        for token in _TOKEN_RE.findall((topic or "").lower())
+        if token not in _STOPWORDS
+    }
+    return frozenset(tokens)
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(sorted(topic_tokens(topic)))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# =========================
+# MINHASH-LSH INDEX
+# =========================
+
+# One blake2b digest per token yields all 32 hash functions at once
+_SIGNATURE_SIZE = 32
+_TOKEN_HASHES = struct.Struct(f">{_SIGNATURE_SIZE}H")
+
+
+def _token_hashes(token: str) -> tuple:
+    return _TOKEN_HASHES.unpack(hashlib.blake2b(token.encode(), digest_size=64).digest())
+
+
+class TopicIndex:
+    """
+    Near-duplicate index over past topics.
+
+    Exact matches go through a dict on the normalized form; near matches
+    through MinHash-LSH: topics sharing any band of their signature become
+    candidates, and a candidate matches when the true token-set Jaccard
+    reaches `threshold`. A lookup hashes a handful of tokens and touches
+    a few buckets, independent of how many topics are stored.
+    """
+
+    def __init__(
+        self,
+        threshold: float = TREND_SIMILARITY_THRESHOLD,
+        bands: int = TREND_LSH_BANDS,
+        rows: int = TREND_LSH_ROWS
+    ):
+        if bands * rows > _SIGNATURE_SIZE:
+            raise ValueError(f"bands x rows must be at most {_SIGNATURE_SIZE}")
+
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+
+        self._lock = threading.Lock()
+        self._by_key = {}      # normalized topic -> stored topic
+        self._tokens = {}      # normalized topic -> token set
+        self._buckets = {}     # (band, band values) -> set of normalized topics
+
+        self.last_id = 0
+        self.loaded_at = None
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def _signature(self, tokens: frozenset) -> list:
+        return [min(column) for column in zip(*map(_token_hashes, tokens))]
+
+    def _band_keys(self, tokens: frozenset) -> list:
+        signature = self._signature(tokens)
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def add(self, topic: str):
+        tokens = topic_tokens(topic)
+        if not tokens:
+            return
+
+        key = " ".join(sorted(tokens))
+        with self._lock:
+            if key in self._by_key:
+                return
+
+            self._by_key[key] = topic
+            self._tokens[key] = tokens
+            for band_key in self._band_keys(tokens):
+                self._buckets.setdefault(band_key, set()).add(key)
+
+    def match(self, topic: str) -> str | None:
+        """
+        Stored topic that `topic` duplicates (exactly or nearly), or None.
+        """
+        tokens = topic_tokens(topic)
+        if not tokens:
+            return None
+
+        key = " ".join(sorted(tokens))
+        band_keys = self._band_keys(tokens)
+
+        with self._lock:
+            if key in self._by_key:
+                return self._by_key[key]
+
+            candidates = set()
+            for band_key in band_keys:
+                candidates |= self._buckets.get(band_key, set())
+
+            best, best_score = None, self.threshold
+            for candidate in candidates:
+                score = _jaccard(tokens, self._tokens[candidate])
+                if score >= best_score:
+                    best, best_score = candidate, score
+
+            return self._by_key[best] if best else None
 
-    if not record:
-        return True
 
+_index = TopicIndex()
+_index_lock = threading.Lock()
+
+
+def get_topic_index(db: Session) -> TopicIndex:
+    """
+    Process-wide index, loaded incrementally (rows with a higher id than
+    seen so far) on first use and every TREND_INDEX_REFRESH_SECONDS.
+    """
+    now = datetime.utcnow()
+    with _index_lock:
+        stale = (
+            _index.loaded_at is None
+            or (now - _index.loaded_at).total_seconds() >= TREND_INDEX_REFRESH_SECONDS
+        )
+        if stale:
+            rows = (
+                db.query(TrendMemory.id, TrendMemory.topic)
+                .filter(TrendMemory.id > _index.last_id)
+                .order_by(TrendMemory.id)
+                .all()
+            )
+            for row in rows:
+                _index.add(row.topic)
+                _index.last_id = row.id
+            _index.loaded_at = now
+
+    return _index
+
+
+# =========================
+# ADMISSION (BATCH)
+# =========================
+
+@dataclass
+class TopicDecision:
+    topic: str
+    allowed: bool
+    reason: str | None = None     # "empty" | "duplicate_in_batch" | "max_usage" | "cooldown"
+    matched: str | None = None    # remembered topic this one duplicates
+
+
+def _rule_violation(record: TrendMemory, now: datetime) -> str | None:
     if record.times_used >= MAX_USAGE:
-        return False
+        return "max_usage"
+
+    if now - record.last_used_at < timedelta(days=COOLDOWN_DAYS):
+        return "cooldown"
+
+    return None
+
+
+def check_topics(db: Session, topics: list) -> list:
+    """
+    One TopicDecision per candidate, in order; usage rules are read
+    for the whole batch in one query.
+    Each candidate is resolved to the remembered topic it (near-)duplicates;
+    that topic's usage count and cooldown then apply. Near-duplicates
+    within the batch are rejected after the first.
+    """
+    index = get_topic_index(db)
+    now = datetime.utcnow()
+
+    decisions = []
+    matches = {}
+    batch = TopicIndex(threshold=index.threshold, bands=index.bands, rows=index.rows)
+
+    for topic in topics:
+        if not topic_tokens(topic):
+            decisions.append(TopicDecision(topic, False, "empty"))
+            continue
+
+        earlier = batch.match(topic)
+        if earlier is not None:
+            decisions.append(TopicDecision(topic, False, "duplicate_in_batch", earlier))
+            continue
+        batch.add(topic)
+
+        matched = index.match(topic)
+        decision = TopicDecision(topic, True, matched=matched)
+        decisions.append(decision)
+        if matched:
+            matches.setdefault(matched, []).append(decision)
+
+    if matches:
+        for record in db.query(TrendMemory).filter(TrendMemory.topic.in_(list(matches))).all():
+            reason = _rule_violation(record, now)
+            for decision in matches.get(record.topic, []):
+                if reason:
+                    decision.allowed = False
+                    decision.reason = reason
 
-    if datetime.utcnow() - record.last_used_at < timedelta(days=COOLDOWN_DAYS):
-        return False
+    return decisions
 
-    return True
+
+def filter_allowed_topics(db: Session, topics: list) -> list:
+    """
+    Candidates that may be used now, in input order.
+    """
+    return [decision.topic for decision in check_topics(db, topics) if decision.allowed]
+
+
+def is_topic_allowed(db: Session, topic: str) -> bool:
+    return bool(filter_allowed_topics(db, [topic]))
+
+
+# =========================
+# USAGE (UPSERT)
+# =========================
+
+def record_trend_usages(db: Session, topics: list):
+    """
+    Counts one use per topic with a single INSERT ... ON CONFLICT statement.
+    A near-duplicate is counted against the remembered topic it matches,
+    or against an earlier topic of the same batch.
+    Does not commit: the caller owns the transaction.
+    """
+    index = get_topic_index(db)
+    now = datetime.utcnow()
+
+    uses = {}
+    batch = TopicIndex(threshold=index.threshold, bands=index.bands, rows=index.rows)
+    for topic in topics:
+        if not topic_tokens(topic):
+            continue
+        # New topics are not in the index yet: fold near-duplicates within the batch too
+        canonical = index.match(topic) or batch.match(topic) or topic.strip()[:255]
+        batch.add(canonical)
+        uses[canonical] = uses.get(canonical, 0) + 1
+
+    if not uses:
+        return
+
+    stmt = dialect_insert(_trend_memory)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_trend_memory.c.topic],
+        set_={
+            "times_used": _trend_memory.c.times_used + stmt.excluded.times_used,
+            "last_used_at": stmt.excluded.last_used_at
+        }
+    )
+    db.execute(
+        stmt,
+        [
+            {"topic": topic, "times_used": count, "last_used_at": now, "created_at": now}
+            for topic, count in uses.items()
+        ]
+    )
+
+    for topic in uses:
+        index.add(topic)
+
+
+def record_trend_usage(db: Session, topic: str):
+    record_trend_usages(db, [topic])
+    db.commit()
@@ -11,9 +11,8 @@ def get_trending_topics(
     No articles, no HTML, no publishing.
     """
 
-    prompt = f"""
-{master_prompt}
-
+    # The master prompt goes separately: as a cached context when it is static
+    task = f"""
 TASK:
 Suggest {limit} trending TECHNOLOGY blog topics.
 
@@ -28,8 +27,9 @@ RULES:
 """
 
     response = generate_canonical_article(
-        master_prompt="",
-        user_topic=prompt
+        master_prompt=master_prompt,
+        user_topic=task,
+        cache_family="trending"
     )
 
     topics = [
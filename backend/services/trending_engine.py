@@ -0,0 +1,308 @@
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, func
+
+from database import SessionLocal
+from models import Article
+from models_analytics import ArticleDailyViews
+from services.pagination import ARTICLE_LIST_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+# A view counts half as much after this long
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+TRENDING_TOP_K = int(os.getenv("TRENDING_TOP_K", "50"))
+TRENDING_REFRESH_SECONDS = float(os.getenv("TRENDING_REFRESH_SECONDS", "30"))
+# Rebuild scores from article_daily_views (picks up views served by other processes)
+TRENDING_RESEED_SECONDS = float(os.getenv("TRENDING_RESEED_SECONDS", "900"))
+# History used when seeding; older views have decayed to nothing anyway
+TRENDING_WINDOW_DAYS = int(os.getenv("TRENDING_WINDOW_DAYS", "14"))
+
+# Re-anchor scores before weights grow past 2^64
+_MAX_EXPONENT = 64
+
+
+def most_viewed_query(db, limit: int):
+    """
+    Live published articles by lifetime views (list fields only).
+    """
+    return (
+        db.query(*(getattr(Article, field) for field in ARTICLE_LIST_FIELDS))
+        .filter(Article.status == "published", Article.is_deleted == False)
+        .order_by(Article.view_count.desc())
+        .limit(limit)
+    )
+
+
+def _unix(when: datetime) -> float:
+    return when.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TrendingEngine:
+    """
+    Time-decayed trending leaderboard.
+
+    Each view adds 2^((t - epoch) / half_life) to its article's score, so
+    a view is O(1) and ranking by the stored score is the same as ranking
+    by exponentially decayed views at any moment (all scores share one
+    decay factor). A background thread re-ranks the top K every few
+    seconds; top() only slices that snapshot, with no DB query.
+
+    Scores are seeded from article_daily_views at start-up and on every
+    reseed, then fed by this process's views in between.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        half_life_hours: float = TRENDING_HALF_LIFE_HOURS,
+        top_k: int = TRENDING_TOP_K,
+        refresh_interval: float = TRENDING_REFRESH_SECONDS,
+        reseed_interval: float = TRENDING_RESEED_SECONDS,
+        window_days: int = TRENDING_WINDOW_DAYS
+    ):
+        self._session_factory = session_factory
+        self.half_life = half_life_hours * 3600
+        self.top_k = max(1, top_k)
+        self.refresh_interval = refresh_interval
+        self.reseed_interval = reseed_interval
+        self.window_days = window_days
+
+        self._lock = threading.Lock()
+        self._epoch = time.time()
+        self._scores = defaultdict(float)
+        # Views recorded while a reseed is running (merged into its result)
+        self._since_seed = None
+
+        self._leaders = ()
+        self._refreshed_at = None
+        self._seeded_at = -math.inf
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------------------------
+    # HOT PATH
+    # -------------------------
+    def _weight(self, ts: float) -> float:
+        return 2.0 ** ((ts - self._epoch) / self.half_life)
+
+    def record(self, article_id: int, when: datetime | None = None):
+        ts = _unix(when) if when else time.time()
+        with self._lock:
+            weight = self._weight(ts)
+            self._scores[article_id] += weight
+            if self._since_seed is not None:
+                self._since_seed[article_id] += weight
+
+    def score(self, article_id: int, now: float | None = None) -> float:
+        """
+        Decayed score: 1.0 per view right now, 0.5 per view one half-life ago.
+        """
+        now = now or time.time()
+        with self._lock:
+            return self._scores.get(article_id, 0.0) * 2.0 ** ((self._epoch - now) / self.half_life)
+
+    def forget(self, article_id: int):
+        """
+        Drops an article at once (e.g. on delete) instead of at the next refresh.
+        """
+        with self._lock:
+            self._scores.pop(article_id, None)
+            self._leaders = tuple(row for row in self._leaders if row["id"] != article_id)
+
+    def _rebase(self, now: float):
+        # Caller holds the lock. Same ranking, smaller numbers.
+        factor = 2.0 ** ((self._epoch - now) / self.half_life)
+        self._scores = defaultdict(float, {
+            article_id: score * factor
+            for article_id, score in self._scores.items()
+            if score * factor > 1e-9
+        })
+        self._epoch = now
+
+    # -------------------------
+    # SEED (from the DB)
+    # -------------------------
+    def seed(self, db) -> int:
+        """
+        Rebuilds every score from article_daily_views in one grouped query.
+        Each day's views are weighted at midday (or now, for today).
+        Returns the number of articles with a score.
+        """
+        now = time.time()
+        today = datetime.utcnow().date()
+        start = today - timedelta(days=self.window_days - 1)
+
+        with self._lock:
+            self._since_seed = defaultdict(float)
+
+        try:
+            weights = {}
+            for offset in range(self.window_days):
+                day = start + timedelta(days=offset)
+                midday = _unix(datetime(day.year, day.month, day.day, 12))
+                weights[day] = 2.0 ** ((min(midday, now) - now) / self.half_life)
+
+            weighted = func.sum(
+                ArticleDailyViews.views * case(
+                    *((ArticleDailyViews.day == day, weight) for day, weight in weights.items()),
+                    else_=0.0
+                )
+            )
+            rows = (
+                db.query(ArticleDailyViews.article_id, weighted)
+                .filter(ArticleDailyViews.day >= start)
+                .group_by(ArticleDailyViews.article_id)
+                .all()
+            )
+            scores = defaultdict(float, {
+                article_id: float(score)
+                for article_id, score in rows
+                if score
+            })
+
+        except Exception:
+            with self._lock:
+                self._since_seed = None
+            raise
+
+        with self._lock:
+            factor = 2.0 ** ((self._epoch - now) / self.half_life)
+            for article_id, weight in self._since_seed.items():
+                scores[article_id] += weight * factor
+
+            self._scores = scores
+            self._epoch = now
+            self._since_seed = None
+            self._seeded_at = time.monotonic()
+
+        return len(scores)
+
+    # -------------------------
+    # REFRESH (top K)
+    # -------------------------
+    def refresh(self, db) -> int:
+        """
+        Re-ranks: top candidates by score (O(n log K)), then one query for
+        their list fields, keeping only live published articles. Short
+        lists are filled with the most viewed articles overall.
+        """
+        with self._lock:
+            if (time.time() - self._epoch) / self.half_life > _MAX_EXPONENT:
+                self._rebase(time.time())
+
+            scores = list(self._scores.items())
+            decay = 2.0 ** ((self._epoch - time.time()) / self.half_life)
+
+        # Headroom for candidates that are no longer published
+        candidates = heapq.nlargest(self.top_k * 2, scores, key=lambda item: item[1])
+
+        columns = [getattr(Article, field) for field in ARTICLE_LIST_FIELDS]
+        live = (Article.status == "published", Article.is_deleted == False)
+
+        rows = {}
+        if candidates:
+            rows = {
+                row.id: row
+                for row in db.query(*columns)
+                .filter(Article.id.in_([article_id for article_id, _ in candidates]), *live)
+                .all()
+            }
+
+        leaders = [
+            {**rows[article_id]._asdict(), "trending_score": round(score * decay, 4)}
+            for article_id, score in candidates
+            if article_id in rows
+        ][:self.top_k]
+
+        if len(leaders) < self.top_k:
+            ranked = {row["id"] for row in leaders}
+            fill = most_viewed_query(db, self.top_k).all()
+            leaders.extend(
+                {**row._asdict(), "trending_score": 0.0}
+                for row in fill
+                if row.id not in ranked
+            )
+            leaders = leaders[:self.top_k]
+
+        with self._lock:
+            self._leaders = tuple(leaders)
+            self._refreshed_at = datetime.utcnow()
+
+        return len(leaders)
+
+    def top(self, limit: int = 10) -> list:
+        """
+        Current leaderboard, best first. O(limit): no DB access once the
+        first refresh has run.
+        """
+        if self._refreshed_at is None:
+            self._refresh_once()
+
+        return list(self._leaders[:max(0, min(limit, self.top_k))])
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "scored_articles": len(self._scores),
+                "leaders": len(self._leaders),
+                "refreshed_at": self._refreshed_at,
+                "half_life_hours": self.half_life / 3600
+            }
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+    def _refresh_once(self):
+        db = self._session_factory()
+        try:
+            if time.monotonic() - self._seeded_at >= self.reseed_interval:
+                self.seed(db)
+            self.refresh(db)
+        except Exception:
+            db.rollback()
+            logger.exception("Trending refresh failed")
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            self._refresh_once()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._refresh_once()
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="trending-refresh",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Trending engine started ({len(self._scores)} scored articles, "
+            f"refresh every {self.refresh_interval}s)"
+        )
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval + 5)
+            self._thread = None
+
+
+trending_engine = TrendingEngine()
@@ -0,0 +1,166 @@
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import update, bindparam, func
+
+from database import SessionLocal, dialect_insert
+from models import Article
+from models_analytics import ArticleDailyViews
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+VIEW_FLUSH_INTERVAL_SECONDS = float(os.getenv("VIEW_FLUSH_INTERVAL_SECONDS", "10"))
+
+_articles = Article.__table__
+
+# One statement, executed as a single executemany batch per flush
+INCREMENT_VIEWS_SQL = (
+    update(_articles)
+    .where(_articles.c.id == bindparam("article_id"))
+    .values(
+        view_count=func.coalesce(_articles.c.view_count, 0) + bindparam("delta"),
+        # A view is not an edit: keep updated_at (article response cache key)
+        updated_at=_articles.c.updated_at
+    )
+)
+
+_daily = ArticleDailyViews.__table__
+
+
+def _daily_upsert():
+    stmt = dialect_insert(_daily)
+    return stmt.on_conflict_do_update(
+        index_elements=[_daily.c.article_id, _daily.c.day],
+        set_={"views": _daily.c.views + stmt.excluded.views}
+    )
+
+
+class ViewCounter:
+    """
+    Write-behind view counter.
+    Page views only touch an in-memory buffer keyed by (article_id, day);
+    a background thread folds the buffer into the DB every few seconds.
+    """
+
+    def __init__(self, session_factory=SessionLocal, flush_interval: float = VIEW_FLUSH_INTERVAL_SECONDS):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------------------------
+    # HOT PATH
+    # -------------------------
+    def record(self, article_id: int, when: datetime | None = None):
+        day = (when or datetime.utcnow()).date()
+        with self._lock:
+            self._pending[(article_id, day)] += 1
+
+    def pending_for(self, article_id: int) -> int:
+        with self._lock:
+            return sum(
+                delta for (pending_id, _), delta in self._pending.items()
+                if pending_id == article_id
+            )
+
+    # -------------------------
+    # FLUSH
+    # -------------------------
+    def _drain(self) -> dict:
+        with self._lock:
+            batch = self._pending
+            self._pending = defaultdict(int)
+        return batch
+
+    def _restore(self, batch: dict):
+        with self._lock:
+            for key, delta in batch.items():
+                self._pending[key] += delta
+
+    def _write(self, db, batch: dict):
+        per_article = defaultdict(int)
+        for (article_id, _), delta in batch.items():
+            per_article[article_id] += delta
+
+        db.execute(
+            INCREMENT_VIEWS_SQL,
+            [
+                {"article_id": article_id, "delta": delta}
+                for article_id, delta in per_article.items()
+            ]
+        )
+
+        db.execute(
+            _daily_upsert(),
+            [
+                {"article_id": article_id, "day": day, "views": delta}
+                for (article_id, day), delta in batch.items()
+            ]
+        )
+
+    def flush(self) -> int:
+        """
+        Applies buffered increments in one transaction.
+        On failure the batch is put back so no views are lost.
+        Returns the number of views written.
+        """
+        with self._flush_lock:
+            batch = self._drain()
+            if not batch:
+                return 0
+
+            db = self._session_factory()
+            try:
+                self._write(db, batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._restore(batch)
+                logger.exception("View counter flush failed; batch re-queued")
+                return 0
+            finally:
+                db.close()
+
+            return sum(batch.values())
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="view-counter-flush",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(f"View counter started (flush every {self.flush_interval}s)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+
+        written = self.flush()
+        logger.info(f"View counter stopped (final flush: {written} views)")
+
+
+view_counter = ViewCounter()
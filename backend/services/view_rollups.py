@@ -0,0 +1,175 @@
+from datetime import date, datetime, timedelta
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models_analytics import ArticleDailyViews, ViewRollup
+
+logger = logging.getLogger(__name__)
+
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+
+ROLLUP_PERIODS = 12
+
+
+# =========================
+# BUCKET HELPERS
+# =========================
+
+def bucket_start(period: str, day: date) -> date:
+    if period == WEEKLY:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket(period: str, start: date) -> date:
+    if period == WEEKLY:
+        return start + timedelta(days=7)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def previous_bucket(period: str, start: date) -> date:
+    if period == WEEKLY:
+        return start - timedelta(days=7)
+    return bucket_start(MONTHLY, start - timedelta(days=1))
+
+
+def bucket_label(period: str, start: date) -> str:
+    return start.strftime("%Y-%W" if period == WEEKLY else "%Y-%m")
+
+
+def last_buckets(period: str, count: int, today: date) -> list:
+    """
+    Oldest-first list of the last `count` bucket starts, current one included.
+    """
+    buckets = [bucket_start(period, today)]
+    while len(buckets) < count:
+        buckets.append(previous_bucket(period, buckets[-1]))
+    return list(reversed(buckets))
+
+
+# =========================
+# QUERIES
+# =========================
+
+def daily_totals(db: Session, start: date, end: date) -> dict:
+    """
+    Site-wide views per day in [start, end]; a range scan on the day index.
+    """
+    rows = (
+        db.query(
+            ArticleDailyViews.day,
+            func.sum(ArticleDailyViews.views)
+        )
+        .filter(
+            ArticleDailyViews.day >= start,
+            ArticleDailyViews.day <= end
+        )
+        .group_by(ArticleDailyViews.day)
+        .all()
+    )
+    return {day: int(views or 0) for day, views in rows}
+
+
+def period_series(db: Session, period: str, count: int = ROLLUP_PERIODS, today: date | None = None) -> list:
+    """
+    Views for the last `count` weeks/months.
+    Closed buckets come from view_rollups; only the open bucket
+    (and any closed bucket not rolled up yet) touches the daily table.
+    """
+    today = today or datetime.utcnow().date()
+    buckets = last_buckets(period, count, today)
+
+    closed = [b for b in buckets if next_bucket(period, b) <= today]
+    stored = dict(
+        db.query(ViewRollup.bucket_start, ViewRollup.views)
+        .filter(
+            ViewRollup.period == period,
+            ViewRollup.bucket_start.in_(closed)
+        )
+        .all()
+    ) if closed else {}
+
+    missing = [b for b in buckets if b not in stored]
+    totals = daily_totals(db, missing[0], today) if missing else {}
+
+    series = []
+    for start in buckets:
+        if start in stored:
+            views = stored[start]
+        else:
+            end = next_bucket(period, start)
+            views = sum(v for day, v in totals.items() if start <= day < end)
+        series.append((start, int(views)))
+
+    return series
+
+
+# =========================
+# ROLLUP JOB
+# =========================
+
+def refresh_rollups(db: Session, today: date | None = None) -> int:
+    """
+    Stores totals for closed weeks/months that are not rolled up yet.
+    Returns the number of rollup rows written.
+    """
+    today = today or datetime.utcnow().date()
+    written = 0
+
+    for period in (WEEKLY, MONTHLY):
+        buckets = [
+            b for b in last_buckets(period, ROLLUP_PERIODS + 1, today)
+            if next_bucket(period, b) <= today
+        ]
+        if not buckets:
+            continue
+
+        existing = {
+            row[0]
+            for row in db.query(ViewRollup.bucket_start)
+            .filter(
+                ViewRollup.period == period,
+                ViewRollup.bucket_start.in_(buckets)
+            )
+            .all()
+        }
+
+        todo = [b for b in buckets if b not in existing]
+        if not todo:
+            continue
+
+        totals = daily_totals(db, todo[0], next_bucket(period, todo[-1]) - timedelta(days=1))
+
+        for start in todo:
+            end = next_bucket(period, start)
+            db.add(ViewRollup(
+                period=period,
+                bucket_start=start,
+                views=sum(v for day, v in totals.items() if start <= day < end),
+                computed_at=datetime.utcnow()
+            ))
+            written += 1
+
+    db.commit()
+    return written
+
+
+def run_view_rollups():
+    """
+    Scheduler entry point
+    """
+    db = SessionLocal()
+    try:
+        written = refresh_rollups(db)
+        logger.info(f"View rollups refreshed ({written} new buckets)")
+    except Exception:
+        db.rollback()
+        logger.exception("View rollup job failed")
+    finally:
+        db.close()
@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read at import time: point everything at a scratch
+# directory before the app (or any service) is imported
+_TMP_DIR = tempfile.mkdtemp(prefix="blog-tests-")
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_TMP_DIR, 'articles.db')}",
+    "OWNER_API_KEY": "test-owner-key",
+    "LLM_FAKE_MODEL": "true",
+    "LLM_CACHE_ENABLED": "false",
+    "LLM_CACHE_PATH": os.path.join(_TMP_DIR, "llm_cache.db"),
+    "RELATED_INDEX_DIR": os.path.join(_TMP_DIR, "related_index"),
+    "KEYWORD_STATS_PATH": os.path.join(_TMP_DIR, "keyword_stats"),
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app():
+    import main
+    return main.app
+
+
+@pytest.fixture()
+def client(app):
+    from fastapi.testclient import TestClient
+    from auth import verify_owner
+
+    app.dependency_overrides[verify_owner] = lambda: True
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def db(app):
+    from database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
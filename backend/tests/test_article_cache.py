@@ -0,0 +1,65 @@
+from models import Article
+from services.article_cache import article_response_cache, build_response, negotiate_coding
+
+LONG_BODY = "Cached article body. " * 100  # above ARTICLE_CACHE_MIN_COMPRESS_BYTES
+
+
+def _published(db, title="Cached article"):
+    article = Article(title=title, content=LONG_BODY, canonical_content=LONG_BODY, status="published")
+    db.add(article)
+    db.commit()
+    return article.id
+
+
+def test_etag_revalidation_returns_304(client, db):
+    article_id = _published(db)
+
+    first = client.get(f"/api/articles/{article_id}", headers={"Accept-Encoding": "identity"})
+    etag = first.headers["etag"]
+    again = client.get(f"/api/articles/{article_id}", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("public")
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"]
+
+
+def test_gzip_is_negotiated_and_identity_is_the_fallback(client, db):
+    article_id = _published(db)
+
+    gzipped = client.get(f"/api/articles/{article_id}", headers={"Accept-Encoding": "gzip"})
+    plain = client.get(f"/api/articles/{article_id}", headers={"Accept-Encoding": "identity"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+    assert gzipped.json() == plain.json()
+    assert plain.json()["title"] == "Cached article"
+
+
+def test_negotiation_prefers_br_and_honours_q_zero():
+    entry = build_response(None, {"body": LONG_BODY})
+    entry.bodies.setdefault("br", b"stand-in")  # brotli is optional
+
+    assert negotiate_coding(entry, "gzip, br") == "br"
+    assert negotiate_coding(entry, "gzip, br;q=0") == "gzip"
+    assert negotiate_coding(entry, "*") == "br"
+    assert negotiate_coding(entry, None) == "identity"
+
+
+def test_owner_edit_evicts_cached_response(client, db):
+    article_id = _published(db, title="Before edit")
+    client.get(f"/api/articles/{article_id}")
+    assert article_id in article_response_cache._entries
+
+    response = client.put(f"/api/admin/articles/{article_id}", json={"title": "After edit"})
+
+    assert response.status_code == 200
+    assert article_id not in article_response_cache._entries
+
+    # Edits go back to review; once live again, the new title is served
+    db.query(Article).filter(Article.id == article_id).update({"status": "published"})
+    db.commit()
+    assert client.get(f"/api/articles/{article_id}").json()["title"] == "After edit"
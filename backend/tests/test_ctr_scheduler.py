@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from models import Article
+from models_ctr import CtrRun
+from services import ctr_scheduler
+
+
+def _weak_article(db, **fields):
+    article = Article(
+        title="CTR candidate", content="x", status="published", is_deleted=False,
+        published_at=datetime.utcnow() - timedelta(days=30), view_count=0, **fields
+    )
+    db.add(article)
+    db.commit()
+    return article.id
+
+
+def test_run_accounts_for_every_eligible_article(db, monkeypatch):
+    ids = [_weak_article(db) for _ in range(3)]
+    # One article stops being weak between the ID scan and its batch
+    real_is_weak = ctr_scheduler.is_ctr_weak
+    monkeypatch.setattr(ctr_scheduler, "is_ctr_weak", lambda a: a.id != ids[0] and real_is_weak(a))
+
+    result = ctr_scheduler.run_ctr_optimization(max_llm_calls=1)
+
+    run = db.query(CtrRun).order_by(CtrRun.id.desc()).first()
+    assert run.skipped >= 1
+    assert run.eligible == run.optimized + run.failed + run.deferred + run.skipped
+    assert result["skipped"] == run.skipped
+
+
+def test_expired_budget_defers_before_llm_fan_out(db, monkeypatch):
+    _weak_article(db)
+    monkeypatch.setattr(ctr_scheduler.RunBudget, "expired", lambda self: True)
+    monkeypatch.setattr(ctr_scheduler, "generate_canonical_articles", _unexpected_llm_call)
+
+    ctr_scheduler.run_ctr_optimization()
+
+    run = db.query(CtrRun).order_by(CtrRun.id.desc()).first()
+    assert run.optimized == 0
+    assert run.deferred >= 1
+    assert run.eligible == run.optimized + run.failed + run.deferred + run.skipped
+
+
+def test_generated_responses_are_applied_after_the_deadline(db, monkeypatch):
+    _weak_article(db)
+    checks = iter([False])
+    # Deadline passes while the batch's responses are being generated
+    monkeypatch.setattr(ctr_scheduler.RunBudget, "expired", lambda self: next(checks, True))
+
+    ctr_scheduler.run_ctr_optimization()
+
+    run = db.query(CtrRun).order_by(CtrRun.id.desc()).first()
+    assert run.deferred == 0
+    assert run.optimized >= 1
+    assert run.optimized + run.failed + run.skipped == run.eligible
+
+
+def _unexpected_llm_call(*args, **kwargs):
+    raise AssertionError("LLM called after the wall-time limit")
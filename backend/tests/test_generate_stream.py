@@ -0,0 +1,15 @@
+import routes.owner as owner
+
+
+def test_stream_reports_unexpected_errors_as_sse(client, monkeypatch):
+    def broken_stream(title):
+        yield "summary_hook", "Hook"
+        raise RuntimeError("model connection reset")
+
+    monkeypatch.setattr(owner, "stream_structured_blog", broken_stream)
+
+    response = client.get("/api/admin/articles/generate/stream", params={"title": "Broken stream"})
+
+    assert response.status_code == 200
+    assert "event: intro" in response.text
+    assert 'event: error\ndata: {"detail": "Generation failed"}' in response.text
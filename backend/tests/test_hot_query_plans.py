@@ -0,0 +1,25 @@
+from sqlalchemy import create_engine
+
+from database import Base
+import models
+import models_trend_memory
+import models_analytics
+import models_ctr
+import models_jobs
+import models_publish
+import models_reoptimize
+
+from migrations import run_migrations
+from migrations.explain import check_hot_query_plans
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    plans = check_hot_query_plans(engine)
+
+    assert plans
+    unindexed = {name: plan for name, (indexed, plan) in plans.items() if not indexed}
+    assert not unindexed, "\n\n".join(f"{name}:\n{plan}" for name, plan in unindexed.items())
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from services.html_builder import build_blog_html
+
+STRUCTURE = {
+    "summary_hook": 'It\'s "fast" <script>alert(1)</script>',
+    "sections": [{"heading": "Why 'async'?", "content": 'Use "await" & relax.'}],
+    "conclusion": "That's it",
+}
+
+
+def test_element_text_escapes_markup_but_keeps_quotes():
+    html = build_blog_html(STRUCTURE, "Async", [SimpleNamespace(title='Dev\'s "guide"')])
+
+    assert '<p><em>It\'s "fast" &lt;script&gt;alert(1)&lt;/script&gt;</em></p>' in html
+    assert "<h2>Why 'async'?</h2>" in html
+    assert '<p>Use "await" &amp; relax.</p>' in html
+    assert 'Dev\'s "guide"' in html
+    assert "<script>" not in html
+
+
+def test_attribute_values_escape_quotes():
+    html = build_blog_html(STRUCTURE, 'My "Title"')
+
+    assert 'alt="My &quot;Title&quot; overview illustration"' in html
+    assert 'alt="Why &#x27;async&#x27;? explained"' in html
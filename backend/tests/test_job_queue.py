@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+
+from models_jobs import Job
+from services.job_queue import DEAD, QUEUED, SUCCEEDED, purge_finished_jobs
+
+
+def test_purge_keeps_recent_and_unfinished_jobs(db):
+    old = datetime.utcnow() - timedelta(days=30)
+    recent = datetime.utcnow() - timedelta(days=1)
+    jobs = {
+        "old_succeeded": Job(kind="t", status=SUCCEEDED, finished_at=old),
+        "old_dead": Job(kind="t", status=DEAD, finished_at=old),
+        "recent_succeeded": Job(kind="t", status=SUCCEEDED, finished_at=recent),
+        "old_queued": Job(kind="t", status=QUEUED, run_at=old),
+    }
+    db.add_all(jobs.values())
+    db.commit()
+
+    assert purge_finished_jobs(db, older_than_days=14) == 2
+    db.commit()
+
+    remaining = {job.id for job in db.query(Job).filter(Job.kind == "t")}
+    assert remaining == {jobs["recent_succeeded"].id, jobs["old_queued"].id}
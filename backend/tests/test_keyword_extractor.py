@@ -0,0 +1,116 @@
+import services.keyword_extractor as keyword_extractor
+from models import Article
+from services.keyword_extractor import KeywordExtractor, get_keyword_extractor, rebuild_keyword_stats, tag_articles
+
+_TEXT = (
+    "Local language models now run on laptops. Local language models keep data private, "
+    "and quantized weights make local language models fast enough for daily use."
+)
+
+
+def test_tags_skip_phrases_covered_by_a_better_one():
+    tags = KeywordExtractor().tags(_TEXT, title="Local language models on laptops")
+
+    assert tags[0] == "local language models"
+    # Every word of "language models" / "models" is already covered
+    assert "language models" not in tags
+    assert "models" not in tags
+    assert len(tags) == len(set(tags))
+
+
+def test_tags_respect_limit():
+    assert len(KeywordExtractor().tags(_TEXT, limit=2)) == 2
+
+
+def test_internal_links_match_target_titles():
+    targets = [
+        {"id": 1, "title": "Running language models offline", "url": "/a"},
+        {"id": 2, "title": "Sourdough baking basics", "url": "/b"},
+        {"id": 3, "title": "Quantized weights explained", "url": "/c"},
+        {"id": 4, "title": "Local language models on laptops", "url": "/d"},
+    ]
+
+    links = KeywordExtractor().internal_links(
+        _TEXT, title="Local language models on laptops", targets=targets, exclude_id=3
+    )
+
+    # No shared words, excluded id and own title are all skipped
+    assert [link["id"] for link in links] == [1]
+    assert links[0]["anchor"] == "local language models"
+    assert links[0]["url"] == "/a"
+
+
+def test_internal_links_empty_without_text():
+    targets = [{"id": 1, "title": "Anything", "url": "/a"}]
+    assert KeywordExtractor().internal_links("", targets=targets) == []
+
+
+def test_snapshot_round_trip(tmp_path):
+    extractor = KeywordExtractor(buckets=4096)
+    extractor.add_document("local models on laptops")
+    extractor.add_document("sourdough baking at home")
+    extractor.link_targets = [{"id": 7, "title": "Local models", "url": "/local-models"}]
+    extractor.built_at = "2026-01-01T00:00:00"
+
+    path = str(tmp_path / "stats" / "keyword_stats")
+    extractor.save(path)
+    loaded = KeywordExtractor.load(path)
+
+    assert loaded.docs == 2
+    assert list(loaded.df) == list(extractor.df)
+    assert loaded.link_targets == extractor.link_targets
+    assert loaded.built_at == extractor.built_at
+    # Common words weigh less than rare ones after the reload too
+    assert loaded.idf("laptops") == extractor.idf("laptops")
+    assert loaded.idf("laptops") < loaded.idf("compilers")
+
+
+def test_rebuild_snapshot_is_picked_up(db):
+    article = Article(
+        title="Keyword snapshot target", content="x",
+        canonical_content="Snapshot rebuild checks.", status="published"
+    )
+    db.add(article)
+    db.commit()
+
+    rebuilt = rebuild_keyword_stats(db)
+    extractor = get_keyword_extractor()
+
+    assert extractor.docs == rebuilt.docs
+    assert extractor.built_at == rebuilt.built_at
+    assert any(target["id"] == article.id for target in extractor.link_targets)
+
+
+def test_tag_articles_batches_and_skips_tagged(db, monkeypatch):
+    batches = []
+    original = keyword_extractor._article_batches
+
+    def small_batches(db, *filters, batch_size=500):
+        for batch in original(db, *filters, batch_size=2):
+            batches.append(len(batch))
+            yield batch
+
+    monkeypatch.setattr(keyword_extractor, "_article_batches", small_batches)
+
+    untagged = [
+        Article(title=f"Batch tagging post {i}", content="x", canonical_content=_TEXT, status="published")
+        for i in range(5)
+    ]
+    tagged = Article(title="Already tagged", content="x", canonical_content=_TEXT, seo_tags="keep,me")
+    db.add_all(untagged + [tagged])
+    db.commit()
+    ids = [article.id for article in untagged]
+    tagged_id = tagged.id
+
+    assert tag_articles(db, dry_run=True) >= 5
+    assert all(not db.get(Article, article_id).seo_tags for article_id in ids)
+
+    batches.clear()
+    assert tag_articles(db) >= 5
+
+    assert batches and max(batches) <= 2
+    for article_id in ids:
+        assert "local language models" in db.get(Article, article_id).seo_tags.split(",")
+    assert db.get(Article, tagged_id).seo_tags == "keep,me"
+    # Nothing left to tag
+    assert tag_articles(db) == 0
@@ -0,0 +1,44 @@
+from services.prompt_builder import count_tokens, trim_to_tokens
+
+_THREE_SENTENCES = "One two three. Four five six. Seven eight nine."
+
+
+def test_count_tokens():
+    assert count_tokens("") == 0
+    assert count_tokens(None) == 0
+    # Short words and punctuation runs are one token each
+    assert count_tokens("One two three.") == 4
+    assert count_tokens("wait...!") == 2
+    # Long words split every ~4 characters
+    assert count_tokens("internationalization") == 5
+    # Non-Latin scripts: about a token per character
+    assert count_tokens("日本語") == 3
+
+
+def test_under_budget_text_passes_through():
+    assert trim_to_tokens(_THREE_SENTENCES, 100) == _THREE_SENTENCES
+    # Exactly at the budget is still under it
+    assert trim_to_tokens(_THREE_SENTENCES, 12) == _THREE_SENTENCES
+    assert trim_to_tokens("  padded.\n", 100) == "padded."
+    assert trim_to_tokens(None, 10) == ""
+
+
+def test_trim_cuts_at_last_whole_sentence():
+    assert trim_to_tokens(_THREE_SENTENCES, 11) == "One two three. Four five six."
+    assert trim_to_tokens(_THREE_SENTENCES, 8) == "One two three. Four five six."
+    assert trim_to_tokens(_THREE_SENTENCES, 7) == "One two three."
+
+    for budget in range(4, 12):
+        assert count_tokens(trim_to_tokens(_THREE_SENTENCES, budget)) <= budget
+
+
+def test_trim_cuts_at_newlines():
+    assert trim_to_tokens("Heading\nBody text here.", 2) == "Heading"
+
+
+def test_trim_falls_back_to_words_when_first_sentence_is_over():
+    text = "Alpha beta gamma delta epsilon. Zeta."
+
+    assert trim_to_tokens(text, 3) == "Alpha beta gamma"
+    assert trim_to_tokens(text, 1) == "Alpha"
+    assert trim_to_tokens(text, 0) == ""
@@ -0,0 +1,16 @@
+from models import Article
+
+
+def test_publish_batch_with_nothing_to_publish_is_409(client, db):
+    article = Article(title="Already out", content="x", status="published")
+    db.add(article)
+    db.commit()
+
+    response = client.post(
+        "/api/admin/articles/publish-batch",
+        json={"article_ids": [article.id, 987654], "platforms": ["blogger"]}
+    )
+
+    assert response.status_code == 409
+    skipped = {s["article_id"]: s["status"] for s in response.json()["detail"]["skipped"]}
+    assert skipped == {article.id: "already_published", 987654: "not_found"}
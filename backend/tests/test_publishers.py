@@ -0,0 +1,14 @@
+from services.publishers.base import RateLimiter
+
+
+def test_zero_rate_means_no_limit():
+    limiter = RateLimiter(per_minute=0, burst=1)
+
+    limiter.acquire(10)  # would divide by zero / block forever otherwise
+
+
+def test_empty_bucket_reports_wait_time():
+    limiter = RateLimiter(per_minute=60, burst=1)
+
+    assert limiter._take() == 0.0
+    assert 0 < limiter._take() <= 1.0
@@ -0,0 +1,56 @@
+import random
+import string
+
+from models import Article
+from services.related_block import get_related_posts
+from services.related_index import RELATED_MIN_SCORE, RelatedIndex
+
+_rng = random.Random(7)
+
+
+def _vocabulary(size=150):
+    return ["".join(_rng.choice(string.ascii_lowercase) for _ in range(_rng.randint(4, 9)))
+            for _ in range(size)]
+
+
+def _document(vocabulary):
+    return {
+        "title": " ".join(_rng.sample(vocabulary, 6)),
+        "seo_tags": " ".join(_rng.sample(vocabulary, 4)),
+        "meta_description": " ".join(_rng.choices(vocabulary, k=20)),
+        "body": " ".join(_rng.choices(vocabulary, k=400)),
+    }
+
+
+def test_unrelated_articles_stay_below_min_score(tmp_path):
+    # Disjoint vocabularies: any similarity is hash-bucket collision noise
+    index = RelatedIndex(str(tmp_path))
+    index.rebuild((article_id, _document(_vocabulary())) for article_id in range(1, 501))
+
+    for _ in range(20):
+        assert index.neighbours(_document(_vocabulary()), limit=5) == []
+
+
+def test_related_article_clears_min_score(tmp_path):
+    vocabulary = _vocabulary()
+    index = RelatedIndex(str(tmp_path))
+    index.rebuild([(1, _document(vocabulary)), (2, _document(_vocabulary()))])
+
+    [(article_id, score)] = index.neighbours(_document(vocabulary), limit=5)
+
+    assert article_id == 1
+    assert score > RELATED_MIN_SCORE
+
+
+def test_fallback_skips_soft_deleted_articles(db):
+    live = Article(title="Live fallback post", content="x", status="published")
+    deleted = Article(title="Deleted fallback post", content="x", status="published", is_deleted=True)
+    db.add_all([live, deleted])
+    db.commit()
+
+    # No text: straight to the latest-published fallback
+    related = get_related_posts(db, limit=50)
+
+    ids = {article.id for article in related}
+    assert live.id in ids
+    assert deleted.id not in ids
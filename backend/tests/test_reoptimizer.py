@@ -0,0 +1,107 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models import Article
+from models_reoptimize import ReoptimizeRun
+from services import reoptimizer
+from services.agentic_brain import get_llm_client
+from services.llm_client import track_token_usage
+
+
+def _fake_rebuild(db, article):
+    get_llm_client().generate_sync(f"New layout for {article.title}")
+    return f"<p>Re-optimized {article.title}</p>"
+
+
+def test_bulk_run_keeps_published_articles_live(db, monkeypatch):
+    monkeypatch.setattr(reoptimizer, "rebuild_article_html", _fake_rebuild)
+    created = datetime.utcnow() - timedelta(days=400)
+    ids = []
+    for i in range(3):
+        article = Article(title=f"Bulk {i}", content="x", status="published", created_at=created)
+        db.add(article)
+        db.flush()
+        ids.append(article.id)
+    db.commit()
+
+    run = reoptimizer.create_run(db, {"statuses": ["published"], "min_age_days": 365})
+    db.commit()
+
+    result = reoptimizer.run_bulk_reoptimize(run.id)
+
+    assert result["status"] == "completed"
+    db.expire_all()
+    articles = db.query(Article).filter(Article.id.in_(ids)).all()
+    assert {a.status for a in articles} == {"published"}
+    assert all(a.rewrite_count == 1 for a in articles)
+    assert db.get(ReoptimizeRun, run.id).prompt_tokens > 0
+
+
+def test_token_usage_counts_only_the_callers_calls():
+    client = get_llm_client()
+    before = client.tokens_used()
+    stop = threading.Event()
+
+    def other_caller():
+        while not stop.is_set():
+            client.generate_sync("Unrelated traffic from another caller")
+
+    noise = threading.Thread(target=other_caller)
+    noise.start()
+    try:
+        with track_token_usage() as usage:
+            client.generate_sync("First tracked prompt")
+            client.generate_many_sync(["Second tracked prompt", "Third tracked prompt"])
+    finally:
+        stop.set()
+        noise.join()
+
+    tracked = usage.prompt_tokens + usage.output_tokens
+    assert tracked > 0
+    assert client.tokens_used() - before > tracked
+
+
+def _cancelled_run(db, **fields):
+    run = ReoptimizeRun(filters="{}", status="cancelled", started_at=datetime.utcnow(), **fields)
+    db.add(run)
+    db.commit()
+    return run
+
+
+def test_resume_waits_for_the_cancelled_pipeline_to_stop(client, db):
+    draining = _cancelled_run(db, updated_at=datetime.utcnow())
+    stopped = _cancelled_run(db, updated_at=datetime.utcnow(), finished_at=datetime.utcnow())
+    crashed = _cancelled_run(db, updated_at=datetime.utcnow() - timedelta(hours=1))
+
+    def resume(run):
+        return client.post(f"/api/admin/articles/re-optimize/bulk/{run.id}/resume")
+
+    assert resume(draining).status_code == 409
+    assert resume(stopped).status_code == 202
+    assert resume(crashed).status_code == 202
+
+
+def test_cancelled_pipeline_records_finished_at(db, monkeypatch):
+    article = Article(title="Cancel me", content="x", status="published",
+                      created_at=datetime.utcnow() - timedelta(days=400))
+    db.add(article)
+    db.commit()
+    run = reoptimizer.create_run(db, {"statuses": ["published"], "min_age_days": 365})
+    db.commit()
+
+    def cancel_then_rebuild(session, snapshot):
+        session.query(ReoptimizeRun).filter(ReoptimizeRun.id == run.id).update({"status": "cancelled"})
+        session.commit()
+        time.sleep(0.2)  # let the next checkpoint see the cancellation
+        return "<p>late</p>"
+
+    monkeypatch.setattr(reoptimizer, "REOPT_CHECKPOINT_SECONDS", 0.05)
+    monkeypatch.setattr(reoptimizer, "rebuild_article_html", cancel_then_rebuild)
+
+    assert reoptimizer.run_bulk_reoptimize(run.id)["status"] == "cancelled"
+
+    db.expire_all()
+    finished = db.get(ReoptimizeRun, run.id)
+    assert finished.finished_at is not None
+    assert not reoptimizer.is_draining(finished)
@@ -0,0 +1,23 @@
+import json
+from datetime import datetime
+
+from models import Article
+from models_jobs import Job
+from services.job_queue import ClaimedJob
+from services.scheduler import daily_auto_publish
+
+
+def test_daily_auto_publish_creates_article_with_fake_model(db):
+    job = ClaimedJob(id=0, kind="daily_auto_publish", payload={}, attempts=1,
+                     max_attempts=5, created_at=datetime.utcnow())
+
+    daily_auto_publish(db, job)
+    db.commit()
+
+    article = db.query(Article).filter(Article.platform_target == "blogger").order_by(Article.id.desc()).first()
+    assert article is not None
+    assert article.content and article.content == article.canonical_content
+    assert article.status == "approved"
+
+    publish_job = db.query(Job).filter(Job.idempotency_key == f"publish_article:{article.id}").one()
+    assert json.loads(publish_job.payload) == {"article_id": article.id}
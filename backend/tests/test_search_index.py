@@ -0,0 +1,45 @@
+from models import Article
+from services.search_index import InMemoryBackend, article_document, sync_article
+
+PAYLOAD = "&lt;img src=x onerror=alert(1)&gt;"
+
+
+def _publish(db, title, body):
+    article = Article(title=title, content=body, canonical_content=body, status="published")
+    db.add(article)
+    db.flush()
+    sync_article(db, article)
+    db.commit()
+    return article
+
+
+def test_search_highlight_escapes_stored_html(client, db):
+    _publish(db, "Escaping test", f"We use {PAYLOAD} xsskernel trick in the loader.")
+
+    hits = client.get("/api/articles/search/xsskernel").json()
+
+    assert len(hits) == 1
+    highlight = hits[0]["highlight"]
+    assert "<img" not in highlight
+    assert "&lt;img src=x onerror=alert(1)&gt;" in highlight
+    assert "<mark>xsskernel</mark>" in highlight
+
+
+def test_stored_text_cannot_forge_highlight_markers(client, db):
+    _publish(db, "Marker test", "plain <b>bold</b> forgedmarker text")
+
+    highlight = client.get("/api/articles/search/forgedmarker").json()[0]["highlight"]
+
+    assert "<mark>bold" not in highlight
+    assert highlight.count("<mark>") == 1
+
+
+def test_in_memory_backend_escapes_highlight():
+    article = Article(id=1, title="t", content="", canonical_content=f"see {PAYLOAD} memkernel here")
+    backend = InMemoryBackend()
+    backend.upsert(None, 1, article_document(article))
+
+    [hit] = backend.search(None, "memkernel", limit=5, offset=0)
+
+    assert "<img" not in hit.highlight
+    assert "<mark>memkernel</mark>" in hit.highlight
@@ -0,0 +1,16 @@
+from services.stats_cache import TTLCache
+
+
+def test_invalidate_during_compute_discards_result():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    def stale_compute():
+        calls.append("stale")
+        cache.invalidate()  # a write lands while the old counts are being read
+        return "stale"
+
+    assert cache.get_or_compute("k", stale_compute) == ("stale", 0.0)
+    assert cache.get_or_compute("k", lambda: "fresh") == ("fresh", 0.0)
+    assert cache.get_or_compute("k", lambda: "unused")[0] == "fresh"
+    assert calls == ["stale"]
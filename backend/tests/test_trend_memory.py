@@ -0,0 +1,46 @@
+from models_trend_memory import TrendMemory
+from services.trend_memory_service import (
+    MAX_USAGE,
+    TopicIndex,
+    check_topics,
+    record_trend_usages
+)
+
+
+def test_index_matches_near_duplicates_only():
+    index = TopicIndex()
+    index.add("Rust Async Runtimes for Embedded Firmware")
+
+    assert index.match("rust async runtime for embedded firmware") is not None      # exact after normalizing
+    assert index.match("Rust async runtimes in embedded firmware 2026") is not None  # Jaccard 5/6
+    assert index.match("Rust embedded firmware tooling") is None                     # Jaccard 3/7
+
+
+def test_near_duplicate_of_a_recent_topic_is_rejected(db):
+    record_trend_usages(db, ["Quantum Annealing Chips for Logistics Routing"])
+    db.commit()
+
+    first, second, unrelated = check_topics(db, [
+        "Quantum annealing chip for logistics routing in 2026",
+        "Quantum Annealing Chips for Logistics Routing!",
+        "Solid-state batteries reach consumer drones",
+    ])
+
+    assert (first.allowed, first.reason) == (False, "cooldown")
+    assert first.matched == "Quantum Annealing Chips for Logistics Routing"
+    assert (second.allowed, second.reason) == (False, "duplicate_in_batch")
+    assert unrelated.allowed
+
+
+def test_repeat_usages_count_against_one_row(db):
+    topic = "Vector Databases for Hybrid Retrieval Search"
+    record_trend_usages(db, [topic, "vector database for hybrid retrieval search"])
+    db.commit()
+    record_trend_usages(db, ["Vector databases for hybrid retrieval search today"])
+    db.commit()
+
+    rows = db.query(TrendMemory).filter(TrendMemory.topic.ilike("%hybrid retrieval%")).all()
+    assert [(row.topic, row.times_used) for row in rows] == [(topic, MAX_USAGE)]
+
+    [decision] = check_topics(db, [topic])
+    assert (decision.allowed, decision.reason) == (False, "max_usage")
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from database import SessionLocal
+from models import Article
+from models_analytics import ArticleDailyViews
+from services.view_counter import ViewCounter
+
+
+def _article(db, view_count=0):
+    article = Article(title="Counted", content="x", status="published", view_count=view_count)
+    db.add(article)
+    db.commit()
+    return article.id
+
+
+def _daily(db, article_id):
+    return {
+        row.day: row.views
+        for row in db.query(ArticleDailyViews).filter(ArticleDailyViews.article_id == article_id)
+    }
+
+
+def test_flush_adds_delta_to_view_count(db):
+    article_id = _article(db, view_count=40)
+    counter = ViewCounter(flush_interval=60)
+    for _ in range(3):
+        counter.record(article_id)
+
+    assert counter.pending_for(article_id) == 3
+    assert counter.flush() == 3
+    assert counter.pending_for(article_id) == 0
+
+    db.expire_all()
+    assert db.get(Article, article_id).view_count == 43
+
+
+def test_daily_upsert_merges_with_existing_rows(db):
+    article_id = _article(db)
+    today = datetime.utcnow()
+    yesterday = today - timedelta(days=1)
+    counter = ViewCounter(flush_interval=60)
+
+    counter.record(article_id, today)
+    counter.record(article_id, yesterday)
+    counter.flush()
+    counter.record(article_id, today)
+    counter.record(article_id, today)
+    counter.flush()
+
+    db.expire_all()
+    assert _daily(db, article_id) == {yesterday.date(): 1, today.date(): 3}
+    assert db.get(Article, article_id).view_count == 4
+
+
+class _BrokenSession:
+    def __init__(self):
+        self._session = SessionLocal()
+
+    def execute(self, *args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def test_failed_flush_puts_the_batch_back(db):
+    article_id = _article(db)
+    counter = ViewCounter(session_factory=_BrokenSession, flush_interval=60)
+    counter.record(article_id)
+    counter.record(article_id)
+
+    assert counter.flush() == 0
+    assert counter.pending_for(article_id) == 2
+
+    counter._session_factory = SessionLocal
+    counter.record(article_id)
+    assert counter.flush() == 3
+
+    db.expire_all()
+    assert db.get(Article, article_id).view_count == 3
+    assert sum(_daily(db, article_id).values()) == 3
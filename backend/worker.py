@@ -0,0 +1,222 @@
+"""
+Background job worker.
+
+    python -m worker                  # run until SIGTERM / Ctrl+C
+    python -m worker --concurrency 4
+    python -m worker --burst          # drain due jobs, then exit
+    python -m worker --enqueue ctr_optimization
+
+Any number of worker processes can run against the same database:
+each job is leased to exactly one of them, and recurring jobs are
+enqueued under per-run idempotency keys.
+"""
+from dotenv import load_dotenv
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+load_dotenv(override=False)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger("worker")
+
+from database import engine, Base, SessionLocal
+from migrations import run_migrations
+import models
+import models_trend_memory
+import models_analytics
+import models_ctr
+import models_jobs
+import models_publish
+import models_reoptimize
+
+from services.job_queue import (
+    JOB_HANDLERS,
+    JOB_LEASE_SECONDS,
+    claim_next,
+    enqueue,
+    heartbeat,
+    mark_failed,
+    mark_succeeded
+)
+from services.scheduler import enqueue_due_recurring
+
+# =========================
+# CONFIG
+# =========================
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "2"))
+WORKER_SCHEDULE_SECONDS = float(os.getenv("WORKER_SCHEDULE_SECONDS", "30"))
+
+
+class Worker:
+    def __init__(self, concurrency: int = WORKER_CONCURRENCY, burst: bool = False):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.burst = burst
+
+        self._stop = threading.Event()
+        self._running = {}  # job id -> kind
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # JOB EXECUTION
+    # -------------------------
+
+    def run_one(self) -> bool:
+        """
+        Claims and runs a single job. Returns False when nothing was due.
+        """
+        db = SessionLocal()
+        try:
+            job = claim_next(db, self.worker_id, kinds=list(JOB_HANDLERS))
+            if job is None:
+                return False
+
+            with self._lock:
+                self._running[job.id] = job.kind
+
+            logger.info(f"▶️ Job {job.id} ({job.kind}) attempt {job.attempts}/{job.max_attempts}")
+            started = time.monotonic()
+
+            try:
+                JOB_HANDLERS[job.kind](db, job)
+
+                if mark_succeeded(db, job.id, self.worker_id):
+                    db.commit()
+                    logger.info(f"✅ Job {job.id} ({job.kind}) done in {time.monotonic() - started:.1f}s")
+                else:
+                    db.rollback()
+                    logger.warning(f"Job {job.id} lost its lease; its changes were discarded")
+
+            except Exception as e:
+                db.rollback()
+                status = mark_failed(db, job, self.worker_id, f"{type(e).__name__}: {e}")
+                logger.exception(f"❌ Job {job.id} ({job.kind}) failed, now {status}")
+
+            finally:
+                with self._lock:
+                    self._running.pop(job.id, None)
+
+            return True
+
+        finally:
+            db.close()
+
+    def _slot_loop(self):
+        while not self._stop.is_set():
+            try:
+                worked = self.run_one()
+            except Exception:
+                logger.exception("Worker slot error")
+                worked = False
+
+            if not worked:
+                if self.burst:
+                    return
+                self._stop.wait(WORKER_POLL_SECONDS)
+
+    # -------------------------
+    # HOUSEKEEPING
+    # -------------------------
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(JOB_LEASE_SECONDS / 3):
+            with self._lock:
+                running = list(self._running)
+
+            db = SessionLocal()
+            try:
+                for job_id in running:
+                    if not heartbeat(db, job_id, self.worker_id):
+                        logger.warning(f"Lease lost for job {job_id}")
+            except Exception:
+                logger.exception("Heartbeat failed")
+            finally:
+                db.close()
+
+    def _schedule_loop(self):
+        while True:
+            db = SessionLocal()
+            try:
+                queued = enqueue_due_recurring(db)
+                if queued:
+                    logger.info(f"Enqueued recurring jobs: {', '.join(queued)}")
+            except Exception:
+                db.rollback()
+                logger.exception("Recurring schedule check failed")
+            finally:
+                db.close()
+
+            if self._stop.wait(WORKER_SCHEDULE_SECONDS):
+                return
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    def stop(self, *_):
+        logger.info("Stopping worker (in-flight jobs will finish)...")
+        self._stop.set()
+
+    def run(self):
+        logger.info(f"🚀 Worker {self.worker_id} started with {self.concurrency} slots")
+
+        threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True).start()
+        if not self.burst:
+            threading.Thread(target=self._schedule_loop, name="job-schedule", daemon=True).start()
+
+        slots = [
+            threading.Thread(target=self._slot_loop, name=f"job-slot-{i}")
+            for i in range(self.concurrency)
+        ]
+        for slot in slots:
+            slot.start()
+        for slot in slots:
+            slot.join()
+
+        self._stop.set()
+        logger.info("Worker stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m worker")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY)
+    parser.add_argument("--burst", action="store_true", help="Exit once no job is due")
+    parser.add_argument("--enqueue", metavar="KIND", help="Queue one job of KIND and exit")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    if args.enqueue:
+        if args.enqueue not in JOB_HANDLERS:
+            parser.error(f"unknown job kind (choose from {', '.join(sorted(JOB_HANDLERS))})")
+
+        db = SessionLocal()
+        try:
+            enqueue(db, args.enqueue)
+            db.commit()
+        finally:
+            db.close()
+
+        print(f"Queued {args.enqueue}")
+        return 0
+
+    worker = Worker(concurrency=args.concurrency, burst=args.burst)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
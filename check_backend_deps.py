@@ -7,7 +7,6 @@ requirements = [
     "pydantic",
     "dotenv",
     "sqlalchemy",
-    "apscheduler",
     "google.generativeai",
     "googleapiclient",
     "requests"
@@ -1,10 +1,22 @@
+import argparse
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from html import escape
+from io import StringIO
 
 CANONICAL_PATH = "output/canonical_article.txt"
+OUTPUT_DIR = "output"
 BLOGGER_HTML_PATH = "output/blogger.html"
 WORDPRESS_HTML_PATH = "output/wordpress.html"
 
+# Canonical URL AMP pages and feeds point back to
+SITE_URL = os.getenv("SITE_URL", "/")
+
 
 def read_canonical():
     if not os.path.exists(CANONICAL_PATH):
@@ -14,116 +26,423 @@ def read_canonical():
         return f.read().strip()
 
 
-def convert_to_html(text, wordpress=False):
-    lines = text.split("\n")
+def save_html(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
 
-    html = []
-    in_ul = False
-    in_ol = False
-    h1_used = False
 
-    def wp(block):
-        return f"<!-- wp:{block} -->"
+# =========================
+# TOKENIZER
+# =========================
+BLANK = "blank"
+TITLE = "title"
+H2 = "h2"
+H3 = "h3"
+UL_ITEM = "ul_item"
+OL_ITEM = "ol_item"
+PARAGRAPH = "paragraph"
 
-    def wp_end(block):
-        return f"<!-- /wp:{block} -->"
+ORDERED_ITEM = re.compile(r"^\d+\.\s")
+
+
+def tokenize(lines, trailing_blank=False):
+    """
+    Walks canonical text line by line: yields (kind, text).
+    Runs of blank lines become one BLANK; leading blank lines are dropped,
+    and trailing ones too unless `trailing_blank` (a whole file is read
+    as if strip()ped).
+    """
+    h1_used = False
+    pending_blank = False
 
     for raw_line in lines:
         line = raw_line.strip()
 
         if line == "":
-            if in_ul:
-                html.append("</ul>")
-                if wordpress:
-                    html.append(wp_end("list"))
-                in_ul = False
-            if in_ol:
-                html.append("</ol>")
-                if wordpress:
-                    html.append(wp_end("list"))
-                in_ol = False
+            pending_blank = h1_used
             continue
 
+        if pending_blank:
+            yield BLANK, ""
+            pending_blank = False
+
         if not h1_used:
-            if wordpress:
-                html.append(wp("heading"))
-                html.append(f"<h1>{line}</h1>")
-                html.append(wp_end("heading"))
-            else:
-                html.append(f"<h1>{line}</h1>")
             h1_used = True
-            continue
+            yield TITLE, line
+        elif line.startswith("## "):
+            yield H2, line[3:].strip()
+        elif line.startswith("### "):
+            yield H3, line[4:].strip()
+        elif line.startswith("- ") or line.startswith("• "):
+            yield UL_ITEM, line[2:].strip()
+        elif ORDERED_ITEM.match(line):
+            yield OL_ITEM, line.split(".", 1)[1].strip()
+        else:
+            yield PARAGRAPH, line
 
-        if line.startswith("## "):
-            title = line[3:].strip()
-            if wordpress:
-                html.append(wp("heading"))
-                html.append(f"<h2>{title}</h2>")
-                html.append(wp_end("heading"))
-            else:
-                html.append(f"<h2>{title}</h2>")
-
-            html.append("<!-- IMAGE SLOT -->")
-            html.append(f"<!-- Image prompt: {title} concept illustration -->")
-            html.append(f"<!-- ALT text: {title} explained visually -->")
-            continue
+    if pending_blank and trailing_blank:
+        yield BLANK, ""
 
-        if line.startswith("### "):
-            if wordpress:
-                html.append(wp("heading"))
-                html.append(f"<h3>{line[4:].strip()}</h3>")
-                html.append(wp_end("heading"))
-            else:
-                html.append(f"<h3>{line[4:].strip()}</h3>")
-            continue
 
-        if line.startswith("- ") or line.startswith("• "):
-            if not in_ul:
-                if wordpress:
-                    html.append(wp("list"))
-                html.append("<ul>")
-                in_ul = True
-            html.append(f"<li>{line[2:].strip()}</li>")
-            continue
+# =========================
+# EMITTERS
+# =========================
+class Emitter:
+    """
+    Receives every token once and writes its target incrementally to
+    `out`. Lines are "\n"-separated, with no trailing newline.
+    """
 
-        if re.match(r"^\d+\.\s", line):
-            if not in_ol:
-                if wordpress:
-                    html.append(wp("list"))
-                html.append("<ol>")
-                in_ol = True
-            html.append(f"<li>{line.split('.', 1)[1].strip()}</li>")
-            continue
+    def __init__(self, out):
+        self.out = out
+        self._started = False
+
+    def write(self, line):
+        if self._started:
+            self.out.write("\n")
+        self.out.write(line)
+        self._started = True
+
+    def emit(self, kind, text):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+class HtmlEmitter(Emitter):
+    """
+    Blogger HTML, or WordPress block markup with wordpress=True.
+    Text is written as-is and lists close only on a blank line, exactly
+    like the original two-pass converter.
+    """
+
+    def __init__(self, out, wordpress=False):
+        super().__init__(out)
+        self.wordpress = wordpress
+        self.in_ul = False
+        self.in_ol = False
+
+    def _wp(self, block, end=False):
+        if self.wordpress:
+            self.write(f"<!-- {'/' if end else ''}wp:{block} -->")
+
+    def _block(self, block, html):
+        self._wp(block)
+        self.write(html)
+        self._wp(block, end=True)
+
+    def emit(self, kind, text):
+        if kind == BLANK:
+            if self.in_ul:
+                self.write("</ul>")
+                self._wp("list", end=True)
+                self.in_ul = False
+            if self.in_ol:
+                self.write("</ol>")
+                self._wp("list", end=True)
+                self.in_ol = False
+
+        elif kind == TITLE:
+            self._block("heading", f"<h1>{text}</h1>")
+
+        elif kind == H2:
+            self._block("heading", f"<h2>{text}</h2>")
+            self.write("<!-- IMAGE SLOT -->")
+            self.write(f"<!-- Image prompt: {text} concept illustration -->")
+            self.write(f"<!-- ALT text: {text} explained visually -->")
+
+        elif kind == H3:
+            self._block("heading", f"<h3>{text}</h3>")
+
+        elif kind == UL_ITEM:
+            if not self.in_ul:
+                self._wp("list")
+                self.write("<ul>")
+                self.in_ul = True
+            self.write(f"<li>{text}</li>")
+
+        elif kind == OL_ITEM:
+            if not self.in_ol:
+                self._wp("list")
+                self.write("<ol>")
+                self.in_ol = True
+            self.write(f"<li>{text}</li>")
 
-        if wordpress:
-            html.append(wp("paragraph"))
-            html.append(f"<p>{line}</p>")
-            html.append(wp_end("paragraph"))
         else:
-            html.append(f"<p>{line}</p>")
+            self._block("paragraph", f"<p>{text}</p>")
 
-    return "\n".join(html)
 
+class CleanHtmlEmitter(Emitter):
+    """
+    Escaped, well-formed body markup (lists always closed, no comments),
+    for targets that are validated: AMP pages and feed items.
+    """
 
-def save_html(path, content):
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
+    def __init__(self, out):
+        super().__init__(out)
+        self.title = ""
+        self.open_list = None
+
+    def _close_list(self):
+        if self.open_list:
+            self.write(f"</{self.open_list}>")
+            self.open_list = None
+
+    def _list_item(self, tag, text):
+        if self.open_list != tag:
+            self._close_list()
+            self.write(f"<{tag}>")
+            self.open_list = tag
+        self.write(f"<li>{escape(text)}</li>")
+
+    def begin(self, title):
+        self.title = title
+
+    def body(self, kind, text):
+        if kind == UL_ITEM:
+            self._list_item("ul", text)
+            return
+        if kind == OL_ITEM:
+            self._list_item("ol", text)
+            return
+
+        self._close_list()
+        if kind == TITLE:
+            self.write(f"<h1>{escape(text)}</h1>")
+        elif kind == H2:
+            self.write(f"<h2>{escape(text)}</h2>")
+        elif kind == H3:
+            self.write(f"<h3>{escape(text)}</h3>")
+        elif kind == PARAGRAPH:
+            self.write(f"<p>{escape(text)}</p>")
+
+    def emit(self, kind, text):
+        if kind == TITLE:
+            self.begin(text)
+        self.body(kind, text)
+
+    def end(self):
+        pass
+
+    def finish(self):
+        if not self._started:
+            self.begin("")
+        self._close_list()
+        self.end()
+
+
+AMP_BOILERPLATE = (
+    "<style amp-boilerplate>body{-webkit-animation:-amp-start 8s steps(1,end) 0s 1 normal both;"
+    "-moz-animation:-amp-start 8s steps(1,end) 0s 1 normal both;-ms-animation:-amp-start 8s "
+    "steps(1,end) 0s 1 normal both;animation:-amp-start 8s steps(1,end) 0s 1 normal both}"
+    "@-webkit-keyframes -amp-start{from{visibility:hidden}to{visibility:visible}}"
+    "@-moz-keyframes -amp-start{from{visibility:hidden}to{visibility:visible}}"
+    "@-ms-keyframes -amp-start{from{visibility:hidden}to{visibility:visible}}"
+    "@-o-keyframes -amp-start{from{visibility:hidden}to{visibility:visible}}"
+    "@keyframes -amp-start{from{visibility:hidden}to{visibility:visible}}</style>"
+    "<noscript><style amp-boilerplate>body{-webkit-animation:none;-moz-animation:none;"
+    "-ms-animation:none;animation:none}</style></noscript>"
+)
+
+
+class AmpEmitter(CleanHtmlEmitter):
+    """
+    Standalone AMP page; the head is written once the title is known.
+    """
+
+    def begin(self, title):
+        super().begin(title)
+        self.write("<!doctype html>")
+        self.write('<html amp lang="en">')
+        self.write("<head>")
+        self.write('<meta charset="utf-8">')
+        self.write('<script async src="https://cdn.ampproject.org/v0.js"></script>')
+        self.write(f"<title>{escape(title)}</title>")
+        self.write(f'<link rel="canonical" href="{escape(SITE_URL)}">')
+        self.write('<meta name="viewport" content="width=device-width">')
+        self.write(AMP_BOILERPLATE)
+        self.write("</head>")
+        self.write("<body>")
+
+    def end(self):
+        self.write("</body>")
+        self.write("</html>")
+
+
+class RssEmitter(CleanHtmlEmitter):
+    """
+    RSS 2.0 feed with the article as its single item (HTML in CDATA).
+    """
+
+    def begin(self, title):
+        super().begin(title)
+        title = escape(title)
+        link = escape(SITE_URL)
+        self.write('<?xml version="1.0" encoding="UTF-8"?>')
+        self.write('<rss version="2.0">')
+        self.write("<channel>")
+        self.write(f"<title>{title}</title>")
+        self.write(f"<link>{link}</link>")
+        self.write(f"<description>{title}</description>")
+        self.write("<item>")
+        self.write(f"<title>{title}</title>")
+        self.write(f"<link>{link}</link>")
+        self.write(f"<pubDate>{format_datetime(datetime.now(timezone.utc))}</pubDate>")
+        self.write("<description><![CDATA[")
+
+    def body(self, kind, text):
+        # The title is already the item's <title>
+        if kind != TITLE:
+            super().body(kind, text)
+
+    def end(self):
+        self.write("]]></description>")
+        self.write("</item>")
+        self.write("</channel>")
+        self.write("</rss>")
+
+
+class TextEmitter(Emitter):
+    """
+    Plain text: underlined headings, bullets, numbered lists.
+    """
+
+    def __init__(self, out):
+        super().__init__(out)
+        self.number = 0
+
+    def _spaced(self, line):
+        if self._started:
+            self.write("")
+        self.write(line)
+
+    def emit(self, kind, text):
+        if kind != OL_ITEM:
+            self.number = 0
+
+        if kind == TITLE:
+            self.write(text)
+            self.write("=" * len(text))
+        elif kind == H2:
+            self._spaced(text)
+            self.write("-" * len(text))
+        elif kind == H3:
+            self._spaced(text)
+        elif kind == UL_ITEM:
+            self.write(f"  • {text}")
+        elif kind == OL_ITEM:
+            self.number += 1
+            self.write(f"  {self.number}. {text}")
+        elif kind == PARAGRAPH:
+            self._spaced(text)
+
+    def finish(self):
+        if self._started:
+            self.out.write("\n")
+
+
+# Target name -> (output file name, emitter factory)
+TARGETS = {
+    "blogger": ("blogger.html", HtmlEmitter),
+    "wordpress": ("wordpress.html", lambda out: HtmlEmitter(out, wordpress=True)),
+    "amp": ("amp.html", AmpEmitter),
+    "text": ("article.txt", TextEmitter),
+    "rss": ("feed.xml", RssEmitter),
+}
+
+
+# =========================
+# RENDERING
+# =========================
+def render_stream(lines, emitters, trailing_blank=False):
+    """
+    One pass over `lines`, every token fanned out to every emitter.
+    """
+    for kind, text in tokenize(lines, trailing_blank):
+        for emitter in emitters:
+            emitter.emit(kind, text)
+
+    for emitter in emitters:
+        emitter.finish()
+
+
+def render_file(source_path, out_dir, targets=tuple(TARGETS)):
+    """
+    Renders one canonical article into `out_dir`, one file per target.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    with ExitStack() as stack:
+        emitters = []
+        for target in targets:
+            file_name, factory = TARGETS[target]
+            out = stack.enter_context(open(os.path.join(out_dir, file_name), "w", encoding="utf-8"))
+            emitters.append(factory(out))
+
+        source = stack.enter_context(open(source_path, "r", encoding="utf-8"))
+        render_stream(source, emitters)
+
+    return source_path
+
+
+def convert_to_html(text, wordpress=False):
+    out = StringIO()
+    render_stream(text.split("\n"), [HtmlEmitter(out, wordpress=wordpress)], trailing_blank=True)
+    return out.getvalue()
+
+
+def render_directory(source_dir, out_dir, targets=tuple(TARGETS), workers=None):
+    """
+    Renders every *.txt in `source_dir` to `out_dir/<name>/` on a process pool.
+    """
+    sources = sorted(
+        os.path.join(source_dir, name)
+        for name in os.listdir(source_dir)
+        if name.endswith(".txt")
+    )
+    jobs = [
+        (source, os.path.join(out_dir, os.path.splitext(os.path.basename(source))[0]))
+        for source in sources
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_file, source, target_dir, targets) for source, target_dir in jobs]
+        for future in futures:
+            future.result()
+
+    return len(jobs)
 
 
 def main():
-    text = read_canonical()
+    parser = argparse.ArgumentParser(description="Render canonical articles for every platform")
+    parser.add_argument("--dir", help="Render every .txt in this directory")
+    parser.add_argument("--out", default=None, help="Output directory")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--workers", type=int, default=None, help="Processes for --dir (default: CPU count)")
+    args = parser.parse_args()
 
-    blogger_html = convert_to_html(text, wordpress=False)
-    wordpress_html = convert_to_html(text, wordpress=True)
+    if args.dir:
+        out_dir = args.out or os.path.join(OUTPUT_DIR, "rendered")
+        started = time.perf_counter()
+        count = render_directory(args.dir, out_dir, args.targets, args.workers)
+        elapsed = time.perf_counter() - started
 
-    save_html(BLOGGER_HTML_PATH, blogger_html)
-    save_html(WORDPRESS_HTML_PATH, wordpress_html)
+        print(f"✅ Rendered {count} articles x {len(args.targets)} targets in {elapsed:.2f}s "
+              f"({count / elapsed if elapsed else 0:.1f} articles/s)")
+        print(f"📁 Output → {out_dir}/<article>/")
+        return
 
-    print("✅ Blogger + WordPress HTML generated")
-    print("📄 Blogger HTML → output/blogger.html")
-    print("📄 WordPress HTML → output/wordpress.html")
+    if not os.path.exists(CANONICAL_PATH):
+        raise FileNotFoundError("canonical_article.txt not found")
+
+    out_dir = args.out or OUTPUT_DIR
+    render_file(CANONICAL_PATH, out_dir, args.targets)
+
+    print("✅ " + " + ".join(args.targets) + " generated in one pass")
+    for target in args.targets:
+        print(f"📄 {target} → {os.path.join(out_dir, TARGETS[target][0])}")
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,4 +1,13 @@
+import argparse
+import json
 import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
 from dotenv import load_dotenv
 from google import genai
 
@@ -6,6 +15,9 @@ load_dotenv()
 
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
+MODEL_NAME = "models/gemini-flash-lite-latest"
+BATCH_OUTPUT_DIR = "output/batch"
+
 def load_master_prompt():
     with open("master_prompt.txt", "r", encoding="utf-8") as f:
         return f.read()
@@ -26,7 +38,7 @@ Do not include HTML, markdown, bullet points, or SEO metadata.
 """
 
     response = client.models.generate_content(
-        model="models/gemini-flash-lite-latest",
+        model=MODEL_NAME,
         contents=prompt
     )
 
@@ -37,7 +49,212 @@ def save_canonical_article(text):
     with open("output/canonical_article.txt", "w", encoding="utf-8") as f:
         f.write(text)
 
+# =========================
+# BATCH MODE
+# =========================
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:80] or "untitled"
+
+def read_topics(source):
+    """
+    NDJSON topics: {"topic": "...", "slug": "..."} per line (slug optional),
+    or a bare JSON string. Blank lines are ignored; duplicate slugs keep
+    the first topic.
+    """
+    topics, seen = [], set()
+
+    for number, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError:
+            print(f"⚠️ Line {number}: not valid JSON, skipped")
+            continue
+
+        if isinstance(record, str):
+            record = {"topic": record}
+        topic = str(record.get("topic") or "").strip() if isinstance(record, dict) else ""
+        if not topic:
+            print(f"⚠️ Line {number}: no topic, skipped")
+            continue
+
+        slug = slugify(record.get("slug") or topic)
+        if slug in seen:
+            print(f"⚠️ Line {number}: duplicate slug '{slug}', skipped")
+            continue
+
+        seen.add(slug)
+        topics.append((slug, topic))
+
+    return topics
+
+class RateLimiter:
+    """
+    Spaces request starts evenly: at most `rpm` per minute across all threads.
+    """
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+class Journal:
+    """
+    Append-only NDJSON checkpoint: one line per finished topic, flushed
+    and fsynced, so a crashed run knows exactly what is already done.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def completed(self):
+        done = set()
+        if not os.path.exists(self.path):
+            return done
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                if entry.get("status") == "done":
+                    done.add(entry["slug"])
+                else:
+                    done.discard(entry.get("slug"))
+        return done
+
+    def record(self, **entry):
+        entry["at"] = datetime.utcnow().isoformat(timespec="seconds")
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def run_batch(topics, out_dir, concurrency, rpm, retries):
+    os.makedirs(out_dir, exist_ok=True)
+    journal = Journal(os.path.join(out_dir, "journal.ndjson"))
+
+    finished = journal.completed()
+    pending = [
+        (slug, topic) for slug, topic in topics
+        if not (slug in finished and os.path.exists(os.path.join(out_dir, f"{slug}.txt")))
+    ]
+    skipped = len(topics) - len(pending)
+
+    print(f"🚀 Batch: {len(topics)} topics, {skipped} already done, {len(pending)} to generate "
+          f"(concurrency {concurrency}, {rpm or 'unlimited'} RPM)\n")
+
+    master_prompt = load_master_prompt()
+    limiter = RateLimiter(rpm)
+    latencies, failures = [], []
+    interrupted = False
+
+    def generate(slug, topic):
+        for attempt in range(retries + 1):
+            limiter.wait()
+            started = time.perf_counter()
+            try:
+                article = generate_canonical_article(master_prompt, topic)
+                if not article:
+                    raise RuntimeError("empty response")
+                latency = time.perf_counter() - started
+
+                write_atomic(os.path.join(out_dir, f"{slug}.txt"), article)
+                journal.record(slug=slug, topic=topic, status="done",
+                               latency=round(latency, 3), chars=len(article))
+                return latency
+
+            except Exception as e:
+                if attempt == retries:
+                    journal.record(slug=slug, topic=topic, status="failed", error=str(e)[:300])
+                    raise
+                time.sleep(2 ** attempt)
+
+    started = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        futures = {pool.submit(generate, slug, topic): slug for slug, topic in pending}
+        for count, future in enumerate(as_completed(futures), start=1):
+            slug = futures[future]
+            try:
+                latencies.append(future.result())
+                print(f"✅ [{count}/{len(pending)}] {slug}")
+            except Exception as e:
+                failures.append(slug)
+                print(f"❌ [{count}/{len(pending)}] {slug}: {e}")
+
+    except KeyboardInterrupt:
+        print("\n⏹ Interrupted: finishing in-flight topics, rerun to resume")
+        interrupted = True
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    finally:
+        pool.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - started
+    print_batch_report(len(latencies), skipped, len(failures), elapsed, latencies)
+    # 130 = killed by SIGINT, so callers don't mistake a partial run for success
+    if interrupted:
+        return 130
+    return 1 if failures else 0
+
+def print_batch_report(done, skipped, failed, elapsed, latencies):
+    print("\n📊 Batch report")
+    print(f"  generated   {done}")
+    print(f"  skipped     {skipped} (already in journal)")
+    print(f"  failed      {failed}")
+    print(f"  elapsed     {elapsed:.1f}s")
+    print(f"  throughput  {done / elapsed * 60 if elapsed else 0:.1f} articles/min")
+    if latencies:
+        print(f"  latency     p50 {percentile(latencies, 0.5):.2f}s | p90 {percentile(latencies, 0.9):.2f}s | "
+              f"p99 {percentile(latencies, 0.99):.2f}s | max {max(latencies):.2f}s")
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate canonical articles with Gemini")
+    parser.add_argument("--batch", metavar="FILE", help="NDJSON topics file ('-' for stdin)")
+    parser.add_argument("--out", default=BATCH_OUTPUT_DIR, help="Batch output directory")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight")
+    parser.add_argument("--rpm", type=int, default=60, help="Max requests per minute (0 = no limit)")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per topic")
+    args = parser.parse_args()
+
+    if args.batch:
+        if args.batch == "-":
+            topics = read_topics(sys.stdin)
+        else:
+            with open(args.batch, "r", encoding="utf-8") as f:
+                topics = read_topics(f)
+        return run_batch(topics, args.out, args.concurrency, args.rpm, args.retries)
+
     master_prompt = load_master_prompt()
     user_input = get_user_input()
     article = generate_canonical_article(master_prompt, user_input)
@@ -45,6 +262,7 @@ def main():
 
     print("\n✅ Agentic Brain LIVE (Gemini API connected successfully)")
     print("📄 Canonical article saved at: output/canonical_article.txt")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
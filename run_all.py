@@ -1,20 +1,226 @@
+import argparse
+import hashlib
+import json
 import os
-import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 
-print("🚀 Starting Tech Blog Agent Pipeline...\n")
+import renderer
+import seo_generator
+# Importable once seo_generator has put backend/ on sys.path
+from services import keyword_extractor
 
-steps = [
-    ("HTML Renderer", "python renderer.py"),
-    ("SEO Generator", "python seo_generator.py")
+OUTPUT_DIR = "output"
+CANONICAL_PATH = "output/canonical_article.txt"
+MANIFEST_PATH = "output/.pipeline_manifest.json"
+
+
+# =========================
+# STAGES
+# =========================
+@dataclass
+class Stage:
+    """
+    One pipeline step. It re-runs only when the content of its inputs,
+    the code it depends on, or one of its outputs changed since the last
+    successful run (recorded in the manifest).
+    """
+    name: str
+    run: callable
+    inputs: list
+    outputs: list
+    code: list = field(default_factory=list)
+
+
+def render_stage():
+    renderer.render_file(CANONICAL_PATH, OUTPUT_DIR)
+
+
+STAGES = [
+    Stage(
+        name="HTML Renderer",
+        run=render_stage,
+        inputs=[CANONICAL_PATH],
+        outputs=[
+            os.path.join(OUTPUT_DIR, file_name)
+            for file_name, _ in renderer.TARGETS.values()
+        ],
+        code=[renderer.__file__]
+    ),
+    Stage(
+        name="SEO Generator",
+        run=seo_generator.main,
+        # The corpus snapshot's meta changes on every rebuild
+        inputs=[CANONICAL_PATH, f"{keyword_extractor.KEYWORD_STATS_PATH}.json"],
+        outputs=[seo_generator.SEO_OUTPUT_PATH],
+        code=[seo_generator.__file__, keyword_extractor.__file__]
+    ),
 ]
 
-for name, command in steps:
-    print(f"▶ Running {name}...")
-    result = subprocess.run(command, shell=True)
-    if result.returncode != 0:
-        print(f"❌ {name} failed. Stopping pipeline.")
-        exit(1)
-    print(f"✅ {name} completed.\n")
 
-print("🎉 PIPELINE COMPLETE")
-print("📦 Output ready in /output folder")
+def dependencies(stages):
+    """
+    Stage name -> names of the stages producing one of its inputs.
+    """
+    producers = {path: stage.name for stage in stages for path in stage.outputs}
+    return {
+        stage.name: {producers[path] for path in stage.inputs if path in producers} - {stage.name}
+        for stage in stages
+    }
+
+
+# =========================
+# CONTENT HASHES
+# =========================
+def file_hash(path):
+    if not os.path.exists(path):
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_key(stage):
+    digest = hashlib.sha256(stage.name.encode())
+    for path in stage.inputs + stage.code:
+        digest.update(f"{path}:{file_hash(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    tmp_path = f"{MANIFEST_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def is_up_to_date(stage, key, manifest):
+    entry = manifest.get(stage.name)
+    if not entry or entry.get("key") != key:
+        return False
+
+    # Deleted or hand-edited outputs are rebuilt
+    return all(
+        file_hash(path) == entry["outputs"].get(path)
+        for path in stage.outputs
+    )
+
+
+# =========================
+# RUNNER
+# =========================
+def run_pipeline(stages, force=False, jobs=None):
+    """
+    Runs every stage whose dependencies succeeded, independent stages in
+    parallel. Returns {stage name: (status, seconds)}.
+    """
+    deps = dependencies(stages)
+    by_name = {stage.name: stage for stage in stages}
+    manifest = load_manifest()
+    report = {}
+
+    def execute(stage):
+        # Key taken after upstream stages finished: their outputs are our inputs
+        key = stage_key(stage)
+        if not force and is_up_to_date(stage, key, manifest):
+            return "skipped", key
+
+        stage.run()
+        return "ran", key
+
+    pending = set(by_name)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs or len(stages) or 1) as pool:
+        while pending or running:
+            ready = [name for name in sorted(pending) if all(dep in report for dep in deps[name])]
+            for name in ready:
+                pending.discard(name)
+
+                if any(report[dep][0] in ("failed", "blocked") for dep in deps[name]):
+                    report[name] = ("blocked", 0.0)
+                    continue
+
+                print(f"▶ Running {name}...")
+                running[pool.submit(execute, by_name[name])] = (name, time.perf_counter())
+
+            if not running:
+                if pending and not ready:
+                    raise RuntimeError(f"Stage dependency cycle: {', '.join(sorted(pending))}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, started = running.pop(future)
+                elapsed = time.perf_counter() - started
+
+                try:
+                    status, key = future.result()
+                except Exception as e:
+                    print(f"❌ {name} failed: {e}")
+                    report[name] = ("failed", elapsed)
+                    manifest.pop(name, None)
+                    continue
+
+                if status == "ran":
+                    print(f"✅ {name} completed.")
+                else:
+                    print(f"⏭ {name} up to date, skipped.")
+
+                manifest[name] = {
+                    "key": key,
+                    "outputs": {path: file_hash(path) for path in by_name[name].outputs}
+                }
+                report[name] = (status, elapsed)
+
+    save_manifest(manifest)
+    return {stage.name: report[stage.name] for stage in stages}
+
+
+def print_report(report, total):
+    print("\n⏱ Stage timings")
+    for name, (status, seconds) in report.items():
+        print(f"  {name:<20} {status:<8} {seconds * 1000:>9.1f} ms")
+    print(f"  {'TOTAL':<20} {'':<8} {total * 1000:>9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the blog agent pipeline")
+    parser.add_argument("--force", action="store_true", help="Run every stage, ignoring the manifest")
+    parser.add_argument("--jobs", type=int, default=None, help="Stages run in parallel (default: all)")
+    args = parser.parse_args()
+
+    print("🚀 Starting Tech Blog Agent Pipeline...\n")
+
+    if not os.path.exists(CANONICAL_PATH):
+        print(f"❌ {CANONICAL_PATH} not found. Stopping pipeline.")
+        return 1
+
+    started = time.perf_counter()
+    report = run_pipeline(STAGES, force=args.force, jobs=args.jobs)
+    print_report(report, time.perf_counter() - started)
+
+    if any(status in ("failed", "blocked") for status, _ in report.values()):
+        print("\n❌ Pipeline failed.")
+        return 1
+
+    print("\n🎉 PIPELINE COMPLETE")
+    print("📦 Output ready in /output folder")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
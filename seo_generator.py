@@ -1,6 +1,12 @@
 import os
+import sys
 import json
 
+# Keyword extraction lives in the backend (stdlib only, no DB needed here)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.keyword_extractor import get_keyword_extractor, meta_description  # noqa: E402
+
 CANONICAL_PATH = "output/canonical_article.txt"
 SEO_OUTPUT_PATH = "output/seo_package.json"
 
@@ -14,28 +20,28 @@ def read_canonical():
 
 
 def generate_meta_description(text):
-    sentences = text.replace("\n", " ").split(".")
-    meta = sentences[0].strip()
-    return meta[:157] + "..." if len(meta) > 160 else meta
+    return meta_description(text)
+
+
+def title_of(text):
+    return text.strip().split("\n", 1)[0].strip()
 
 
 def generate_tags(text):
-    keywords = [
-        "On-device AI",
-        "AI laptops",
-        "Future of computing",
-        "Neural Processing Unit",
-        "AI hardware",
-        "Laptop technology"
-    ]
-    return keywords
+    """
+    Local RAKE + corpus IDF keyphrases (corpus from the backend's
+    keyword statistics snapshot, when one has been built).
+    """
+    return get_keyword_extractor().tags(text, title_of(text))
 
 
-def generate_internal_links():
+def generate_internal_links(text):
+    """
+    Titles of published articles matching this article's keyphrases.
+    """
     return [
-        "Best laptops for students in 2025",
-        "Cloud AI vs On-device AI explained",
-        "ARM vs x86 processors for laptops"
+        link["title"]
+        for link in get_keyword_extractor().internal_links(text, title_of(text))
     ]
 
 
@@ -45,7 +51,7 @@ def main():
     seo_package = {
         "meta_description": generate_meta_description(text),
         "tags": generate_tags(text),
-        "internal_links": generate_internal_links()
+        "internal_links": generate_internal_links(text)
     }
 
     with open(SEO_OUTPUT_PATH, "w", encoding="utf-8") as f:
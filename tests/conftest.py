@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The root scripts are run from the repo root and import each other by name
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# run_agent builds its Gemini client at import time; no request is ever sent
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
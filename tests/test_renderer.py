@@ -0,0 +1,170 @@
+import os
+import random
+import re
+import xml.etree.ElementTree as ET
+from io import StringIO
+
+import renderer
+
+
+def legacy_convert_to_html(text, wordpress=False):
+    """
+    convert_to_html as it was before the streaming renderer (reference).
+    """
+    html = []
+    in_ul = in_ol = h1_used = False
+
+    def block(name, markup):
+        if wordpress:
+            html.append(f"<!-- wp:{name} -->")
+        html.append(markup)
+        if wordpress:
+            html.append(f"<!-- /wp:{name} -->")
+
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
+
+        if line == "":
+            if in_ul:
+                html.append("</ul>")
+                if wordpress:
+                    html.append("<!-- /wp:list -->")
+                in_ul = False
+            if in_ol:
+                html.append("</ol>")
+                if wordpress:
+                    html.append("<!-- /wp:list -->")
+                in_ol = False
+            continue
+
+        if not h1_used:
+            block("heading", f"<h1>{line}</h1>")
+            h1_used = True
+        elif line.startswith("## "):
+            title = line[3:].strip()
+            block("heading", f"<h2>{title}</h2>")
+            html.append("<!-- IMAGE SLOT -->")
+            html.append(f"<!-- Image prompt: {title} concept illustration -->")
+            html.append(f"<!-- ALT text: {title} explained visually -->")
+        elif line.startswith("### "):
+            block("heading", f"<h3>{line[4:].strip()}</h3>")
+        elif line.startswith("- ") or line.startswith("• "):
+            if not in_ul:
+                if wordpress:
+                    html.append("<!-- wp:list -->")
+                html.append("<ul>")
+                in_ul = True
+            html.append(f"<li>{line[2:].strip()}</li>")
+        elif re.match(r"^\d+\.\s", line):
+            if not in_ol:
+                if wordpress:
+                    html.append("<!-- wp:list -->")
+                html.append("<ol>")
+                in_ol = True
+            html.append(f"<li>{line.split('.', 1)[1].strip()}</li>")
+        else:
+            block("paragraph", f"<p>{line}</p>")
+
+    return "\n".join(html)
+
+
+_LINE_SHAPES = [
+    "", "", "   ", "Plain paragraph {w}", "## Section {w}", "### Sub {w}", "- item {w}",
+    "• bullet {w}", "1. first {w}", "12. later {w}", "2.no space {w}", "##no space {w}",
+    "  indented {w}  ", "a < b & \"c\" {w}", "-dash {w}",
+]
+
+
+def _random_article(rng):
+    words = ["alpha", "beta", "<tag>", "x&y", "naïve", "1.5", "##", "-"]
+    return "\n".join(
+        rng.choice(_LINE_SHAPES).format(w=rng.choice(words))
+        for _ in range(rng.randint(0, 25))
+    )
+
+
+def test_blogger_and_wordpress_match_the_old_converter():
+    rng = random.Random(21)
+    for _ in range(1000):
+        text = _random_article(rng)
+        for wordpress in (False, True):
+            assert renderer.convert_to_html(text, wordpress) == legacy_convert_to_html(text, wordpress), text
+
+
+def test_render_file_matches_the_old_converter_on_stripped_text(tmp_path):
+    text = "\n\nTitle\n\n- one\n- two\n\n## Part\n1. a\n2. b\n\n\n"
+    source = tmp_path / "article.txt"
+    source.write_text(text, encoding="utf-8")
+
+    renderer.render_file(str(source), str(tmp_path / "out"), ("blogger", "wordpress"))
+
+    for name, wordpress in (("blogger.html", False), ("wordpress.html", True)):
+        rendered = (tmp_path / "out" / name).read_text(encoding="utf-8")
+        assert rendered == legacy_convert_to_html(text.strip(), wordpress)
+
+
+UNSAFE_ARTICLE = (
+    "Title <script>alert(1)</script> & more\n"
+    "Intro with ]]> and <b>markup</b>\n"
+    "- open list item\n"
+    "## Section & \"quotes\"\n"
+    "1. numbered\n"
+    "2. numbered again\n"
+    "Paragraph right after a list"
+)
+
+
+def _render(target, text=UNSAFE_ARTICLE):
+    out = StringIO()
+    renderer.render_stream(text.split("\n"), [renderer.TARGETS[target][1](out)])
+    return out.getvalue()
+
+
+def test_amp_body_is_escaped_and_well_formed():
+    page = _render("amp")
+
+    assert page.startswith("<!doctype html>")
+    assert "<script>alert" not in page
+    assert "<title>Title &lt;script&gt;alert(1)&lt;/script&gt; &amp; more</title>" in page
+
+    body = page[page.index("<body>"):page.index("</html>")]
+    root = ET.fromstring(body)  # raises on unclosed lists / raw markup
+    assert [child.tag for child in root] == ["h1", "p", "ul", "h2", "ol", "p"]
+    assert page.endswith("</body>\n</html>")
+
+
+def test_rss_is_valid_xml_with_well_formed_item_html():
+    feed = ET.fromstring(_render("rss"))
+
+    item = feed.find("channel/item")
+    assert item.findtext("title") == "Title <script>alert(1)</script> & more"
+    assert item.findtext("pubDate")
+
+    item_html = ET.fromstring(f"<div>{item.findtext('description')}</div>")
+    assert [child.tag for child in item_html] == ["p", "ul", "h2", "ol", "p"]
+    assert item_html.find("p").text == "Intro with ]]> and <b>markup</b>"
+
+
+def test_text_target_numbers_lists_and_underlines_headings():
+    text = _render("text", "Title\nIntro\n## Part\n1. a\n7. b\n- c\n3. d")
+
+    assert text == (
+        "Title\n=====\n\nIntro\n\nPart\n----\n  1. a\n  2. b\n  • c\n  1. d\n"
+    )
+
+
+def test_render_directory_renders_every_article(tmp_path):
+    source_dir = tmp_path / "articles"
+    source_dir.mkdir()
+    for name in ("first", "second"):
+        (source_dir / f"{name}.txt").write_text(f"{name} title\n\nBody of {name}\n", encoding="utf-8")
+    (source_dir / "notes.md").write_text("ignored", encoding="utf-8")
+
+    count = renderer.render_directory(str(source_dir), str(tmp_path / "out"), workers=2)
+
+    assert count == 2
+    for name in ("first", "second"):
+        files = sorted(os.listdir(tmp_path / "out" / name))
+        assert files == sorted(file_name for file_name, _ in renderer.TARGETS.values())
+        blogger = (tmp_path / "out" / name / "blogger.html").read_text(encoding="utf-8")
+        assert blogger == f"<h1>{name} title</h1>\n<p>Body of {name}</p>"
@@ -0,0 +1,104 @@
+import io
+import json
+import os
+
+import pytest
+
+# run_agent imports the Gemini SDK at module level
+pytest.importorskip("google.genai")
+
+import run_agent
+from run_agent import Journal, read_topics, run_batch
+
+
+def _ndjson(*lines):
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+def test_read_topics_skips_bad_lines():
+    source = _ndjson(
+        '{"topic": "Local LLMs on laptops", "slug": "local-llms"}',
+        "",
+        '"Rust in the kernel"',
+        "{not json",
+        '{"slug": "no-topic"}',
+        '{"topic": "   "}',
+        '{"topic": "Local LLMs again", "slug": "Local LLMs"}',
+        '[1, 2]',
+    )
+
+    assert read_topics(source) == [
+        ("local-llms", "Local LLMs on laptops"),
+        ("rust-in-the-kernel", "Rust in the kernel"),
+    ]
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    calls = []
+
+    def generate(master_prompt, topic):
+        calls.append(topic)
+        if topic.startswith("fail"):
+            raise RuntimeError("model unavailable")
+        return f"Article about {topic}"
+
+    monkeypatch.setattr(run_agent, "load_master_prompt", lambda: "prompt")
+    monkeypatch.setattr(run_agent, "generate_canonical_article", generate)
+    return calls
+
+
+def _journal(out_dir):
+    with open(os.path.join(out_dir, "journal.ndjson"), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_skips_done_and_retries_failed(tmp_path, generator):
+    out_dir = str(tmp_path)
+    topics = [("one", "one"), ("two", "two"), ("three", "fail three")]
+
+    assert run_batch(topics, out_dir, concurrency=2, rpm=0, retries=0) == 1
+    assert sorted(generator) == ["fail three", "one", "two"]
+    assert Journal(os.path.join(out_dir, "journal.ndjson")).completed() == {"one", "two"}
+
+    # Second run: only the failed topic goes back to the model
+    generator.clear()
+    topics[2] = ("three", "three")
+    assert run_batch(topics, out_dir, concurrency=2, rpm=0, retries=0) == 0
+    assert generator == ["three"]
+
+    assert [entry["status"] for entry in _journal(out_dir) if entry["slug"] == "three"] == ["failed", "done"]
+    with open(os.path.join(out_dir, "three.txt"), encoding="utf-8") as f:
+        assert f.read() == "Article about three"
+
+
+def test_done_topic_without_output_is_regenerated(tmp_path, generator):
+    out_dir = str(tmp_path)
+    run_batch([("one", "one")], out_dir, concurrency=1, rpm=0, retries=0)
+    os.remove(os.path.join(out_dir, "one.txt"))
+
+    generator.clear()
+    assert run_batch([("one", "one")], out_dir, concurrency=1, rpm=0, retries=0) == 0
+    assert generator == ["one"]
+
+
+def test_journal_ignores_torn_last_line(tmp_path):
+    path = str(tmp_path / "journal.ndjson")
+    journal = Journal(path)
+    journal.record(slug="one", status="done")
+    journal.record(slug="two", status="done")
+    journal.record(slug="two", status="failed")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"slug": "three", "sta')
+
+    assert journal.completed() == {"one"}
+
+
+def test_interrupted_run_exits_non_zero(tmp_path, generator, monkeypatch):
+    def interrupted(futures):
+        raise KeyboardInterrupt
+        yield
+
+    monkeypatch.setattr(run_agent, "as_completed", interrupted)
+
+    assert run_batch([("one", "one")], str(tmp_path), concurrency=1, rpm=0, retries=0) == 130
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+import run_all
+from run_all import Stage, run_pipeline
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_all, "MANIFEST_PATH", str(tmp_path / "manifest.json"))
+
+    source, middle, final = (str(tmp_path / name) for name in ("in.txt", "middle.txt", "final.txt"))
+    with open(source, "w") as f:
+        f.write("v1")
+    calls = {"upper": 0, "wrap": 0}
+
+    def upper():
+        calls["upper"] += 1
+        with open(source) as src, open(middle, "w") as out:
+            out.write(src.read().upper())
+
+    def wrap():
+        calls["wrap"] += 1
+        with open(middle) as src, open(final, "w") as out:
+            out.write(f"[{src.read()}]")
+
+    stages = [
+        # Listed out of order: the runner follows the file dependencies
+        Stage(name="wrap", run=wrap, inputs=[middle], outputs=[final]),
+        Stage(name="upper", run=upper, inputs=[source], outputs=[middle]),
+    ]
+    return stages, calls, {"source": source, "middle": middle, "final": final}
+
+
+def _statuses(report):
+    return {name: status for name, (status, _) in report.items()}
+
+
+def test_unchanged_inputs_are_skipped(pipeline):
+    stages, calls, paths = pipeline
+
+    assert _statuses(run_pipeline(stages)) == {"upper": "ran", "wrap": "ran"}
+    assert _statuses(run_pipeline(stages)) == {"upper": "skipped", "wrap": "skipped"}
+    assert calls == {"upper": 1, "wrap": 1}
+    assert open(paths["final"]).read() == "[V1]"
+
+    assert _statuses(run_pipeline(stages, force=True)) == {"upper": "ran", "wrap": "ran"}
+
+
+def test_edited_input_reruns_downstream(pipeline):
+    stages, calls, paths = pipeline
+    run_pipeline(stages)
+
+    with open(paths["source"], "w") as f:
+        f.write("v2")
+
+    assert _statuses(run_pipeline(stages)) == {"upper": "ran", "wrap": "ran"}
+    assert open(paths["final"]).read() == "[V2]"
+
+
+def test_deleted_or_edited_outputs_are_rebuilt(pipeline):
+    stages, calls, paths = pipeline
+    run_pipeline(stages)
+
+    os.remove(paths["final"])
+    assert _statuses(run_pipeline(stages)) == {"upper": "skipped", "wrap": "ran"}
+
+    with open(paths["middle"], "w") as f:
+        f.write("hand edit")
+    # upper restores its output; the restored content is what wrap last saw
+    assert _statuses(run_pipeline(stages)) == {"upper": "ran", "wrap": "skipped"}
+    assert open(paths["final"]).read() == "[V1]"
+
+
+def test_failed_stage_blocks_its_dependents(pipeline):
+    stages, calls, paths = pipeline
+
+    def broken():
+        raise RuntimeError("boom")
+
+    stages[1].run = broken
+
+    assert _statuses(run_pipeline(stages)) == {"upper": "failed", "wrap": "blocked"}
+    assert calls["wrap"] == 0
+    assert "upper" not in run_all.load_manifest()